@@ -8,6 +8,7 @@ import httpx
 
 from medicare_rag.config import RAW_DIR
 from medicare_rag.download import download_codes, download_iom, download_mcd
+from medicare_rag.download._utils import HTTP_CLIENT_OPTIONS
 
 logging.basicConfig(
     level=logging.INFO,
@@ -40,15 +41,17 @@ def main() -> int:
     raw_dir.mkdir(parents=True, exist_ok=True)
 
     try:
-        if args.source in ("iom", "all"):
-            logger.info("Downloading IOM manuals 100-02, 100-03, 100-04")
-            download_iom(raw_dir, force=args.force)
-        if args.source in ("mcd", "all"):
-            logger.info("Downloading MCD bulk data")
-            download_mcd(raw_dir, force=args.force)
-        if args.source in ("codes", "all"):
-            logger.info("Downloading ICD-10-CM and HCPCS code files")
-            download_codes(raw_dir, force=args.force)
+        # One pooled client for all sources so cms.gov connections are kept alive throughout
+        with httpx.Client(**HTTP_CLIENT_OPTIONS) as client:
+            if args.source in ("iom", "all"):
+                logger.info("Downloading IOM manuals 100-02, 100-03, 100-04")
+                download_iom(raw_dir, force=args.force, client=client)
+            if args.source in ("mcd", "all"):
+                logger.info("Downloading MCD bulk data")
+                download_mcd(raw_dir, force=args.force, client=client)
+            if args.source in ("codes", "all"):
+                logger.info("Downloading ICD-10-CM and HCPCS code files")
+                download_codes(raw_dir, force=args.force, client=client)
     except NotImplementedError as e:
         logger.error("%s", e)
         return 1
@@ -22,15 +22,22 @@ Usage:
   python scripts/validate_and_eval.py --eval-only --filter-source iom
   python scripts/validate_and_eval.py --json       # machine-readable metrics
   python scripts/validate_and_eval.py --eval-only --k-values 1,3,5,10  # multi-k sweep
+  python scripts/validate_and_eval.py --eval-only --vector-only  # plain vector-search baseline
 """
 import argparse
+import functools
+import io
 import json
 import logging
 import math
+import re
 import sys
 import time
 from collections import Counter, defaultdict
+from collections.abc import Iterable
 from pathlib import Path
+from types import SimpleNamespace
+from typing import TextIO
 
 logging.basicConfig(
     level=logging.INFO,
@@ -39,6 +46,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Only the standard library is imported at module level. medicare_rag (and with
+# it chromadb, langchain and sentence-transformers) is imported inside the
+# helpers that need it, so argument errors and --help stay fast and
+# --validate-only never loads the retriever stack.
 _SCRIPT_DIR = Path(__file__).resolve().parent
 DEFAULT_EVAL_PATH = _SCRIPT_DIR / "eval_questions.json"
 
@@ -50,16 +61,121 @@ EXPECTED_SOURCES = ("iom", "mcd", "codes")
 # Index loading helpers
 # ---------------------------------------------------------------------------
 
+@functools.lru_cache(maxsize=1)
+def _load_embeddings():
+    """Load the embedding model once per process; validation and eval share it."""
+    from medicare_rag.index import get_embeddings
+    return get_embeddings()
+
+
 def _load_store():
-    from medicare_rag.index import get_embeddings, get_or_create_chroma
-    embeddings = get_embeddings()
+    from medicare_rag.index import get_or_create_chroma
+    embeddings = _load_embeddings()
     store = get_or_create_chroma(embeddings)
     return store, embeddings
 
 
-def _load_retriever(k: int, metadata_filter: dict | None = None):
+class _BatchedQueryEmbeddings:
+    """Embeddings wrapper that serves query vectors from one up-front batch.
+
+    All eval queries are embedded with a single ``embed_documents`` call so the
+    sentence-transformers model runs batched forward passes instead of one per
+    question. Queries outside the batch (e.g. retriever-generated variants) fall
+    through to the wrapped model and are cached, so repeats are embedded once.
+    ``get_embeddings()`` sets no query-specific encode kwargs, so batch vectors
+    are identical to what ``embed_query`` would return. ``batch_ms`` is the
+    wall time of the batch call.
+    """
+
+    def __init__(self, embeddings, queries: list[str]) -> None:
+        self._embeddings = embeddings
+        unique = list(dict.fromkeys(q for q in queries if q))
+        t0 = time.perf_counter()
+        vectors = embeddings.embed_documents(unique) if unique else []
+        self.batch_ms = (time.perf_counter() - t0) * 1000
+        self._cache: dict[str, list[float]] = dict(zip(unique, vectors, strict=True))
+
+    def embed_query(self, text: str) -> list[float]:
+        vec = self._cache.get(text)
+        if vec is None:
+            vec = self._cache[text] = self._embeddings.embed_query(text)
+        return vec
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._embeddings.embed_documents(texts)
+
+
+def _chroma_where(metadata_filter: dict | None) -> dict | None:
+    """Translate a flat ``{key: value}`` filter into a Chroma ``where`` clause.
+
+    Chroma accepts a bare ``{key: value}`` only for a single key; several keys
+    must be combined with ``$and``.
+    """
+    if not metadata_filter:
+        return None
+    if len(metadata_filter) == 1:
+        return dict(metadata_filter)
+    return {"$and": [{key: value} for key, value in metadata_filter.items()]}
+
+
+class _VectorSearchRetriever:
+    """Plain top-k Chroma vector search, queried directly on the raw collection.
+
+    Used by ``--vector-only`` as a baseline: no query expansion, BM25 fusion,
+    source diversification or summary boosting, and no LangChain wrapping of
+    the results. The ``where`` clause is built once up front.
+    """
+
+    def __init__(self, collection, embeddings, k: int, metadata_filter: dict | None) -> None:
+        self._collection = collection
+        self._embeddings = embeddings
+        self._k = k
+        self._where = _chroma_where(metadata_filter)
+
+    def invoke(self, query: str) -> list[SimpleNamespace]:
+        result = self._collection.query(
+            query_embeddings=[self._embeddings.embed_query(query)],
+            n_results=self._k,
+            where=self._where,
+            include=["documents", "metadatas"],
+        )
+        texts = (result.get("documents") or [[]])[0]
+        metas = (result.get("metadatas") or [[]])[0]
+        return [
+            SimpleNamespace(page_content=text or "", metadata=meta or {})
+            for text, meta in zip(texts, metas, strict=True)
+        ]
+
+
+def _load_retriever(
+    k: int,
+    metadata_filter: dict | None = None,
+    queries: list[str] | None = None,
+    vector_only: bool = False,
+    timings: dict[str, float] | None = None,
+):
+    """Build the retriever under evaluation.
+
+    When *queries* is given, their embeddings are computed in one batch before
+    any retrieval runs (see ``_BatchedQueryEmbeddings``); if *timings* is given,
+    the batch time is stored in it as ``query_embed_ms``. With *vector_only*
+    a ``_VectorSearchRetriever`` is returned instead of the production retriever.
+    """
+    from medicare_rag.index import get_or_create_chroma
+    from medicare_rag.index.store import get_raw_collection
     from medicare_rag.query.retriever import get_retriever
-    return get_retriever(k=k, metadata_filter=metadata_filter)
+
+    embeddings = _load_embeddings()
+    if queries:
+        embeddings = _BatchedQueryEmbeddings(embeddings, queries)
+        if timings is not None:
+            timings["query_embed_ms"] = embeddings.batch_ms
+    store = get_or_create_chroma(embeddings)
+    if vector_only:
+        return _VectorSearchRetriever(get_raw_collection(store), embeddings, k, metadata_filter)
+    return get_retriever(
+        k=k, metadata_filter=metadata_filter, embeddings=embeddings, store=store
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -118,7 +234,10 @@ def validate_index(store) -> dict:
     BATCH_SIZE = 5000
     ids: list = []
     metadatas: list = []
-    documents: list = []
+    # Document text is only needed for length stats, so reduce each batch to
+    # lengths as it arrives instead of holding every chunk's text in memory.
+    content_lengths: list[int] = []
+    empty_docs = 0
     try:
         for offset in range(0, doc_count, BATCH_SIZE):
             batch = collection.get(
@@ -129,8 +248,13 @@ def validate_index(store) -> dict:
             if batch and batch.get("ids"):
                 ids.extend(batch["ids"])
                 metadatas.extend(batch.get("metadatas") or [])
-                documents.extend(batch.get("documents") or [])
-        all_data = {"ids": ids, "metadatas": metadatas, "documents": documents} if ids else None
+                for doc_text in batch.get("documents") or []:
+                    if not doc_text or not doc_text.strip():
+                        empty_docs += 1
+                        content_lengths.append(0)
+                    else:
+                        content_lengths.append(len(doc_text))
+        all_data = {"ids": ids, "metadatas": metadatas} if ids else None
     except Exception as e:
         _check("bulk_metadata_fetch", False, str(e))
         _warn(f"Could not fetch all metadata: {e}")
@@ -195,16 +319,7 @@ def validate_index(store) -> dict:
             k: v for k, v in metadata_key_counter.most_common()
         }
 
-        # 7. Document content stats
-        content_lengths = []
-        empty_docs = 0
-        for doc_text in documents:
-            if not doc_text or not doc_text.strip():
-                empty_docs += 1
-                content_lengths.append(0)
-            else:
-                content_lengths.append(len(doc_text))
-
+        # 7. Document content stats (lengths collected during the batched fetch)
         _check("no_empty_documents", empty_docs == 0, f"empty={empty_docs}/{len(ids)}")
         if empty_docs:
             _warn(f"{empty_docs} documents have empty content")
@@ -360,9 +475,38 @@ def _keyword_fraction(text: str, expected_keywords: list[str]) -> float:
     """
     if not expected_keywords:
         return 1.0
-    text_lower = text.lower()
-    hits = sum(1 for kw in expected_keywords if kw.lower() in text_lower)
-    return hits / len(expected_keywords)
+    return _folded_keyword_fraction(
+        text.casefold(), [kw.casefold() for kw in expected_keywords]
+    )
+
+
+def _folded_keyword_fraction(text_folded: str, keywords_folded: list[str]) -> float:
+    """Like ``_keyword_fraction`` but for already-casefolded text and keywords."""
+    if not keywords_folded:
+        return 1.0
+    hits = sum(1 for kw in keywords_folded if kw in text_folded)
+    return hits / len(keywords_folded)
+
+
+# Casefolded chunk text keyed by content_hash. Eval questions frequently
+# retrieve the same hot chunks, and the multi-k sweep re-scores every
+# question's docs, so each chunk would otherwise be folded many times per run.
+# Keyed on the hash alone so a lookup never has to hash or compare the text.
+_FOLDED_TEXT_CACHE: dict[str, str] = {}
+_FOLDED_TEXT_CACHE_MAX = 4096
+
+
+def _doc_text_folded(doc) -> str:
+    text = doc.page_content or ""
+    content_hash = doc.metadata.get("content_hash")
+    if not content_hash:
+        return text.casefold()
+    folded = _FOLDED_TEXT_CACHE.get(content_hash)
+    if folded is None:
+        if len(_FOLDED_TEXT_CACHE) >= _FOLDED_TEXT_CACHE_MAX:
+            _FOLDED_TEXT_CACHE.clear()
+        folded = _FOLDED_TEXT_CACHE[content_hash] = text.casefold()
+    return folded
 
 
 def _question_relevance(
@@ -385,17 +529,22 @@ def _question_relevance(
 
     "Fully relevant" threshold for hit/precision is rel >= 0.8 (was 1.0).
     """
+    keywords_folded = [kw.casefold() for kw in expected_keywords or []]
+    sources_set = frozenset(expected_sources or ())
     relevances = []
     for doc in docs:
-        text = doc.page_content or ""
         source = doc.metadata.get("source")
 
-        kw_score = _keyword_fraction(text, expected_keywords or [])
+        kw_score = (
+            _folded_keyword_fraction(_doc_text_folded(doc), keywords_folded)
+            if keywords_folded
+            else 1.0
+        )
 
         source_match = (
             1.0 if (
-                not expected_sources
-                or (source and source in expected_sources)
+                not sources_set
+                or (source and source in sources_set)
             ) else 0.0
         )
 
@@ -441,13 +590,22 @@ def _evaluate_question(
     fully_relevant = sum(1 for r in relevances if r >= RELEVANT_THRESHOLD)
     precision_at_k = fully_relevant / k if k > 0 else 0.0
 
-    # Recall@k: fraction of expected sources represented in relevant results
+    # One pass over the results collects both the sources of relevant docs
+    # (for recall) and the ordered unique sources (for source diversity).
     relevant_sources = set()
-    for doc, rel in zip(docs, relevances):
+    seen_sources: set[str] = set()
+    unique_sources: list[str] = []
+    for doc, rel in zip(docs, relevances, strict=True):
+        src = doc.metadata.get("source")
+        if not src:
+            continue
+        if src not in seen_sources:
+            seen_sources.add(src)
+            unique_sources.append(src)
         if rel >= RELEVANT_THRESHOLD:
-            src = doc.metadata.get("source")
-            if src:
-                relevant_sources.add(src)
+            relevant_sources.add(src)
+
+    # Recall@k: fraction of expected sources represented in relevant results
     if expected_sources:
         recall_at_k = len(relevant_sources & set(expected_sources)) / len(expected_sources)
     else:
@@ -461,12 +619,6 @@ def _evaluate_question(
     # NDCG@k
     ndcg_at_k = _ndcg(relevances, k)
 
-    # Source diversity in results
-    sources_in_results = [
-        d.metadata.get("source") for d in docs if d.metadata.get("source")
-    ]
-    unique_sources = list(dict.fromkeys(sources_in_results))
-
     out = {
         "hit": hit,
         "first_hit_rank": first_hit_rank,
@@ -533,18 +685,30 @@ def _compute_consistency(
 # ---------------------------------------------------------------------------
 
 def run_eval(
-    eval_path: Path,
+    eval_path: Path | list[dict],
     k: int = 5,
     metadata_filter: dict | None = None,
     k_values: list[int] | None = None,
+    workers: int = 1,
+    vector_only: bool = False,
 ) -> dict:
-    """Run the full evaluation suite. Returns comprehensive metrics dict."""
-    if not eval_path.exists():
-        logger.error("Eval file not found: %s", eval_path)
-        return {}
+    """Run the full evaluation suite. Returns comprehensive metrics dict.
+
+    *eval_path* is either the path to an eval questions JSON file or an
+    already-loaded list of question dicts (e.g. after category filtering).
+    With ``workers > 1`` per-question scoring runs on a thread pool after all
+    retrievals have completed. ``vector_only`` evaluates plain vector search
+    instead of the production retriever.
+    """
+    if isinstance(eval_path, list):
+        questions = eval_path
+    else:
+        if not eval_path.exists():
+            logger.error("Eval file not found: %s", eval_path)
+            return {}
 
-    with open(eval_path, encoding="utf-8") as f:
-        questions = json.load(f)
+        with open(eval_path, encoding="utf-8") as f:
+            questions = json.load(f)
 
     if not questions:
         logger.warning("Eval file is empty")
@@ -564,7 +728,18 @@ def run_eval(
     if k_values is None:
         k_values = [k]
 
-    retriever = _load_retriever(k=max(max(k_values), k), metadata_filter=metadata_filter)
+    # Embed every question up front in one batch; its time is spread evenly
+    # over the questions below so per-question latency still includes query
+    # embedding.
+    timings: dict[str, float] = {}
+    retriever = _load_retriever(
+        k=max(max(k_values), k),
+        metadata_filter=metadata_filter,
+        queries=[q.get("query", "") for q in questions],
+        vector_only=vector_only,
+        timings=timings,
+    )
+    embed_ms_per_question = timings.get("query_embed_ms", 0.0) / len(questions)
 
     # Warmup: run one retrieval to amortise cold-start costs (model loading,
     # Chroma cache priming) so that latency stats reflect steady-state performance.
@@ -588,37 +763,42 @@ def run_eval(
     # Cache retrieved docs by question for multi-k sweep
     docs_cache: dict[str, list] = {}
 
+    # Retrieval runs serially so per-question latency is not skewed by
+    # contention; scoring is done afterwards, optionally on a thread pool.
     for q in questions:
+        t0 = time.perf_counter()
+        docs = retriever.invoke(q.get("query", ""))
+        latencies.append((time.perf_counter() - t0) * 1000 + embed_ms_per_question)
+        docs_cache[q.get("id", "?")] = docs
+
+    def _score_at(kv: int) -> list[dict]:
+        def _score(q: dict) -> dict:
+            # Re-use already retrieved docs (we retrieved max(k_values))
+            return _evaluate_question(
+                docs_cache[q.get("id", "?")][:kv],
+                q.get("expected_keywords"),
+                q.get("expected_sources"),
+                kv,
+                expect_summary_in_results=q.get("expect_summary_in_results", False),
+            )
+
+        if workers <= 1 or len(questions) <= 1:
+            return [_score(q) for q in questions]
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_score, questions))
+
+    for q, latency_ms, eval_result in zip(questions, latencies, _score_at(k), strict=True):
         qid = q.get("id", "?")
-        query = q.get("query", "")
-        expected_keywords = q.get("expected_keywords")
         expected_sources = q.get("expected_sources")
-        expect_summary_in_results = q.get("expect_summary_in_results", False)
         category = q.get("category", "uncategorized")
         difficulty = q.get("difficulty", "unknown")
         consistency_group = q.get("consistency_group")
 
-        t0 = time.perf_counter()
-        docs = retriever.invoke(query)
-        latency_ms = (time.perf_counter() - t0) * 1000
-        latencies.append(latency_ms)
-
-        # Cache docs for multi-k sweep
-        docs_cache[qid] = docs
-
-        # Trim to primary k for scoring
-        docs_at_k = docs[:k]
-        eval_result = _evaluate_question(
-            docs_at_k,
-            expected_keywords,
-            expected_sources,
-            k,
-            expect_summary_in_results=expect_summary_in_results,
-        )
-
         result_entry = {
             "id": qid,
-            "query": query,
+            "query": q.get("query", ""),
             "category": category,
             "difficulty": difficulty,
             "latency_ms": round(latency_ms, 1),
@@ -636,7 +816,7 @@ def run_eval(
 
         # Consistency tracking
         if consistency_group:
-            doc_ids = [d.metadata.get("doc_id", "") for d in docs_at_k]
+            doc_ids = [d.metadata.get("doc_id", "") for d in docs_cache[qid][:k]]
             consistency_groups[consistency_group][qid] = {"doc_ids": doc_ids}
 
     # ---- Aggregate metrics at primary k ----
@@ -651,43 +831,21 @@ def run_eval(
     # ---- Multi-k sweep ----
     multi_k_metrics = {}
     for kv in sorted(k_values):
-        kv_hits = 0
-        kv_rrs = []
-        kv_precisions = []
-        kv_recalls = []
-        kv_ndcgs = []
-        for i, q in enumerate(questions):
-            qid = q.get("id", "?")
-            expected_keywords = q.get("expected_keywords")
-            expected_sources = q.get("expected_sources")
-            expect_summary_in_results = q.get("expect_summary_in_results", False)
-            # Re-use already retrieved docs (we retrieved max(k_values))
-            docs = docs_cache[qid]
-            docs_kv = docs[:kv]
-            ev = _evaluate_question(
-                docs_kv,
-                expected_keywords,
-                expected_sources,
-                kv,
-                expect_summary_in_results=expect_summary_in_results,
-            )
-            if ev["hit"]:
-                kv_hits += 1
-            kv_rrs.append(ev["reciprocal_rank"])
-            kv_precisions.append(ev["precision_at_k"])
-            kv_recalls.append(ev["recall_at_k"])
-            kv_ndcgs.append(ev["ndcg_at_k"])
-
+        kv_results = _score_at(kv)
         multi_k_metrics[kv] = {
             "k": kv,
-            "hit_rate": kv_hits / n if n else 0.0,
-            "mrr": sum(kv_rrs) / n if n else 0.0,
-            "avg_precision_at_k": sum(kv_precisions) / n if n else 0.0,
-            "avg_recall_at_k": sum(kv_recalls) / n if n else 0.0,
-            "avg_ndcg_at_k": sum(kv_ndcgs) / n if n else 0.0,
+            "hit_rate": sum(1 for ev in kv_results if ev["hit"]) / n if n else 0.0,
+            "mrr": sum(ev["reciprocal_rank"] for ev in kv_results) / n if n else 0.0,
+            "avg_precision_at_k": (
+                sum(ev["precision_at_k"] for ev in kv_results) / n if n else 0.0
+            ),
+            "avg_recall_at_k": sum(ev["recall_at_k"] for ev in kv_results) / n if n else 0.0,
+            "avg_ndcg_at_k": sum(ev["ndcg_at_k"] for ev in kv_results) / n if n else 0.0,
         }
 
     # ---- Category/difficulty/source breakdowns ----
+    # Breakdown, consistency and multi-k dicts are built in key order so the
+    # report formatters can iterate them directly without re-sorting.
     def _breakdown(groups: dict[str, list[dict]]) -> dict:
         out = {}
         for key, items in sorted(groups.items()):
@@ -708,7 +866,7 @@ def run_eval(
 
     # ---- Consistency scores ----
     consistency_results = {}
-    for group_name, group_data in consistency_groups.items():
+    for group_name, group_data in sorted(consistency_groups.items()):
         consistency_results[group_name] = _compute_consistency(group_data)
 
     avg_consistency = (
@@ -757,8 +915,70 @@ def run_eval(
 # Report formatting
 # ---------------------------------------------------------------------------
 
-def _format_report(metrics: dict) -> list[str]:
-    """Format metrics into human-readable log lines."""
+_BREAKDOWN_SECTIONS = ("by_category", "by_difficulty", "by_expected_source")
+
+
+def _render_rows(metrics: dict) -> dict[str, list[dict]]:
+    """Pre-format per-row metric values once for both the log and markdown reports.
+
+    Returns a mapping from each breakdown section (plus ``"results"`` for the
+    per-question table) to row dicts whose numeric fields are already
+    formatted strings; the row templates below only substitute them.
+    """
+    rows: dict[str, list[dict]] = {}
+    for section in _BREAKDOWN_SECTIONS:
+        rows[section] = [
+            {
+                "key": key,
+                "n": m["n"],
+                "hit_rate": f"{m['hit_rate']:.0%}",
+                "mrr": f"{m['mrr']:.3f}",
+                "precision": f"{m['avg_precision_at_k']:.3f}",
+                "recall": f"{m['avg_recall_at_k']:.3f}",
+                "ndcg": f"{m['avg_ndcg_at_k']:.3f}",
+            }
+            for key, m in metrics.get(section, {}).items()
+        ]
+    rows["results"] = [
+        {
+            "status": "PASS" if r["hit"] else "FAIL",
+            "id": r["id"],
+            "precision": f"{r['precision_at_k']:.2f}",
+            "ndcg": f"{r['ndcg_at_k']:.2f}",
+            "rank": r["first_hit_rank"],
+            "latency": f"{r['latency_ms']:.0f}" if "latency_ms" in r else "?",
+            "category": r["category"],
+            "difficulty": r["difficulty"],
+        }
+        for r in metrics.get("results", [])
+    ]
+    return rows
+
+
+# Row templates over the pre-formatted fields from ``_render_rows``. The log
+# breakdown template takes its key column width per table.
+_LOG_BREAKDOWN_ROW = (
+    "  {key:{width}s}  n={n:2d}  hit={hit_rate}  mrr={mrr}  "
+    "p@k={precision}  r@k={recall}  ndcg={ndcg}"
+)
+_LOG_PER_QUESTION_ROW = (
+    "  [{status}] {id:40s} p@k={precision}  ndcg={ndcg}  "
+    "lat={latency}ms{rank_str}  cat={category}  diff={difficulty}"
+)
+_BREAKDOWN_ROW = "| {key} | {n} | {hit_rate} | {mrr} | {precision} | {recall} | {ndcg} |"
+_PER_QUESTION_ROW = (
+    "| {status} | {id} | {precision} | {ndcg} | {rank_cell} | {category} | {difficulty} |"
+)
+
+
+def _format_report(metrics: dict, rows: dict[str, list[dict]] | None = None) -> list[str]:
+    """Format metrics into human-readable log lines.
+
+    *rows* is the output of ``_render_rows``; pass it when the same metrics
+    are also written as a markdown report so rows are formatted only once.
+    """
+    if rows is None:
+        rows = _render_rows(metrics)
     lines = []
     n = metrics["n_questions"]
     k = metrics["k"]
@@ -784,39 +1004,30 @@ def _format_report(metrics: dict) -> list[str]:
     # Category breakdown
     lines.append("")
     lines.append("--- By Category ---")
-    for cat, m in sorted(metrics.get("by_category", {}).items()):
-        lines.append(
-            f"  {cat:30s}  n={m['n']:2d}  hit={m['hit_rate']:.0%}  "
-            f"mrr={m['mrr']:.3f}  p@k={m['avg_precision_at_k']:.3f}  "
-            f"r@k={m['avg_recall_at_k']:.3f}  ndcg={m['avg_ndcg_at_k']:.3f}"
-        )
+    lines.extend(
+        _LOG_BREAKDOWN_ROW.format_map({**row, "width": 30}) for row in rows["by_category"]
+    )
 
     # Difficulty breakdown
     lines.append("")
     lines.append("--- By Difficulty ---")
-    for diff, m in sorted(metrics.get("by_difficulty", {}).items()):
-        lines.append(
-            f"  {diff:10s}  n={m['n']:2d}  hit={m['hit_rate']:.0%}  "
-            f"mrr={m['mrr']:.3f}  p@k={m['avg_precision_at_k']:.3f}  "
-            f"r@k={m['avg_recall_at_k']:.3f}  ndcg={m['avg_ndcg_at_k']:.3f}"
-        )
+    lines.extend(
+        _LOG_BREAKDOWN_ROW.format_map({**row, "width": 10}) for row in rows["by_difficulty"]
+    )
 
     # Expected source breakdown
     lines.append("")
     lines.append("--- By Expected Source ---")
-    for src, m in sorted(metrics.get("by_expected_source", {}).items()):
-        lines.append(
-            f"  {src:10s}  n={m['n']:2d}  hit={m['hit_rate']:.0%}  "
-            f"mrr={m['mrr']:.3f}  p@k={m['avg_precision_at_k']:.3f}  "
-            f"r@k={m['avg_recall_at_k']:.3f}  ndcg={m['avg_ndcg_at_k']:.3f}"
-        )
+    lines.extend(
+        _LOG_BREAKDOWN_ROW.format_map({**row, "width": 10}) for row in rows["by_expected_source"]
+    )
 
     # Consistency
     consistency = metrics.get("consistency", {})
     if consistency.get("avg_score") is not None:
         lines.append("")
         lines.append(f"--- Consistency (avg Jaccard): {consistency['avg_score']:.3f} ---")
-        for gname, gdata in sorted(consistency.get("groups", {}).items()):
+        for gname, gdata in consistency.get("groups", {}).items():
             lines.append(f"  {gname}: score={gdata['score']:.3f}  questions={gdata['questions']}")
 
     # Multi-k sweep
@@ -824,7 +1035,7 @@ def _format_report(metrics: dict) -> list[str]:
     if multi_k:
         lines.append("")
         lines.append("--- Multi-k Sweep ---")
-        for kv, m in sorted(multi_k.items()):
+        for kv, m in multi_k.items():
             lines.append(
                 f"  k={kv:3d}  hit={m['hit_rate']:.0%}  mrr={m['mrr']:.3f}  "
                 f"p@k={m['avg_precision_at_k']:.3f}  r@k={m['avg_recall_at_k']:.3f}  "
@@ -834,34 +1045,51 @@ def _format_report(metrics: dict) -> list[str]:
     # Per-question results
     lines.append("")
     lines.append("--- Per-Question Results ---")
-    for r in metrics["results"]:
-        status = "PASS" if r["hit"] else "FAIL"
-        rank_str = f" rank={r['first_hit_rank']}" if r["first_hit_rank"] else ""
-        lines.append(
-            f"  [{status}] {r['id']:40s} "
-            f"p@k={r['precision_at_k']:.2f}  ndcg={r['ndcg_at_k']:.2f}  "
-            f"lat={r['latency_ms']:.0f}ms{rank_str}  "
-            f"cat={r['category']}  diff={r['difficulty']}"
-        )
+    lines.extend(
+        _LOG_PER_QUESTION_ROW.format_map({
+            **row,
+            "rank_str": f" rank={row['rank']}" if row["rank"] else "",
+        })
+        for row in rows["results"]
+    )
 
     return lines
 
 
-def _build_markdown_report(
-    validation: dict | None, metrics: dict | None, k: int
-) -> str:
-    """Build a markdown report from validation and evaluation results."""
+def _write_markdown_report(
+    fh: TextIO,
+    validation: dict | None,
+    metrics: dict | None,
+    k: int,
+    rows: dict[str, list[dict]] | None = None,
+) -> None:
+    """Write a markdown report from validation and evaluation results to *fh*.
+
+    Lines are streamed straight to the file handle rather than collected and
+    joined, so the report is never materialized as one string in memory.
+    *rows* is the ``_render_rows`` output shared with ``_format_report``.
+    """
     from datetime import datetime
 
-    parts = [
+    write = fh.write
+
+    def line(text: str) -> None:
+        write(text)
+        write("\n")
+
+    def lines(texts: Iterable[str]) -> None:
+        for text in texts:
+            line(text)
+
+    lines([
         "# Medicare RAG Index — Validation & Evaluation Report",
         "",
         f"*Generated {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*",
         "",
-    ]
+    ])
 
     if validation:
-        parts.extend([
+        lines([
             "## Index Validation",
             "",
             f"- **Result:** {'PASSED' if validation['passed'] else 'FAILED'}",
@@ -871,27 +1099,29 @@ def _build_markdown_report(
         ])
         src_dist = validation["stats"].get("source_distribution", {})
         if src_dist:
-            parts.append(f"- **Source distribution:** {src_dist}")
+            line(f"- **Source distribution:** {src_dist}")
         cl = validation["stats"].get("content_length", {})
         if cl:
-            parts.append(
+            line(
                 f"- **Content length:** min={cl['min']}, max={cl['max']}, "
                 f"median={cl['median']}, mean={cl['mean']:.0f}, p5={cl['p5']}, p95={cl['p95']}"
             )
         emb = validation["stats"].get("embedding_dimension")
         if emb is not None:
-            parts.append(f"- **Embedding dimension:** {emb}")
+            line(f"- **Embedding dimension:** {emb}")
         failed = [c for c in validation["checks"] if not c["passed"]]
         if failed:
-            parts.append("")
-            parts.append("### Failed checks")
+            line("")
+            line("### Failed checks")
             for c in failed:
-                parts.append(f"- {c['name']}: {c['detail']}")
-        parts.append("")
+                line(f"- {c['name']}: {c['detail']}")
+        line("")
 
     if metrics:
+        if rows is None:
+            rows = _render_rows(metrics)
         n = metrics["n_questions"]
-        parts.extend([
+        lines([
             f"## Retrieval Evaluation (k={k})",
             "",
             "### Summary",
@@ -908,7 +1138,7 @@ def _build_markdown_report(
         ])
         lat = metrics.get("latency", {})
         if lat:
-            parts.extend([
+            lines([
                 "### Latency",
                 "",
                 f"- median: {lat['median_ms']:.0f} ms, p95: {lat['p95_ms']:.0f} ms, p99: {lat['p99_ms']:.0f} ms",
@@ -916,71 +1146,60 @@ def _build_markdown_report(
             ])
         by_cat = metrics.get("by_category", {})
         if by_cat:
-            parts.extend([
+            lines([
                 "### By category",
                 "",
                 "| Category | n | Hit rate | MRR | P@k | R@k | NDCG@k |",
                 "|----------|---|----------|-----|-----|-----|--------|",
             ])
-            for cat, m in sorted(by_cat.items()):
-                parts.append(
-                    f"| {cat} | {m['n']} | {m['hit_rate']:.0%} | {m['mrr']:.3f} | "
-                    f"{m['avg_precision_at_k']:.3f} | {m['avg_recall_at_k']:.3f} | "
-                    f"{m['avg_ndcg_at_k']:.3f} |"
-                )
-            parts.append("")
+            lines(_BREAKDOWN_ROW.format_map(row) for row in rows["by_category"])
+            line("")
         by_diff = metrics.get("by_difficulty", {})
         if by_diff:
-            parts.extend([
+            lines([
                 "### By difficulty",
                 "",
                 "| Difficulty | n | Hit rate | MRR | P@k | R@k | NDCG@k |",
                 "|------------|---|----------|-----|-----|-----|--------|",
             ])
-            for diff, m in sorted(by_diff.items()):
-                parts.append(
-                    f"| {diff} | {m['n']} | {m['hit_rate']:.0%} | {m['mrr']:.3f} | "
-                    f"{m['avg_precision_at_k']:.3f} | {m['avg_recall_at_k']:.3f} | "
-                    f"{m['avg_ndcg_at_k']:.3f} |"
-                )
-            parts.append("")
+            lines(_BREAKDOWN_ROW.format_map(row) for row in rows["by_difficulty"])
+            line("")
         by_src = metrics.get("by_expected_source", {})
         if by_src:
-            parts.extend([
+            lines([
                 "### By expected source",
                 "",
                 "| Source | n | Hit rate | MRR | P@k | R@k | NDCG@k |",
                 "|--------|---|----------|-----|-----|-----|--------|",
             ])
-            for src, m in sorted(by_src.items()):
-                parts.append(
-                    f"| {src} | {m['n']} | {m['hit_rate']:.0%} | {m['mrr']:.3f} | "
-                    f"{m['avg_precision_at_k']:.3f} | {m['avg_recall_at_k']:.3f} | "
-                    f"{m['avg_ndcg_at_k']:.3f} |"
-                )
-            parts.append("")
+            lines(_BREAKDOWN_ROW.format_map(row) for row in rows["by_expected_source"])
+            line("")
         consistency = metrics.get("consistency", {})
         if consistency.get("avg_score") is not None:
-            parts.append(f"### Consistency (avg Jaccard): {consistency['avg_score']:.3f}")
-            for gname, gdata in sorted(consistency.get("groups", {}).items()):
-                parts.append(f"- **{gname}:** {gdata['score']:.3f}")
-            parts.append("")
-        parts.extend([
+            line(f"### Consistency (avg Jaccard): {consistency['avg_score']:.3f}")
+            for gname, gdata in consistency.get("groups", {}).items():
+                line(f"- **{gname}:** {gdata['score']:.3f}")
+            line("")
+        lines([
             "### Per-question results",
             "",
             "| Status | Question ID | P@k | NDCG@k | Rank | Category | Difficulty |",
             "|--------|----------|-----|--------|------|----------|------------|",
         ])
-        for r in metrics["results"]:
-            status = "PASS" if r["hit"] else "FAIL"
-            rank = r["first_hit_rank"] if r["first_hit_rank"] else "—"
-            parts.append(
-                f"| {status} | {r['id']} | {r['precision_at_k']:.2f} | {r['ndcg_at_k']:.2f} | "
-                f"{rank} | {r['category']} | {r['difficulty']} |"
-            )
-        parts.append("")
+        lines(
+            _PER_QUESTION_ROW.format_map({**row, "rank_cell": row["rank"] or "—"})
+            for row in rows["results"]
+        )
+        line("")
 
-    return "\n".join(parts)
+
+def _build_markdown_report(
+    validation: dict | None, metrics: dict | None, k: int
+) -> str:
+    """Build a markdown report from validation and evaluation results."""
+    buf = io.StringIO()
+    _write_markdown_report(buf, validation, metrics, k)
+    return buf.getvalue()
 
 
 def _format_validation_report(validation: dict) -> list[str]:
@@ -1038,6 +1257,30 @@ def _format_validation_report(validation: dict) -> list[str]:
 # CLI
 # ---------------------------------------------------------------------------
 
+_K_VALUES_SEP_RE = re.compile(r"[,\s]+")
+
+
+def _parse_k_values(raw: str) -> list[int] | None:
+    """Parse ``--k-values`` (e.g. ``"1, 3,5,"``) into positive ints.
+
+    Values are separated by commas or whitespace; empty entries are ignored and
+    non-positive values are dropped with a warning. Returns None when nothing
+    valid remains. Raises argparse.ArgumentTypeError on a value that is not an int.
+    """
+    values = []
+    for token in _K_VALUES_SEP_RE.split(raw.strip()):
+        if not token:
+            continue
+        try:
+            values.append(int(token))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid k value: {token!r}") from None
+    invalid = [v for v in values if v <= 0]
+    if invalid:
+        logger.warning("Ignoring non-positive --k-values: %s", invalid)
+    return [v for v in values if v > 0] or None
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description="Comprehensive Medicare RAG index validation and retrieval evaluation."
@@ -1061,7 +1304,7 @@ def main() -> int:
     )
     parser.add_argument(
         "--k-values",
-        type=str,
+        type=_parse_k_values,
         default=None,
         help="Comma-separated k values for multi-k sweep (e.g. 1,3,5,10).",
     )
@@ -1091,6 +1334,21 @@ def main() -> int:
         type=str,
         help="Only evaluate questions at this difficulty level.",
     )
+    parser.add_argument(
+        "--vector-only",
+        action="store_true",
+        help=(
+            "Evaluate plain Chroma vector search (no query expansion, BM25 or "
+            "summary boosting) as a baseline for the production retriever."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Threads used to score retrieved results (default: 1, score serially).",
+    )
     parser.add_argument(
         "--report",
         type=Path,
@@ -1110,11 +1368,10 @@ def main() -> int:
     if args.filter_source:
         metadata_filter = {"source": args.filter_source}
 
-    k_values = None
-    if args.k_values:
-        k_values = [int(x.strip()) for x in args.k_values.split(",")]
+    k_values = args.k_values
 
     all_output: dict = {}
+    report_rows: dict[str, list[dict]] | None = None
 
     # ---- Validation ----
     if do_validate:
@@ -1152,12 +1409,10 @@ def main() -> int:
             logger.info("Metadata filter: %s", metadata_filter)
 
         # Pre-filter questions by category/difficulty if requested
-        eval_path = args.eval_file
-        temp_eval_path = None
+        eval_input: Path | list[dict] = args.eval_file
         if args.filter_category or args.filter_difficulty:
-            with open(eval_path, encoding="utf-8") as f:
-                all_questions = json.load(f)
-            filtered = all_questions
+            with open(args.eval_file, encoding="utf-8") as f:
+                filtered = json.load(f)
             if args.filter_category:
                 filtered = [q for q in filtered if q.get("category") == args.filter_category]
             if args.filter_difficulty:
@@ -1169,55 +1424,47 @@ def main() -> int:
                     args.filter_difficulty,
                 )
                 return 1
-            # Write filtered questions to a temp file (cleaned up in finally below)
-            import tempfile
-            with tempfile.NamedTemporaryFile(
-                mode="w", suffix=".json", delete=False, encoding="utf-8"
-            ) as tmp:
-                json.dump(filtered, tmp, indent=2)
-                temp_eval_path = Path(tmp.name)
-                eval_path = temp_eval_path
-
-        try:
-            if temp_eval_path is not None:
-                logger.info(
-                    "Filtered to %d questions (category=%s, difficulty=%s)",
-                    len(filtered),
-                    args.filter_category,
-                    args.filter_difficulty,
-                )
-            metrics = run_eval(
-                eval_path,
-                k=args.k,
-                metadata_filter=metadata_filter,
-                k_values=k_values,
+            logger.info(
+                "Filtered to %d questions (category=%s, difficulty=%s)",
+                len(filtered),
+                args.filter_category,
+                args.filter_difficulty,
             )
-            all_output["evaluation"] = metrics
+            eval_input = filtered
+
+        metrics = run_eval(
+            eval_input,
+            k=args.k,
+            metadata_filter=metadata_filter,
+            k_values=k_values,
+            workers=args.workers,
+            vector_only=args.vector_only,
+        )
+        all_output["evaluation"] = metrics
 
-            if not metrics:
-                return 1
+        if not metrics:
+            return 1
 
-            if args.json:
-                # Strip per-question relevances from JSON to keep it cleaner
-                for r in metrics.get("results", []):
-                    r.pop("relevances", None)
-            else:
-                for line in _format_report(metrics):
-                    logger.info(line)
-        finally:
-            # Clean up temp file if created
-            if temp_eval_path and temp_eval_path.exists():
-                temp_eval_path.unlink()
+        if args.json:
+            # Strip per-question relevances from JSON to keep it cleaner
+            for r in metrics.get("results", []):
+                r.pop("relevances", None)
+        else:
+            report_rows = _render_rows(metrics)
+            for line in _format_report(metrics, report_rows):
+                logger.info(line)
 
     if args.report:
         report_path = args.report.resolve()
         report_path.parent.mkdir(parents=True, exist_ok=True)
-        md = _build_markdown_report(
-            all_output.get("validation"),
-            all_output.get("evaluation"),
-            args.k,
-        )
-        report_path.write_text(md, encoding="utf-8")
+        with open(report_path, "w", encoding="utf-8", buffering=1 << 20) as fh:
+            _write_markdown_report(
+                fh,
+                all_output.get("validation"),
+                all_output.get("evaluation"),
+                args.k,
+                rows=report_rows,
+            )
         logger.info("Report written to %s", report_path)
 
     if args.json:
@@ -6,109 +6,143 @@ to the default when the env value is invalid or out of range.
 
 Exports:
     Paths      — DATA_DIR, RAW_DIR, PROCESSED_DIR, CHROMA_DIR
-    Embedding  — EMBEDDING_MODEL, COLLECTION_NAME
+    Embedding  — EMBEDDING_MODEL, EMBEDDING_DEVICE, EMBEDDING_BATCH_SIZE,
+                  EMBEDDING_BACKEND, COLLECTION_NAME
     LLM        — LOCAL_LLM_MODEL, LOCAL_LLM_DEVICE, LOCAL_LLM_MAX_NEW_TOKENS,
                   LOCAL_LLM_REPETITION_PENALTY
     Chunking   — CHUNK_SIZE, CHUNK_OVERLAP, LCD_CHUNK_SIZE, LCD_CHUNK_OVERLAP
-    Indexing   — CHROMA_UPSERT_BATCH_SIZE, GET_META_BATCH_SIZE
+    Indexing   — CHROMA_UPSERT_BATCH_SIZE, GET_META_BATCH_SIZE, CONTENT_HASH_ALGORITHM
     Retrieval  — LCD_RETRIEVAL_K, HYBRID_SEMANTIC_WEIGHT, HYBRID_KEYWORD_WEIGHT,
                   RRF_K, CROSS_SOURCE_MIN_PER_SOURCE, MAX_QUERY_VARIANTS
     Summary    — ENABLE_TOPIC_SUMMARIES, MAX_DOC_SUMMARY_SENTENCES,
                   MAX_TOPIC_SUMMARY_SENTENCES, MIN_TOPIC_CLUSTER_CHUNKS,
-                  MIN_DOC_TEXT_LENGTH_FOR_SUMMARY
+                  MIN_DOC_TEXT_LENGTH_FOR_SUMMARY, TOPIC_REGEX_ENGINE,
+                  TOPIC_PROCESS_WORKERS
     Download   — DOWNLOAD_TIMEOUT, CSV_FIELD_SIZE_LIMIT, ICD10_CM_ZIP_URL
 """
 import logging
 import math
 import os
+from collections.abc import Callable, Mapping
 from pathlib import Path
+from typing import TypeVar
 
 from dotenv import load_dotenv
 
-load_dotenv()
-
 logger = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
 
-def _safe_int(key: str, default: int) -> int:
-    """Parse *key* from the environment as an int, returning *default* on failure."""
-    raw = os.environ.get(key)
+# Repo root: directory containing pyproject.toml (when run from repo or editable install)
+_repo_root = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+if not os.path.isfile(os.path.join(_repo_root, "pyproject.toml")):
+    _repo_root = os.getcwd()
+_REPO_ROOT = Path(_repo_root)
+
+# Load <repo root>/.env directly rather than letting find_dotenv walk the directory tree
+_DOTENV_PATH = os.path.join(_repo_root, ".env")
+if os.path.isfile(_DOTENV_PATH):
+    load_dotenv(_DOTENV_PATH, override=False)
+
+
+def _env(
+    key: str,
+    default: _T,
+    *,
+    cast: Callable[[str], _T] | None = None,
+    predicate: Callable[[_T], bool] | None = None,
+    requirement: str = "",
+    env: Mapping[str, str] | None = None,
+) -> _T:
+    """Parse *key* from the environment with *cast* (default: ``type(default)``).
+
+    Returns *default* (and logs a warning) when the value is missing, unparsable,
+    non-finite (floats), or fails *predicate*; *requirement* describes the predicate
+    in the warning. *env* defaults to ``os.environ``; module settings pass the
+    ``_ENV`` snapshot.
+    """
+    raw = (os.environ if env is None else env).get(key)
     if raw is None:
         return default
     try:
-        return int(raw)
+        val = (cast or type(default))(raw)
     except ValueError:
-        logger.warning("Invalid %s=%r, using default %d", key, raw, default)
+        logger.warning("Invalid %s=%r, using default %s", key, raw, default)
+        return default
+    if isinstance(val, float) and not math.isfinite(val):
+        logger.warning("Invalid %s=%r (non-finite), using default %s", key, raw, default)
+        return default
+    if predicate is not None and not predicate(val):
+        logger.warning(
+            "Invalid %s=%s (must be %s), using default %s", key, val, requirement, default
+        )
         return default
+    return val
+
 
+def _safe_int(key: str, default: int, env: Mapping[str, str] | None = None) -> int:
+    """Parse *key* from the environment as an int, returning *default* on failure."""
+    return _env(key, default, cast=int, env=env)
 
-def _safe_float(key: str, default: float) -> float:
+
+def _safe_float(key: str, default: float, env: Mapping[str, str] | None = None) -> float:
     """Parse *key* from the environment as a float, returning *default* on failure or non-finite values."""
-    raw = os.environ.get(key)
-    if raw is None:
-        return default
-    try:
-        val = float(raw)
-        if math.isnan(val) or math.isinf(val):
-            logger.warning("Invalid %s=%r (non-finite), using default %s", key, raw, default)
-            return default
-        return val
-    except ValueError:
-        logger.warning("Invalid %s=%r, using default %s", key, raw, default)
-        return default
+    return _env(key, default, cast=float, env=env)
 
 
-def _safe_positive_int(key: str, default: int) -> int:
+def _safe_positive_int(key: str, default: int, env: Mapping[str, str] | None = None) -> int:
     """Parse env as int; require value >= 1, else use default and log."""
-    val = _safe_int(key, default)
-    if val < 1:
-        logger.warning("Invalid %s=%d (must be >= 1), using default %d", key, val, default)
-        return default
-    return val
+    return _env(key, default, cast=int, predicate=lambda v: v >= 1, requirement=">= 1", env=env)
 
 
-def _safe_float_positive(key: str, default: float) -> float:
+def _safe_float_positive(
+    key: str, default: float, env: Mapping[str, str] | None = None
+) -> float:
     """Parse env as float; require value > 0, else use default and log."""
-    val = _safe_float(key, default)
-    if val <= 0:
-        logger.warning("Invalid %s=%s (must be > 0), using default %s", key, val, default)
-        return default
-    return val
+    return _env(key, default, cast=float, predicate=lambda v: v > 0, requirement="> 0", env=env)
 
 
-# Repo root: directory containing pyproject.toml (when run from repo or editable install)
-_REPO_ROOT = Path(__file__).resolve().parents[2]
-if not (_REPO_ROOT / "pyproject.toml").exists():
-    _REPO_ROOT = Path.cwd()
+# All module-level settings are read from one snapshot of the environment (taken after .env)
+_ENV: dict[str, str] = dict(os.environ)
 
-DATA_DIR = Path(os.environ.get("DATA_DIR", _REPO_ROOT / "data"))
-RAW_DIR = DATA_DIR / "raw"
-PROCESSED_DIR = DATA_DIR / "processed"
+# Join as strings and build each Path once
+_data_dir = _ENV.get("DATA_DIR", os.path.join(_repo_root, "data"))
+DATA_DIR = Path(_data_dir)
+RAW_DIR = Path(os.path.join(_data_dir, "raw"))
+PROCESSED_DIR = Path(os.path.join(_data_dir, "processed"))
 
 # Phase 3: local embeddings and vector store
-CHROMA_DIR = DATA_DIR / "chroma"
+CHROMA_DIR = Path(os.path.join(_data_dir, "chroma"))
 COLLECTION_NAME = "medicare_rag"
-EMBEDDING_MODEL = os.environ.get(
+EMBEDDING_MODEL = _ENV.get(
     "EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"
 )
+# "auto" picks CUDA when torch reports a GPU, else CPU; any other value is passed through.
+EMBEDDING_DEVICE = _ENV.get("EMBEDDING_DEVICE", "auto").strip() or "auto"
+EMBEDDING_BATCH_SIZE = _safe_positive_int("EMBEDDING_BATCH_SIZE", 64, _ENV)
+# sentence-transformers backend: "torch" (default), "onnx" or "openvino".
+EMBEDDING_BACKEND = _ENV.get("EMBEDDING_BACKEND", "torch").strip().lower() or "torch"
 
 # Chroma batch sizes (env-overridable; must be >= 1)
-CHROMA_UPSERT_BATCH_SIZE = _safe_positive_int("CHROMA_UPSERT_BATCH_SIZE", 5000)
-GET_META_BATCH_SIZE = _safe_positive_int("GET_META_BATCH_SIZE", 500)
+CHROMA_UPSERT_BATCH_SIZE = _safe_positive_int("CHROMA_UPSERT_BATCH_SIZE", 5000, _ENV)
+GET_META_BATCH_SIZE = _safe_positive_int("GET_META_BATCH_SIZE", 500, _ENV)
+# Chunk change-detection hash: "sha256" (default; matches existing indexes), "xxh3" or "blake3".
+# Switching re-embeds every chunk once on the next ingest because stored hashes no longer match.
+CONTENT_HASH_ALGORITHM = _ENV.get("CONTENT_HASH_ALGORITHM", "sha256").strip().lower() or "sha256"
 
 # ICD-10-CM ZIP URL (optional; when set, codes download includes ICD-10-CM)
-ICD10_CM_ZIP_URL: str | None = os.environ.get("ICD10_CM_ZIP_URL") or None
+ICD10_CM_ZIP_URL: str | None = _ENV.get("ICD10_CM_ZIP_URL") or None
 
 # Download timeout (seconds; must be > 0)
-DOWNLOAD_TIMEOUT = _safe_float_positive("DOWNLOAD_TIMEOUT", 60.0)
+DOWNLOAD_TIMEOUT = _safe_float_positive("DOWNLOAD_TIMEOUT", 60.0, _ENV)
 
 # MCD CSV max field size (bytes; must be >= 1). Very large policy/narrative fields may exceed
 # Python's default; set high enough for real exports but bounded to limit blast radius.
-CSV_FIELD_SIZE_LIMIT = _safe_positive_int("CSV_FIELD_SIZE_LIMIT", 10 * 1024 * 1024)
+CSV_FIELD_SIZE_LIMIT = _safe_positive_int("CSV_FIELD_SIZE_LIMIT", 10 * 1024 * 1024, _ENV)
 
 # Chunking defaults (size >= 1; overlap in [0, size))
-CHUNK_SIZE = _safe_positive_int("CHUNK_SIZE", 1000)
-_chunk_overlap_raw = _safe_int("CHUNK_OVERLAP", 200)
+CHUNK_SIZE = _safe_positive_int("CHUNK_SIZE", 1000, _ENV)
+_chunk_overlap_raw = _safe_int("CHUNK_OVERLAP", 200, _ENV)
 if _chunk_overlap_raw < 0 or _chunk_overlap_raw >= CHUNK_SIZE:
     logger.warning(
         "Invalid CHUNK_OVERLAP=%d (must be 0 <= overlap < CHUNK_SIZE=%d), using default 200",
@@ -120,8 +154,8 @@ else:
     CHUNK_OVERLAP = _chunk_overlap_raw
 
 # LCD/MCD-specific chunking: larger chunks preserve more policy-text context
-LCD_CHUNK_SIZE = _safe_positive_int("LCD_CHUNK_SIZE", 1500)
-_lcd_overlap_raw = _safe_int("LCD_CHUNK_OVERLAP", 300)
+LCD_CHUNK_SIZE = _safe_positive_int("LCD_CHUNK_SIZE", 1500, _ENV)
+_lcd_overlap_raw = _safe_int("LCD_CHUNK_OVERLAP", 300, _ENV)
 if _lcd_overlap_raw < 0 or _lcd_overlap_raw >= LCD_CHUNK_SIZE:
     logger.warning(
         "Invalid LCD_CHUNK_OVERLAP=%d (must be 0 <= overlap < LCD_CHUNK_SIZE=%d),"
@@ -134,32 +168,40 @@ else:
     LCD_CHUNK_OVERLAP = _lcd_overlap_raw
 
 # LCD retrieval: higher k for coverage-determination queries
-LCD_RETRIEVAL_K = _safe_positive_int("LCD_RETRIEVAL_K", 12)
+LCD_RETRIEVAL_K = _safe_positive_int("LCD_RETRIEVAL_K", 12, _ENV)
 
 # Topic clustering and summarization
-ENABLE_TOPIC_SUMMARIES = os.environ.get("ENABLE_TOPIC_SUMMARIES", "1").strip().lower() in (
+ENABLE_TOPIC_SUMMARIES = _ENV.get("ENABLE_TOPIC_SUMMARIES", "1").strip().lower() in (
     "1", "true", "yes",
 )
-MAX_DOC_SUMMARY_SENTENCES = _safe_positive_int("MAX_DOC_SUMMARY_SENTENCES", 8)
-MAX_TOPIC_SUMMARY_SENTENCES = _safe_positive_int("MAX_TOPIC_SUMMARY_SENTENCES", 10)
-MIN_TOPIC_CLUSTER_CHUNKS = _safe_positive_int("MIN_TOPIC_CLUSTER_CHUNKS", 2)
-MIN_DOC_TEXT_LENGTH_FOR_SUMMARY = _safe_positive_int("MIN_DOC_TEXT_LENGTH_FOR_SUMMARY", 200)
+MAX_DOC_SUMMARY_SENTENCES = _safe_positive_int("MAX_DOC_SUMMARY_SENTENCES", 8, _ENV)
+MAX_TOPIC_SUMMARY_SENTENCES = _safe_positive_int("MAX_TOPIC_SUMMARY_SENTENCES", 10, _ENV)
+MIN_TOPIC_CLUSTER_CHUNKS = _safe_positive_int("MIN_TOPIC_CLUSTER_CHUNKS", 2, _ENV)
+MIN_DOC_TEXT_LENGTH_FOR_SUMMARY = _safe_positive_int("MIN_DOC_TEXT_LENGTH_FOR_SUMMARY", 200, _ENV)
+# Regex engine for topic patterns: "re" (default), "re2" (google-re2), "pcre2" (JIT) or
+# "hyperscan" (one multi-pattern database scan per document). re2 uses ASCII \s and \b.
+TOPIC_REGEX_ENGINE = _ENV.get("TOPIC_REGEX_ENGINE", "re").strip().lower() or "re"
+# Worker processes for tagging large batches with re or pcre2 (0 or 1: tag in-process).
+# Workers re-import the package, so they see topic definitions and settings as loaded from disk.
+TOPIC_PROCESS_WORKERS = max(
+    0, min(_safe_int("TOPIC_PROCESS_WORKERS", 0, _ENV), os.cpu_count() or 1)
+)
 
 # Hybrid retrieval: combine semantic and keyword (BM25) search
-HYBRID_SEMANTIC_WEIGHT = _safe_float_positive("HYBRID_SEMANTIC_WEIGHT", 0.6)
-HYBRID_KEYWORD_WEIGHT = _safe_float_positive("HYBRID_KEYWORD_WEIGHT", 0.4)
-RRF_K = _safe_positive_int("RRF_K", 60)
+HYBRID_SEMANTIC_WEIGHT = _safe_float_positive("HYBRID_SEMANTIC_WEIGHT", 0.6, _ENV)
+HYBRID_KEYWORD_WEIGHT = _safe_float_positive("HYBRID_KEYWORD_WEIGHT", 0.4, _ENV)
+RRF_K = _safe_positive_int("RRF_K", 60, _ENV)
 
 # Cross-source retrieval: ensure results span multiple source types
-CROSS_SOURCE_MIN_PER_SOURCE = _safe_positive_int("CROSS_SOURCE_MIN_PER_SOURCE", 2)
-MAX_QUERY_VARIANTS = _safe_positive_int("MAX_QUERY_VARIANTS", 6)
+CROSS_SOURCE_MIN_PER_SOURCE = _safe_positive_int("CROSS_SOURCE_MIN_PER_SOURCE", 2, _ENV)
+MAX_QUERY_VARIANTS = _safe_positive_int("MAX_QUERY_VARIANTS", 6, _ENV)
 
 # Phase 4: local LLM (Hugging Face pipeline, runs with sentence-transformers stack)
-LOCAL_LLM_MODEL = os.environ.get(
+LOCAL_LLM_MODEL = _ENV.get(
     "LOCAL_LLM_MODEL", "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
 )
-LOCAL_LLM_DEVICE = os.environ.get("LOCAL_LLM_DEVICE", "auto")
-LOCAL_LLM_MAX_NEW_TOKENS = _safe_positive_int("LOCAL_LLM_MAX_NEW_TOKENS", 512)
+LOCAL_LLM_DEVICE = _ENV.get("LOCAL_LLM_DEVICE", "auto")
+LOCAL_LLM_MAX_NEW_TOKENS = _safe_positive_int("LOCAL_LLM_MAX_NEW_TOKENS", 512, _ENV)
 LOCAL_LLM_REPETITION_PENALTY = _safe_float_positive(
-    "LOCAL_LLM_REPETITION_PENALTY", 1.05
+    "LOCAL_LLM_REPETITION_PENALTY", 1.05, _ENV
 )
@@ -1,6 +1,27 @@
-"""Download scripts for IOM, MCD, and code files."""
-from medicare_rag.download.codes import download_codes
-from medicare_rag.download.iom import download_iom
-from medicare_rag.download.mcd import download_mcd
+"""Download scripts for IOM, MCD, and code files.
+
+The download functions are imported lazily (PEP 562) so that importing a helper such as
+``medicare_rag.download._manifest`` does not pull in httpx and BeautifulSoup.
+"""
+import importlib
+
+_SUBMODULES = {
+    "download_codes": "medicare_rag.download.codes",
+    "download_iom": "medicare_rag.download.iom",
+    "download_mcd": "medicare_rag.download.mcd",
+}
 
 __all__ = ["download_iom", "download_mcd", "download_codes"]
+
+
+def __getattr__(name: str):
+    module = _SUBMODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -1,17 +1,111 @@
 """Shared manifest writing for download scripts."""
 import hashlib
 import json
+import os
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Empty SHA-256 state; copying it is cheaper than a fresh constructor lookup + init per file.
+# Never updated, so concurrent copies from hash_files threads are safe.
+_SHA256_PROTO = hashlib.sha256()
+
 
 def file_sha256(path: Path) -> str:
     """Return SHA-256 hex digest of file."""
-    h = hashlib.sha256()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(65536), b""):
-            h.update(chunk)
-    return h.hexdigest()
+    # Unbuffered: file_digest reads into its own buffer, so a BufferedReader only adds a copy
+    with open(path, "rb", buffering=0) as f:
+        if hasattr(os, "posix_fadvise"):
+            try:
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
+        return hashlib.file_digest(f, _SHA256_PROTO.copy).hexdigest()
+
+
+def read_manifest(manifest_path: Path) -> dict[str, dict]:
+    """Return entries of an existing manifest.json keyed by stored path.
+
+    Returns an empty dict if the manifest is missing, unreadable, or malformed.
+    """
+    try:
+        if orjson is not None:
+            data = orjson.loads(manifest_path.read_bytes())
+        else:
+            with open(manifest_path, encoding="utf-8") as f:
+                data = json.load(f)
+    except (OSError, ValueError):  # JSON and UTF-8 decode errors, from json or orjson
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    files = data.get("files")
+    if not isinstance(files, list):
+        return {}
+    return {e["path"]: e for e in files if isinstance(e, dict) and isinstance(e.get("path"), str)}
+
+
+def cached_file_sha256(path: Path, entry: dict | None) -> str | None:
+    """Return SHA-256 of path, reusing entry's file_hash when size and mtime_ns still match.
+
+    entry is the file's record from read_manifest (or None). Returns None if the file
+    cannot be read.
+    """
+    try:
+        st = path.stat()
+        if (
+            entry
+            and entry.get("file_hash")
+            and entry.get("size") == st.st_size
+            and entry.get("mtime_ns") == st.st_mtime_ns
+        ):
+            return entry["file_hash"]
+        return file_sha256(path)
+    except OSError:
+        return None
+
+
+def hash_files(
+    paths: Sequence[Path],
+    *,
+    cached: Sequence[dict | None] | None = None,
+    workers: int = 4,
+) -> list[str | None]:
+    """Return SHA-256 hex digests for paths, in order, hashing up to *workers* files at once.
+
+    cached: optional manifest entries aligned with paths, reused as in cached_file_sha256.
+    Unreadable files yield None. Hashing releases the GIL, so threads overlap the reads.
+    """
+    entries = cached if cached is not None else [None] * len(paths)
+    if workers <= 1 or len(paths) <= 1:
+        return [cached_file_sha256(p, e) for p, e in zip(paths, entries, strict=True)]
+    with ThreadPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        return list(pool.map(cached_file_sha256, paths, entries))
+
+
+def _dumps_manifest(data: dict) -> str:
+    """Encode a manifest as multi-line JSON using only the C-accelerated compact encoder.
+
+    json.dump(..., indent=2) falls back to the pure-Python encoder; instead each top-level
+    value and each file entry is encoded compactly on its own line.
+    """
+    lines = ["{"]
+    last = len(data) - 1
+    for i, (key, value) in enumerate(data.items()):
+        comma = "," if i < last else ""
+        if key == "files" and value:
+            lines.append(f"  {json.dumps(key)}: [")
+            lines.append(",\n".join(f"    {json.dumps(entry)}" for entry in value))
+            lines.append(f"  ]{comma}")
+        else:
+            lines.append(f"  {json.dumps(key)}: {json.dumps(value)}{comma}")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
 
 
 def write_manifest(
@@ -21,20 +115,47 @@ def write_manifest(
     *,
     base_dir: Path | None = None,
     sources: list[str] | None = None,
+    extra: dict | None = None,
+    file_extras: Sequence[dict | None] | None = None,
 ) -> None:
     """Write manifest.json with source_url, download_date, and file list with optional hashes.
 
     files: list of (absolute_path, hash_or_none). If base_dir is set, stored paths are relative to it.
+    Each entry also records size and mtime_ns so later runs can skip re-hashing unchanged files.
     sources: optional list of URLs for multi-source manifests (e.g. HCPCS + ICD-10-CM).
+    extra: optional additional top-level fields (e.g. archive_sha256 for MCD).
+    file_extras: optional per-file fields aligned with files (e.g. HTTP etag/last_modified).
     """
     base = base_dir or manifest_path.parent
+    base_str = os.path.abspath(base)
+    base_resolved: Path | None = None
     entries = []
-    for fp, fhash in files:
+    if file_extras is None:
+        file_extras = [None] * len(files)
+    for (fp, fhash), fextra in zip(files, file_extras, strict=True):
+        # Lexical relpath first (no syscalls); resolve symlinks only when fp is not
+        # plainly under base
+        try:
+            rel = os.path.relpath(os.path.abspath(fp), base_str)
+        except ValueError:  # different drives on Windows
+            rel = os.pardir
+        if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+            if base_resolved is None:
+                base_resolved = base.resolve()
+            try:
+                rel = fp.resolve().relative_to(base_resolved)
+            except ValueError:
+                rel = fp
+        entry: dict = {"path": str(rel), "file_hash": fhash}
+        if fextra:
+            entry.update(fextra)
         try:
-            rel = fp.resolve().relative_to(base.resolve())
-        except ValueError:
-            rel = fp
-        entries.append({"path": str(rel), "file_hash": fhash})
+            st = fp.stat()
+            entry["size"] = st.st_size
+            entry["mtime_ns"] = st.st_mtime_ns
+        except OSError:
+            pass
+        entries.append(entry)
     data: dict = {
         "source_url": source_url,
         "download_date": datetime.now(UTC).isoformat(),
@@ -42,6 +163,13 @@ def write_manifest(
     }
     if sources is not None:
         data["sources"] = sources
+    if extra:
+        data.update(extra)
     manifest_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(manifest_path, "w") as f:
-        json.dump(data, f, indent=2)
+    if orjson is not None:
+        manifest_path.write_bytes(
+            orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+        )
+    else:
+        with open(manifest_path, "w") as f:
+            f.write(_dumps_manifest(data))
@@ -1,4 +1,7 @@
 """Shared utilities for download scripts."""
+import functools
+import hashlib
+import importlib.util
 from pathlib import Path
 from urllib.parse import unquote, urlparse
 
@@ -6,9 +9,25 @@ import httpx
 
 from medicare_rag.config import DOWNLOAD_TIMEOUT
 
-_ALLOWED_SCHEMES = ("http", "https")
+_ALLOWED_SCHEMES = frozenset(("http", "https"))
+# Response bytes are written (and hashed) in chunks of this size rather than as they arrive
+STREAM_CHUNK_SIZE = 1 << 20
+# str.translate table deleting characters never allowed in a filename (controls, separators)
+_UNSAFE_FILENAME_CHARS = dict.fromkeys([*range(32), ord("/"), ord("\\")])
 
-__all__ = ("DOWNLOAD_TIMEOUT",)
+__all__ = ("DOWNLOAD_TIMEOUT", "HTTP_CLIENT_OPTIONS")
+
+# Keyword arguments for every download httpx.Client: a wide keep-alive pool so the many
+# PDF/ZIP requests to cms.gov reuse connections, and HTTP/2 when the optional h2 package
+# is installed (pip install "httpx[http2]").
+HTTP_CLIENT_OPTIONS: dict = {
+    "timeout": DOWNLOAD_TIMEOUT,
+    "follow_redirects": True,
+    "http2": importlib.util.find_spec("h2") is not None,
+    "limits": httpx.Limits(
+        max_keepalive_connections=32, max_connections=64, keepalive_expiry=60.0
+    ),
+}
 
 
 def _validate_download_url(url: str) -> None:
@@ -21,7 +40,7 @@ def _validate_download_url(url: str) -> None:
     if scheme not in _ALLOWED_SCHEMES:
         raise ValueError(
             f"Download URL scheme '{scheme or '(empty)'}' not allowed; "
-            f"only {', '.join(_ALLOWED_SCHEMES)} permitted"
+            f"only {', '.join(sorted(_ALLOWED_SCHEMES))} permitted"
         )
 
 
@@ -30,15 +49,95 @@ def stream_download(client: httpx.Client, url: str, dest: Path) -> None:
 
     Only http and https URLs are permitted; file:// and other schemes are rejected.
     """
+    _stream_to_file(client, url, dest, None)
+
+
+def stream_download_hashed(client: httpx.Client, url: str, dest: Path) -> str:
+    """Stream GET url to dest path and return the SHA-256 hex digest of the bytes written.
+
+    Hashes each chunk as it is written so the file does not have to be read back.
+    Same URL validation as stream_download.
+    """
+    h = hashlib.sha256()
+    _stream_to_file(client, url, dest, h)
+    return h.hexdigest()
+
+
+def html_anchors(html: str) -> list:
+    """Return the ``<a href>`` tags of *html* via BeautifulSoup's html.parser.
+
+    Fallback for when lxml is not installed. A SoupStrainer limits the tree to anchors, and
+    bs4 is imported here so the lxml path never loads it.
+    """
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("a", href=True))
+    return soup.find_all("a", href=True)
+
+
+def conditional_headers(validators: dict | None) -> dict[str, str]:
+    """Return If-None-Match / If-Modified-Since headers for prior "etag" / "last_modified"."""
+    headers: dict[str, str] = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def response_validators(headers: httpx.Headers | dict) -> dict[str, str]:
+    """Return the "etag" / "last_modified" validators present in response headers."""
+    return {
+        key: value
+        for key, value in (
+            ("etag", headers.get("etag")),
+            ("last_modified", headers.get("last-modified")),
+        )
+        if value
+    }
+
+
+def conditional_download(
+    client: httpx.Client, url: str, dest: Path, validators: dict | None = None
+) -> tuple[str, dict[str, str]] | None:
+    """Stream GET url to dest unless the server reports it unchanged.
+
+    validators: prior "etag" / "last_modified" values (e.g. a manifest entry); they are sent
+    as If-None-Match / If-Modified-Since. Returns None on 304 Not Modified (dest untouched),
+    else (SHA-256 of the bytes written, the response's "etag"/"last_modified" validators).
+    Same URL validation as stream_download.
+    """
+    h = hashlib.sha256()
+    resp_headers = _stream_to_file(client, url, dest, h, conditional_headers(validators) or None)
+    if resp_headers is None:
+        return None
+    return h.hexdigest(), response_validators(resp_headers)
+
+
+def _stream_to_file(
+    client: httpx.Client,
+    url: str,
+    dest: Path,
+    hasher,
+    headers: dict[str, str] | None = None,
+) -> httpx.Headers | None:
+    """Stream url into dest (feeding hasher if given); return response headers, or None on 304."""
     _validate_download_url(url)
-    with client.stream("GET", url) as r:
+    with client.stream("GET", url, headers=headers) as r:
+        if r.status_code == 304:
+            return None
         r.raise_for_status()
         with dest.open("wb") as f:
-            for chunk in r.iter_bytes():
+            for chunk in r.iter_bytes(chunk_size=STREAM_CHUNK_SIZE):
                 if chunk:
                     f.write(chunk)
+                    if hasher is not None:
+                        hasher.update(chunk)
+        return r.headers
 
 
+@functools.lru_cache(maxsize=1024)
 def sanitize_filename_from_url(url: str, default_basename: str) -> str:
     """Extract a safe filename from a URL (no path traversal).
 
@@ -48,12 +147,7 @@ def sanitize_filename_from_url(url: str, default_basename: str) -> str:
     """
     path = urlparse(url).path or ""
     name = unquote(path.rstrip("/").split("/")[-1].split("?")[0].strip())
-    if (
-        not name
-        or ".." in name
-        or "/" in name
-        or "\\" in name
-        or any(ord(ch) < 32 for ch in name)
-    ):
+    # One C-level pass: any unsafe character makes the translated copy shorter
+    if not name or ".." in name or len(name.translate(_UNSAFE_FILENAME_CHARS)) != len(name):
         return default_basename
     return name
@@ -1,111 +1,153 @@
 """Code files download: ICD-10-CM and HCPCS."""
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
 from urllib.parse import urljoin
 
 import httpx
-from bs4 import BeautifulSoup
 
 from medicare_rag.config import ICD10_CM_ZIP_URL
-from medicare_rag.download._manifest import file_sha256, write_manifest
+from medicare_rag.download._manifest import (
+    hash_files,
+    read_manifest,
+    write_manifest,
+)
 from medicare_rag.download._utils import (
-    DOWNLOAD_TIMEOUT,
+    HTTP_CLIENT_OPTIONS,
+    html_anchors,
     sanitize_filename_from_url,
-    stream_download,
+    stream_download_hashed,
 )
 
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
 logger = logging.getLogger(__name__)
 
 HCPCS_QUARTERLY_URL = "https://www.cms.gov/medicare/coding-billing/healthcare-common-procedure-system/quarterly-update"
 
 
+# A link to the latest HCPCS ZIP is the first <a href> whose text contains all of these
+# (case-insensitive), e.g. "January 2026 Alpha-Numeric HCPCS File (ZIP)"
+_HCPCS_LINK_TOKENS = ("alpha-numeric", "hcpcs", "zip")
+_LOWER = "translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')"
+_HCPCS_ZIP_XPATH = (
+    "//a[@href]["
+    + " and ".join(f"contains({_LOWER}, '{tok}')" for tok in _HCPCS_LINK_TOKENS)
+    + "]/@href"
+)
+
+
 def _latest_hcpcs_zip_url(client: httpx.Client) -> str | None:
-    """Parse CMS quarterly page and return URL of latest Alpha-Numeric HCPCS File (ZIP)."""
+    """Parse CMS quarterly page and return URL of latest Alpha-Numeric HCPCS File (ZIP).
+
+    Uses an lxml XPath query when lxml is installed, else BeautifulSoup (anchors only).
+    """
     resp = client.get(HCPCS_QUARTERLY_URL)
     resp.raise_for_status()
-    soup = BeautifulSoup(resp.text, "html.parser")
-    # Look for links like "January 2026 Alpha-Numeric HCPCS File (ZIP)"
-    for a in soup.find_all("a", href=True):
-        text = (a.get_text() or "").strip()
-        if (
-            "alpha-numeric" in text.lower()
-            and "hcpcs" in text.lower()
-            and "zip" in text.lower()
-        ):
+    if lxml_html is not None:
+        hits = lxml_html.fromstring(resp.text).xpath(_HCPCS_ZIP_XPATH)
+        return urljoin(HCPCS_QUARTERLY_URL, str(hits[0])) if hits else None
+    tok_a, tok_b, tok_c = _HCPCS_LINK_TOKENS
+    for a in html_anchors(resp.text):
+        text = (a.get_text() or "").lower()
+        if tok_a in text and tok_b in text and tok_c in text:
             return urljoin(HCPCS_QUARTERLY_URL, a["href"])
     return None
 
 
-def download_codes(raw_dir: Path, *, force: bool = False) -> None:
-    """Download ICD-10-CM (if URL set) and HCPCS code files."""
+def _zip_dest(out_dir: Path, url: str, default_name: str) -> Path:
+    """Return the local .zip path for url under out_dir (creating out_dir)."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    name = sanitize_filename_from_url(url, default_name)
+    if not name.lower().endswith(".zip"):
+        name += ".zip"
+    return out_dir / name
+
+
+def download_codes(
+    raw_dir: Path, *, force: bool = False, client: httpx.Client | None = None
+) -> None:
+    """Download ICD-10-CM (if URL set) and HCPCS code files.
+
+    When both sources need fetching, the two ZIPs are downloaded concurrently
+    over the shared client. *client*: optional open httpx.Client to reuse, as in
+    download_iom.
+    """
     out_base = raw_dir / "codes"
     out_base.mkdir(parents=True, exist_ok=True)
-    files_with_hashes: list[tuple[Path, str | None]] = []
+    manifest_path = out_base / "manifest.json"
+    # Prior hashes let unchanged files skip a full re-read (matched on size + mtime_ns)
+    prior_entries = read_manifest(manifest_path)
 
     sources_list: list[str] = [HCPCS_QUARTERLY_URL]
+    # (label, url, dest) per code set, in manifest order
+    targets: list[tuple[str, str, Path]] = []
 
-    with httpx.Client(timeout=DOWNLOAD_TIMEOUT, follow_redirects=True) as client:
+    with (
+        nullcontext(client) if client is not None else httpx.Client(**HTTP_CLIENT_OPTIONS)
+    ) as client:
         # HCPCS
-        hcpcs_dir = out_base / "hcpcs"
-        hcpcs_dir.mkdir(parents=True, exist_ok=True)
         zip_url = _latest_hcpcs_zip_url(client)
         if not zip_url:
             raise RuntimeError(
                 f"Could not find latest HCPCS ZIP link on {HCPCS_QUARTERLY_URL}"
             )
-        name = sanitize_filename_from_url(zip_url, "hcpcs.zip")
-        if not name.lower().endswith(".zip"):
-            name += ".zip"
-        dest = hcpcs_dir / name
-        if dest.exists() and not force:
-            logger.info(
-                "HCPCS file already exists: %s (use --force to re-download)", dest
-            )
-            try:
-                files_with_hashes.append((dest, file_sha256(dest)))
-            except OSError:
-                files_with_hashes.append((dest, None))
-        else:
-            logger.info("Downloading HCPCS %s -> %s", zip_url, dest)
-            stream_download(client, zip_url, dest)
-            try:
-                files_with_hashes.append((dest, file_sha256(dest)))
-            except OSError:
-                files_with_hashes.append((dest, None))
+        targets.append(("HCPCS", zip_url, _zip_dest(out_base / "hcpcs", zip_url, "hcpcs.zip")))
 
         # ICD-10-CM (optional; set ICD10_CM_ZIP_URL in env/.env to enable)
         icd_url = ICD10_CM_ZIP_URL
         if icd_url:
             sources_list.append(icd_url)
-            icd_dir = out_base / "icd10-cm"
-            icd_dir.mkdir(parents=True, exist_ok=True)
-            name = sanitize_filename_from_url(icd_url, "icd10cm.zip")
-            if not name.lower().endswith(".zip"):
-                name += ".zip"
-            dest = icd_dir / name
+            targets.append(
+                ("ICD-10-CM", icd_url, _zip_dest(out_base / "icd10-cm", icd_url, "icd10cm.zip"))
+            )
+        else:
+            logger.info(
+                "ICD-10-CM skipped: set ICD10_CM_ZIP_URL in .env to a CMS/CDC ZIP URL to download",
+            )
+
+        hashes: list[str | None] = [None] * len(targets)
+        pending: list[int] = []
+        existing: list[int] = []
+        for i, (label, url, dest) in enumerate(targets):
             if dest.exists() and not force:
                 logger.info(
-                    "ICD-10-CM file already exists: %s (use --force to re-download)",
-                    dest,
+                    "%s file already exists: %s (use --force to re-download)", label, dest
                 )
-                try:
-                    files_with_hashes.append((dest, file_sha256(dest)))
-                except OSError:
-                    files_with_hashes.append((dest, None))
+                existing.append(i)
             else:
-                logger.info("Downloading ICD-10-CM %s -> %s", icd_url, dest)
-                stream_download(client, icd_url, dest)
-                try:
-                    files_with_hashes.append((dest, file_sha256(dest)))
-                except OSError:
-                    files_with_hashes.append((dest, None))
+                logger.info("Downloading %s %s -> %s", label, url, dest)
+                pending.append(i)
+
+        existing_paths = [targets[i][2] for i in existing]
+        existing_hashes = hash_files(
+            existing_paths,
+            cached=[prior_entries.get(str(p.relative_to(out_base))) for p in existing_paths],
+        )
+        for i, h in zip(existing, existing_hashes, strict=True):
+            hashes[i] = h
+
+        if len(pending) > 1:
+            # Independent network-bound fetches; httpx.Client is safe to share across threads
+            with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+                futures = {
+                    i: pool.submit(stream_download_hashed, client, targets[i][1], targets[i][2])
+                    for i in pending
+                }
+                for i, fut in futures.items():
+                    hashes[i] = fut.result()
         else:
-            logger.info(
-                "ICD-10-CM skipped: set ICD10_CM_ZIP_URL in .env to a CMS/CDC ZIP URL to download",
-            )
+            for i in pending:
+                hashes[i] = stream_download_hashed(client, targets[i][1], targets[i][2])
 
-    manifest_path = out_base / "manifest.json"
+    files_with_hashes: list[tuple[Path, str | None]] = [
+        (dest, h) for (_, _, dest), h in zip(targets, hashes, strict=True)
+    ]
     write_manifest(
         manifest_path,
         HCPCS_QUARTERLY_URL,
@@ -1,61 +1,173 @@
 """IOM (Internet-Only Manuals) download: 100-02, 100-03, 100-04 chapter PDFs."""
 
+import json
 import logging
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial
 from pathlib import Path
+from typing import Any
 from urllib.parse import urljoin
 
 import httpx
-from bs4 import BeautifulSoup
 
-from medicare_rag.download._manifest import file_sha256, write_manifest
+from medicare_rag.download._manifest import (
+    file_sha256,
+    hash_files,
+    read_manifest,
+    write_manifest,
+)
 from medicare_rag.download._utils import (
-    DOWNLOAD_TIMEOUT,
+    HTTP_CLIENT_OPTIONS,
+    conditional_download,
+    conditional_headers,
+    html_anchors,
+    response_validators,
     sanitize_filename_from_url,
-    stream_download,
 )
 
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
 logger = logging.getLogger(__name__)
 
 IOM_INDEX_URL = "https://www.cms.gov/medicare/regulations-guidance/manuals/internet-only-manuals-ioms"
 TARGET_MANUALS = ("100-02", "100-03", "100-04")
+# Upper bound on concurrent chapter PDF downloads
+MAX_PARALLEL_DOWNLOADS = 8
+# Links parsed from the index and manual pages, keyed by page URL with the page's validators
+PAGE_CACHE_NAME = ".index_cache.json"
+# Anchors whose href (trimmed, case-insensitive) ends in ".pdf"; the filter runs inside libxml2
+_PDF_HREF_XPATH = (
+    "//a[@href][substring(translate(normalize-space(@href), 'PDF', 'pdf'),"
+    " string-length(normalize-space(@href)) - 3) = '.pdf']/@href"
+)
+_MANUAL_LINK_XPATH = (
+    "//a[@href]["
+    + " or ".join(f"normalize-space(.) = '{m}'" for m in TARGET_MANUALS)
+    + "]"
+)
 
 
-def download_iom(raw_dir: Path, *, force: bool = False) -> None:
-    """Download IOM chapter PDFs for manuals 100-02, 100-03, 100-04."""
+def _find_manual_links(html: str) -> dict[str, str]:
+    """Return {manual id: absolute URL} for TARGET_MANUALS links on the IOM index page."""
+    manual_links: dict[str, str] = {}
+    if lxml_html is not None:
+        for a in lxml_html.fromstring(html).xpath(_MANUAL_LINK_XPATH):
+            manual_links[a.text_content().strip()] = urljoin(IOM_INDEX_URL, a.get("href"))
+        return manual_links
+    for a in html_anchors(html):
+        text = (a.get_text() or "").strip()
+        if text in TARGET_MANUALS:
+            manual_links[text] = urljoin(IOM_INDEX_URL, a["href"])
+    return manual_links
+
+
+def _find_pdf_links(html: str, page_url: str) -> list[str]:
+    """Return absolute URLs of every .pdf link on a manual page, in page order."""
+    if lxml_html is not None:
+        return [
+            urljoin(page_url, str(href).strip())
+            for href in lxml_html.fromstring(html).xpath(_PDF_HREF_XPATH)
+        ]
+    pdf_links: list[str] = []
+    for a in html_anchors(html):
+        href = a["href"].strip()
+        if href.lower().endswith(".pdf"):
+            pdf_links.append(urljoin(page_url, href))
+    return pdf_links
+
+
+def _http_validators(entry: dict | None) -> dict[str, str] | None:
+    """Return the etag/last_modified recorded in a manifest entry, or None if it has neither."""
+    if not entry:
+        return None
+    found = {k: entry[k] for k in ("etag", "last_modified") if entry.get(k)}
+    return found or None
+
+
+def _read_page_cache(path: Path) -> dict[str, dict]:
+    """Load the page-links cache; a missing or unreadable file yields an empty cache."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _fetch_page_links(
+    client: httpx.Client,
+    url: str,
+    parse: Callable[[str], Any],
+    cache: dict[str, dict],
+) -> Any:
+    """GET url and return parse(html), reusing cached links when the server answers 304.
+
+    The request carries the cached ETag/Last-Modified for url; a fresh parse is stored in
+    *cache* together with the response's validators (when it has any).
+    """
+    cached = cache.get(url)
+    headers = conditional_headers(cached)
+    resp = client.get(url, headers=headers) if headers else client.get(url)
+    if cached and resp.status_code == 304:
+        logger.debug("Page unchanged, reusing cached links: %s", url)
+        return cached["links"]
+    resp.raise_for_status()
+    links = parse(resp.text)
+    validators = response_validators(resp.headers)
+    if validators:
+        cache[url] = {**validators, "links": links}
+    else:
+        cache.pop(url, None)
+    return links
+
+
+def download_iom(
+    raw_dir: Path, *, force: bool = False, client: httpx.Client | None = None
+) -> None:
+    """Download IOM chapter PDFs for manuals 100-02, 100-03, 100-04.
+
+    Missing PDFs are downloaded concurrently (up to MAX_PARALLEL_DOWNLOADS at a time) and
+    hashed as they stream. Each PDF's ETag/Last-Modified is kept in the manifest so that
+    with *force* unchanged PDFs are revalidated with a conditional GET instead of
+    re-fetched. Pass *client* to reuse an open httpx.Client (e.g. across sources);
+    otherwise one is created with HTTP_CLIENT_OPTIONS.
+    """
     out_base = raw_dir / "iom"
     out_base.mkdir(parents=True, exist_ok=True)
 
-    with httpx.Client(timeout=DOWNLOAD_TIMEOUT, follow_redirects=True) as client:
-        logger.info("Fetching IOM index %s", IOM_INDEX_URL)
-        resp = client.get(IOM_INDEX_URL)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
+    page_cache_path = out_base / PAGE_CACHE_NAME
+    page_cache = _read_page_cache(page_cache_path)
 
-        manual_links: dict[str, str] = {}
-        for a in soup.find_all("a", href=True):
-            text = (a.get_text() or "").strip()
-            if text in TARGET_MANUALS:
-                manual_links[text] = urljoin(IOM_INDEX_URL, a["href"])
+    with (
+        nullcontext(client) if client is not None else httpx.Client(**HTTP_CLIENT_OPTIONS)
+    ) as client:
+        logger.info("Fetching IOM index %s", IOM_INDEX_URL)
+        manual_links = _fetch_page_links(client, IOM_INDEX_URL, _find_manual_links, page_cache)
 
         if len(manual_links) < len(TARGET_MANUALS):
             found = set(manual_links)
             missing = set(TARGET_MANUALS) - found
             raise RuntimeError(f"Could not find manual links for: {missing}")
 
-        files_with_hashes: list[tuple[Path, str | None]] = []
+        # Manifest order: every discovered PDF in page order. Missing PDFs are queued as
+        # (index, url, dest) and fetched concurrently once all manual pages are parsed;
+        # indices of PDFs already on disk are collected for batch hashing.
+        files: list[Path] = []
+        hashes: list[str | None] = []
+        validators: list[dict | None] = []
+        pending: list[tuple[int, str, Path]] = []
+        existing: list[int] = []
+        prior_entries = read_manifest(out_base / "manifest.json")
 
         for manual_id, manual_url in manual_links.items():
             logger.info("Fetching manual %s: %s", manual_id, manual_url)
-            resp = client.get(manual_url)
-            resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, "html.parser")
-
-            pdf_links: list[str] = []
-            for a in soup.find_all("a", href=True):
-                href = a["href"].strip()
-                if href.lower().endswith(".pdf"):
-                    full_url = urljoin(manual_url, href)
-                    pdf_links.append(full_url)
+            pdf_links = _fetch_page_links(
+                client, manual_url, partial(_find_pdf_links, page_url=manual_url), page_cache
+            )
 
             manual_dir = out_base / manual_id
             manual_dir.mkdir(parents=True, exist_ok=True)
@@ -77,28 +189,60 @@ def download_iom(raw_dir: Path, *, force: bool = False) -> None:
                 used_names.add(name)
                 dest = manual_dir / name
 
+                prior = prior_entries.get(str(dest.relative_to(out_base)))
                 if dest.exists() and not force:
                     logger.debug("Skipping (exists): %s", dest)
-                    try:
-                        h = file_sha256(dest)
-                    except OSError:
-                        h = None
-                    files_with_hashes.append((dest, h))
-                    continue
-
-                logger.info("Downloading %s -> %s", pdf_url, dest)
-                stream_download(client, pdf_url, dest)
-                try:
+                    existing.append(len(files))
+                else:
+                    pending.append((len(files), pdf_url, dest))
+                files.append(dest)
+                hashes.append(None)
+                validators.append(_http_validators(prior))
+
+        page_cache_path.write_text(json.dumps(page_cache), encoding="utf-8")
+
+        def _fetch(job: tuple[int, str, Path]) -> tuple[int, str, dict]:
+            i, pdf_url, dest = job
+            prior = prior_entries.get(str(dest.relative_to(out_base)))
+            if dest.exists() and _http_validators(prior):
+                # --force on a file we fetched before: let the server answer 304 if unchanged.
+                # The local copy must still match its recorded hash to be kept.
+                logger.info("Revalidating %s -> %s", pdf_url, dest)
+                result = conditional_download(client, pdf_url, dest, prior)
+                if result is None:
                     h = file_sha256(dest)
-                except OSError:
-                    h = None
-                files_with_hashes.append((dest, h))
+                    if h == prior.get("file_hash"):
+                        return i, h, _http_validators(prior)
+                    logger.info("Local copy %s does not match manifest; re-downloading", dest)
+                else:
+                    return i, *result
+            logger.info("Downloading %s -> %s", pdf_url, dest)
+            return i, *conditional_download(client, pdf_url, dest)
+
+        # PDFs already on disk are hashed together on a thread pool, reusing the previous
+        # manifest's hash when size and mtime_ns are unchanged
+        existing_paths = [files[i] for i in existing]
+        existing_hashes = hash_files(
+            existing_paths,
+            cached=[prior_entries.get(str(p.relative_to(out_base))) for p in existing_paths],
+        )
+        for i, h in zip(existing, existing_hashes, strict=True):
+            hashes[i] = h
+
+        if pending:
+            # Latency-bound fetches over the shared keep-alive client; capped to stay polite to CMS
+            workers = min(MAX_PARALLEL_DOWNLOADS, len(pending))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for i, h, v in pool.map(_fetch, pending):
+                    hashes[i] = h
+                    validators[i] = v or None
 
         manifest_path = out_base / "manifest.json"
         write_manifest(
             manifest_path,
             IOM_INDEX_URL,
-            files_with_hashes,
+            list(zip(files, hashes, strict=True)),
             base_dir=out_base,
+            file_extras=validators,
         )
         logger.info("Wrote manifest to %s", manifest_path)
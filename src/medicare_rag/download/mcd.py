@@ -1,39 +1,197 @@
 """MCD bulk data download: Download All Data ZIP."""
 
+import hashlib
 import json
 import logging
+import os
 import shutil
+import struct
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
 from tempfile import NamedTemporaryFile
+from typing import BinaryIO
 
 import httpx
 
-from medicare_rag.download._manifest import file_sha256, write_manifest
-from medicare_rag.download._utils import DOWNLOAD_TIMEOUT
+from medicare_rag.download._manifest import write_manifest
+from medicare_rag.download._utils import HTTP_CLIENT_OPTIONS, STREAM_CHUNK_SIZE
+
+try:
+    from isal import isal_zlib
+except ImportError:
+    isal_zlib = None
 
 logger = logging.getLogger(__name__)
 
 MCD_ALL_DATA_URL = "https://downloads.cms.gov/medicare-coverage-database/downloads/exports/all_data.zip"
+# Upper bound on threads extracting archive entries concurrently
+MAX_EXTRACT_WORKERS = min(8, os.cpu_count() or 1)
+
+
+# Local file header: signature, then the name and extra-field lengths at offsets 26 and 28
+_LOCAL_HEADER_SIZE = 30
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+_LOCAL_HEADER_LENGTHS = struct.Struct("<HH")
+
+
+def _inflate_member_isal(zf: zipfile.ZipFile, info: zipfile.ZipInfo, dst: BinaryIO) -> str:
+    """Inflate a DEFLATE entry into *dst* with ISA-L, reading *zf*'s raw stream; return SHA-256.
+
+    The stored CRC-32 and size are checked as ``ZipFile.open`` would. zipfile itself is not
+    touched, so other threads using it keep the stdlib codec.
+    """
+    fp = zf.fp
+    fp.seek(info.header_offset)
+    header = fp.read(_LOCAL_HEADER_SIZE)
+    if len(header) != _LOCAL_HEADER_SIZE or header[:4] != _LOCAL_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f"Bad local file header for {info.filename!r}")
+    name_len, extra_len = _LOCAL_HEADER_LENGTHS.unpack_from(header, 26)
+    fp.seek(name_len + extra_len, os.SEEK_CUR)
+    inflater = isal_zlib.decompressobj(-15)
+    h = hashlib.sha256()
+    crc = size = 0
+    remaining = info.compress_size
+    while remaining:
+        raw = fp.read(min(STREAM_CHUNK_SIZE, remaining))
+        if not raw:
+            raise zipfile.BadZipFile(f"Truncated data for {info.filename!r}")
+        remaining -= len(raw)
+        chunk = inflater.decompress(raw)
+        if not remaining:
+            chunk += inflater.flush()
+        if chunk:
+            dst.write(chunk)
+            h.update(chunk)
+            crc = isal_zlib.crc32(chunk, crc)
+            size += len(chunk)
+    if crc != info.CRC or size != info.file_size:
+        raise zipfile.BadZipFile(f"Bad CRC-32 for file {info.filename!r}")
+    return h.hexdigest()
+
+
+def _extract_member(
+    zf: zipfile.ZipFile, info: zipfile.ZipInfo, target: Path, out_dir: Path
+) -> str | None:
+    """Extract one validated entry; for a file entry, return the SHA-256 of its bytes.
+
+    Unencrypted DEFLATE entries are inflated with ISA-L when isal is installed.
+    """
+    if info.is_dir():
+        zf.extract(info, out_dir)
+        return None
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if (
+        isal_zlib is not None
+        and info.compress_type == zipfile.ZIP_DEFLATED
+        and not info.flag_bits & 0x1
+    ):
+        with open(target, "wb") as dst:
+            return _inflate_member_isal(zf, info, dst)
+    h = hashlib.sha256()
+    with zf.open(info) as src, open(target, "wb") as dst:
+        while chunk := src.read(STREAM_CHUNK_SIZE):
+            dst.write(chunk)
+            h.update(chunk)
+    return h.hexdigest()
+
 
+def _member_target(out_dir: Path, info: zipfile.ZipInfo) -> Path:
+    """Path ZipFile.extract() would write *info* to under *out_dir*.
 
-def _safe_extract_zip(zf: zipfile.ZipFile, out_dir: Path) -> list[str]:
-    """Extract zip entries, validating paths to prevent zip slip. Returns list of extracted entry names."""
+    As in zipfile, separators are normalized, drive letters and empty, ``.`` and ``..``
+    components are dropped, and on Windows invalid characters are replaced.
+    """
+    arcname = info.filename.replace("/", os.path.sep)
+    if os.path.altsep:
+        arcname = arcname.replace(os.path.altsep, os.path.sep)
+    arcname = os.path.splitdrive(arcname)[1]
+    invalid_parts = ("", os.path.curdir, os.path.pardir)
+    arcname = os.path.sep.join(p for p in arcname.split(os.path.sep) if p not in invalid_parts)
+    if os.path.sep == "\\":
+        arcname = zipfile.ZipFile._sanitize_windows_name(arcname, os.path.sep)
+    return Path(os.path.normpath(os.path.join(out_dir, arcname)))
+
+
+def _extract_shard(
+    zip_path: str, shard: list[tuple[zipfile.ZipInfo, Path]], out_dir: Path
+) -> dict[str, str]:
+    """Extract a shard of entries through a private ZipFile handle (ZipFile is not thread-safe)."""
+    hashes: dict[str, str] = {}
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        for info, target in shard:
+            h = _extract_member(zf, info, target, out_dir)
+            if h is not None:
+                hashes[info.filename] = h
+    return hashes
+
+
+def _safe_extract_zip(
+    zf: zipfile.ZipFile,
+    out_dir: Path,
+    hashes: dict[str, str] | None = None,
+    *,
+    workers: int = MAX_EXTRACT_WORKERS,
+) -> list[str]:
+    """Extract zip entries, validating paths to prevent zip slip.
+
+    Returns the list of extracted entry names.
+
+    File entries are copied out in one pass that also computes their SHA-256; if *hashes* is
+    given they are stored in it by entry name, so they need not be re-read afterwards. When
+    the archive is backed by a file on disk, entries are split across up to *workers*
+    threads, each with its own ZipFile handle, to overlap decompression and small writes.
+    """
     out_dir_resolved = out_dir.resolve()
-    names = []
+    # Keyed by target so a repeated entry name is written once, by its last entry, as a
+    # serial ZipFile.extract() of every entry would leave it
+    by_target: dict[Path, tuple[zipfile.ZipInfo, Path]] = {}
     for info in zf.infolist():
         # Resolve path and ensure it stays under out_dir
-        target = (out_dir / info.filename).resolve()
-        if not target.is_relative_to(out_dir_resolved):
+        if not (out_dir / info.filename).resolve().is_relative_to(out_dir_resolved):
             logger.warning("Skipping zip slip attempt: %s", info.filename)
             continue
-        zf.extract(info, out_dir)
-        names.append(info.filename)
-    return names
+        target = _member_target(out_dir, info).resolve()
+        if not target.is_relative_to(out_dir_resolved) or target == out_dir_resolved:
+            logger.warning("Skipping zip entry with no usable name: %s", info.filename)
+            continue
+        by_target[target] = (info, target)
+    members = list(by_target.values())
+
+    found: dict[str, str] = {}
+    workers = min(workers, len(members))
+    if workers > 1 and isinstance(zf.filename, str):
+        # Directory entries first, serially, so workers never race zipfile's mkdir
+        files = []
+        for info, target in members:
+            if info.is_dir():
+                _extract_member(zf, info, target, out_dir)
+            else:
+                files.append((info, target))
+        shards = [files[k::workers] for k in range(workers)]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for shard_hashes in pool.map(
+                lambda shard: _extract_shard(zf.filename, shard, out_dir), shards
+            ):
+                found.update(shard_hashes)
+    else:
+        for info, target in members:
+            h = _extract_member(zf, info, target, out_dir)
+            if h is not None:
+                found[info.filename] = h
+    if hashes is not None:
+        hashes.update(found)
+    return [info.filename for info, _ in members]
+
 
+def download_mcd(
+    raw_dir: Path, *, force: bool = False, client: httpx.Client | None = None
+) -> None:
+    """Download MCD 'Download All Data' ZIP and extract to raw_dir/mcd/.
 
-def download_mcd(raw_dir: Path, *, force: bool = False) -> None:
-    """Download MCD 'Download All Data' ZIP and extract to raw_dir/mcd/."""
+    *client*: optional open httpx.Client to reuse, as in download_iom.
+    """
     out_dir = raw_dir / "mcd"
     manifest_path = out_dir / "manifest.json"
 
@@ -59,13 +217,17 @@ def download_mcd(raw_dir: Path, *, force: bool = False) -> None:
     logger.info("Downloading %s", MCD_ALL_DATA_URL)
     tmp_path: Path | None = None
     try:
-        with httpx.Client(timeout=DOWNLOAD_TIMEOUT) as client:
+        with (
+            nullcontext(client) if client is not None else httpx.Client(**HTTP_CLIENT_OPTIONS)
+        ) as client:
             with client.stream("GET", MCD_ALL_DATA_URL) as response:
                 response.raise_for_status()
+                archive_hash = hashlib.sha256()
                 with NamedTemporaryFile(suffix=".zip", delete=False) as tmp:
-                    for chunk in response.iter_bytes():
+                    for chunk in response.iter_bytes(chunk_size=STREAM_CHUNK_SIZE):
                         if chunk:
                             tmp.write(chunk)
+                            archive_hash.update(chunk)
                     tmp_path = Path(tmp.name)
 
         if force and out_dir.exists():
@@ -74,25 +236,22 @@ def download_mcd(raw_dir: Path, *, force: bool = False) -> None:
             )
             shutil.rmtree(out_dir)
         out_dir.mkdir(parents=True, exist_ok=True)
+        member_hashes: dict[str, str] = {}
         with zipfile.ZipFile(tmp_path, "r") as zf:
-            names = _safe_extract_zip(zf, out_dir)
+            names = _safe_extract_zip(zf, out_dir, member_hashes)
         logger.info("Extracted %d entries to %s", len(names), out_dir)
 
-        files_with_hashes: list[tuple[Path, str | None]] = []
-        for name in names:
-            full = out_dir / name
-            if full.is_file():
-                try:
-                    h = file_sha256(full)
-                except OSError:
-                    h = None
-                files_with_hashes.append((full, h))
+        # Hashes were computed during extraction; directory entries have none and are skipped
+        files_with_hashes: list[tuple[Path, str | None]] = [
+            (out_dir / name, member_hashes[name]) for name in names if name in member_hashes
+        ]
 
         write_manifest(
             manifest_path,
             MCD_ALL_DATA_URL,
             files_with_hashes,
             base_dir=out_dir,
+            extra={"archive_sha256": archive_hash.hexdigest()},
         )
         logger.info("Wrote manifest to %s", manifest_path)
     finally:
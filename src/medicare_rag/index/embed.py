@@ -1,10 +1,46 @@
 """Local sentence-transformers embeddings (Phase 3)."""
 from langchain_core.embeddings import Embeddings
 
-from medicare_rag.config import EMBEDDING_MODEL
+from medicare_rag.config import (
+    EMBEDDING_BACKEND,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_DEVICE,
+    EMBEDDING_MODEL,
+)
+
+# Embeddings are L2-normalized before storage. Stored chunk hashes record this (see
+# store._content_hash), so changing it re-embeds every chunk instead of mixing vectors.
+NORMALIZE_EMBEDDINGS = True
+
+
+def _resolve_device(device: str = EMBEDDING_DEVICE) -> str:
+    """Map ``auto`` to ``cuda`` when torch sees a GPU, else ``cpu``; pass other values through."""
+    if device != "auto":
+        return device
+    try:
+        import torch
+    except ImportError:
+        return "cpu"
+    return "cuda" if torch.cuda.is_available() else "cpu"
 
 
 def get_embeddings() -> Embeddings:
-    """Return a LangChain-compatible Embeddings instance using local sentence-transformers."""
+    """Return a LangChain-compatible Embeddings instance using local sentence-transformers.
+
+    Documents are encoded in batches of ``EMBEDDING_BATCH_SIZE`` on the device chosen by
+    ``EMBEDDING_DEVICE``. ``EMBEDDING_BACKEND=onnx`` (or ``openvino``) runs the model through
+    the corresponding sentence-transformers backend, which needs the ``onnx`` extra.
+    """
     from langchain_huggingface import HuggingFaceEmbeddings
-    return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+
+    model_kwargs: dict = {"device": _resolve_device()}
+    if EMBEDDING_BACKEND != "torch":
+        model_kwargs["backend"] = EMBEDDING_BACKEND
+    return HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL,
+        model_kwargs=model_kwargs,
+        encode_kwargs={
+            "batch_size": EMBEDDING_BATCH_SIZE,
+            "normalize_embeddings": NORMALIZE_EMBEDDINGS,
+        },
+    )
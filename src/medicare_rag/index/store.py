@@ -4,8 +4,11 @@ Provides incremental upsert by content hash so that unchanged chunks are
 not re-embedded on repeated ingestion runs.
 """
 import hashlib
-from typing import TYPE_CHECKING
+import logging
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
 
+import numpy as np
 from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
 
@@ -16,8 +19,12 @@ from medicare_rag.config import (
     CHROMA_DIR,
     CHROMA_UPSERT_BATCH_SIZE,
     COLLECTION_NAME,
+    CONTENT_HASH_ALGORITHM,
     GET_META_BATCH_SIZE,
 )
+from medicare_rag.index.embed import NORMALIZE_EMBEDDINGS
+
+logger = logging.getLogger(__name__)
 
 
 def get_raw_collection(store: "Chroma"):
@@ -54,12 +61,54 @@ def _chunk_id(doc: Document) -> str:
     return doc_id
 
 
+def _hash_factory(name: str) -> Callable[..., Any]:
+    """Return a hashlib-style constructor for *name*, falling back to SHA-256.
+
+    ``xxh3`` (xxhash) and ``blake3`` are optional; the hash is only a change-detection
+    fingerprint, so collision resistance is not needed.
+    """
+    if name == "xxh3":
+        try:
+            import xxhash
+        except ImportError:
+            pass
+        else:
+            return xxhash.xxh3_128
+    elif name == "blake3":
+        try:
+            from blake3 import blake3
+        except ImportError:
+            pass
+        else:
+            return blake3
+    elif name == "sha256":
+        return hashlib.sha256
+    logger.warning("Content hash %r is unavailable; using sha256", name)
+    return hashlib.sha256
+
+
+_new_content_hasher = _hash_factory(CONTENT_HASH_ALGORITHM)
+
+
 def _content_hash(doc: Document) -> str:
-    """SHA-256 of ``page_content + doc_id + chunk_index`` for change detection."""
+    """Hash of ``page_content + doc_id + chunk_index`` for change detection.
+
+    Uses ``CONTENT_HASH_ALGORITHM`` (SHA-256 by default). With ``NORMALIZE_EMBEDDINGS`` a
+    ``normalized`` tag is hashed too, so chunks embedded before normalization was turned on
+    (or after it is turned off) count as changed and are re-embedded.
+    """
     doc_id = doc.metadata.get("doc_id", "unknown")
     chunk_index = doc.metadata.get("chunk_index", 0)
-    payload = f"{doc.page_content}\x00{doc_id}\x00{chunk_index}"
-    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    # Feed the parts separately rather than building one joined payload string; the digest
+    # is identical to hashing f"{page_content}\x00{doc_id}\x00{chunk_index}\x00normalized".
+    h = _new_content_hasher(doc.page_content.encode("utf-8"))
+    h.update(b"\x00")
+    h.update(str(doc_id).encode("utf-8"))
+    h.update(b"\x00")
+    h.update(str(chunk_index).encode("utf-8"))
+    if NORMALIZE_EMBEDDINGS:
+        h.update(b"\x00normalized")
+    return h.hexdigest()
 
 
 def get_or_create_chroma(embeddings: Embeddings) -> "Chroma":
@@ -74,6 +123,25 @@ def get_or_create_chroma(embeddings: Embeddings) -> "Chroma":
     )
 
 
+def _fetch_stored_hashes(collection, ids: list[str]) -> dict[str, str]:
+    """Return {id: content_hash} for those of *ids* present in the collection.
+
+    Ids are looked up in GET_META_BATCH_SIZE batches to avoid SQLite "too many SQL variables".
+    """
+    id_to_hash: dict[str, str] = {}
+    for start in range(0, len(ids), GET_META_BATCH_SIZE):
+        batch = collection.get(
+            ids=ids[start : start + GET_META_BATCH_SIZE],
+            include=["metadatas"],
+        )
+        ids_batch = batch.get("ids") or []
+        metadatas_list = batch.get("metadatas") or []
+        for i, id_ in enumerate(ids_batch):
+            meta = (metadatas_list[i] if i < len(metadatas_list) else None) or {}
+            id_to_hash[id_] = meta.get("content_hash", "")
+    return id_to_hash
+
+
 def upsert_documents(
     store: "Chroma",
     documents: list[Document],
@@ -85,50 +153,37 @@ def upsert_documents(
     if not documents:
         return 0, 0
 
-    # We use the LangChain Chroma wrapper's _collection for batched get(include=["metadatas"])
-    # and upsert() to support incremental indexing by content_hash. Batched get avoids
-    # SQLite "too many SQL variables" when the collection is large.
+    # We use the LangChain Chroma wrapper's _collection for get(ids=..., include=["metadatas"])
+    # and upsert() to support incremental indexing by content_hash. Only the ids of the
+    # incoming chunks are looked up; ids missing from the collection are treated as new.
     collection = get_raw_collection(store)
-    id_to_hash: dict[str, str] = {}
-    offset = 0
-    while True:
-        batch = collection.get(
-            include=["metadatas"],
-            limit=GET_META_BATCH_SIZE,
-            offset=offset,
-        )
-        ids_batch = batch.get("ids") or []
-        metadatas_list = batch.get("metadatas") or []
-        for i, id_ in enumerate(ids_batch):
-            meta = (metadatas_list[i] if i < len(metadatas_list) else None) or {}
-            id_to_hash[id_] = meta.get("content_hash", "")
-        if len(ids_batch) < GET_META_BATCH_SIZE:
-            break
-        offset += len(ids_batch)
-
-    to_upsert: list[Document] = []
-    for doc in documents:
-        cid = _chunk_id(doc)
+    chunk_ids = [_chunk_id(doc) for doc in documents]
+    candidate_ids = list(dict.fromkeys(chunk_ids))
+    id_to_hash = _fetch_stored_hashes(collection, candidate_ids)
+
+    # Chunk ids and content hashes are computed once per document; the diff pass fills
+    # parallel ids/texts/metadatas lists directly so nothing is re-derived afterwards.
+    ids: list[str] = []
+    texts: list[str] = []
+    metadatas: list[dict] = []
+    for cid, doc in zip(chunk_ids, documents, strict=True):
         new_hash = _content_hash(doc)
         if id_to_hash.get(cid) == new_hash:
             continue
-        to_upsert.append(doc)
+        meta = dict(doc.metadata)
+        meta["content_hash"] = new_hash
+        ids.append(cid)
+        texts.append(doc.page_content)
+        metadatas.append(_sanitize_metadata(meta))
 
-    skipped = len(documents) - len(to_upsert)
-    if not to_upsert:
+    skipped = len(documents) - len(ids)
+    if not ids:
         return 0, skipped
 
-    texts = [d.page_content for d in to_upsert]
-    vectors = embeddings.embed_documents(texts)
-
-    ids = [_chunk_id(d) for d in to_upsert]
-    metadatas = []
-    for d in to_upsert:
-        meta = dict(d.metadata)
-        meta["content_hash"] = _content_hash(d)
-        metadatas.append(_sanitize_metadata(meta))
+    # One contiguous float32 matrix; Chroma takes array slices without per-row conversion.
+    vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
 
-    for i in range(0, len(to_upsert), CHROMA_UPSERT_BATCH_SIZE):
+    for i in range(0, len(ids), CHROMA_UPSERT_BATCH_SIZE):
         end = i + CHROMA_UPSERT_BATCH_SIZE
         collection.upsert(
             ids=ids[i:end],
@@ -136,4 +191,4 @@ def upsert_documents(
             metadatas=metadatas[i:end],
             documents=texts[i:end],
         )
-    return len(to_upsert), skipped
+    return len(ids), skipped
@@ -12,20 +12,90 @@ cardiac_rehab and billing topics).
 Topic definitions are loaded from DATA_DIR/topic_definitions.json when
 present; otherwise the package default (medicare_rag/data/topic_definitions.json)
 is used.
+
+Each pattern's required literal (e.g. ``cardiac`` for ``cardiac\\s*rehab``)
+is checked before its regex runs, and only patterns whose literal occurs are
+searched.  When ``pyahocorasick`` is installed the literals for all topics are
+found in one Aho-Corasick pass; otherwise each is a plain substring test.
+Keyword patterns, a literal word or phrase optionally bounded by ``\\b`` (``\\bDME\\b``,
+``wheelchair``), are then decided from the literal's occurrences and their neighbouring
+characters without running a regex.
+
+With ``TOPIC_REGEX_ENGINE=re2`` (and ``google-re2`` installed) patterns are
+compiled as linear-time RE2 automata, which release the GIL while matching,
+so large batches are tagged on a thread pool.
+``TOPIC_REGEX_ENGINE=pcre2`` uses JIT-compiled PCRE2 patterns.  With
+``TOPIC_REGEX_ENGINE=hyperscan`` every topic's patterns are compiled into one
+Hyperscan database and each document is scanned once for all of them; the
+compiled database is cached in DATA_DIR so later processes skip compilation.
+PCRE2 and Hyperscan keep the Unicode ``\\s``/``\\b`` of ``re``.
 """
 
+import hashlib
 import json
 import logging
+import multiprocessing
+import os
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
+from tempfile import NamedTemporaryFile
 
+import numpy as np
 from langchain_core.documents import Document
 
-from medicare_rag.config import DATA_DIR
+from medicare_rag.config import DATA_DIR, TOPIC_PROCESS_WORKERS, TOPIC_REGEX_ENGINE
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    import pcre2
+except ImportError:
+    pcre2 = None
 
 logger = logging.getLogger(__name__)
 
+# Batches at least this large are tagged on a thread pool when the regex engine releases the GIL
+PARALLEL_MIN_DOCUMENTS = 256
+# Batches at least this large are tagged on a process pool when the regex engine holds the GIL
+PROCESS_POOL_MIN_DOCUMENTS = 2048
+# Worker processes for that pool (TOPIC_PROCESS_WORKERS; off unless at least 2)
+MAX_TOPIC_WORKERS = TOPIC_PROCESS_WORKERS
+# Documents joined into one buffer per Aho-Corasick literal scan
+BATCH_SCAN_DOCUMENTS = 1024
+# Separates documents in the joined buffer; required literals are ASCII runs without it
+_BATCH_SEPARATOR = "\x00"
+# Most recent assign_topics results kept, keyed by a digest of the page content
+TOPIC_CACHE_SIZE = 4096
+
+if TOPIC_REGEX_ENGINE == "re2" and re2 is None:
+    logger.warning("TOPIC_REGEX_ENGINE=re2 but google-re2 is not installed; using re")
+elif TOPIC_REGEX_ENGINE == "hyperscan" and hyperscan is None:
+    logger.warning("TOPIC_REGEX_ENGINE=hyperscan but hyperscan is not installed; using re")
+elif TOPIC_REGEX_ENGINE == "pcre2" and pcre2 is None:
+    logger.warning("TOPIC_REGEX_ENGINE=pcre2 but pcre2 is not installed; using re")
+elif TOPIC_REGEX_ENGINE not in ("re", "re2", "pcre2", "hyperscan"):
+    logger.warning("Unknown TOPIC_REGEX_ENGINE=%r; using re", TOPIC_REGEX_ENGINE)
+_USE_RE2 = TOPIC_REGEX_ENGINE == "re2" and re2 is not None
+_USE_PCRE2 = TOPIC_REGEX_ENGINE == "pcre2" and pcre2 is not None
+_USE_HYPERSCAN = TOPIC_REGEX_ENGINE == "hyperscan" and hyperscan is not None
+
 
 @dataclass(frozen=True)
 class TopicDef:
@@ -36,10 +106,261 @@ class TopicDef:
     patterns: tuple[re.Pattern[str], ...]
     summary_prefix: str = ""
     min_pattern_matches: int = 1
+    # Per pattern: the form searched against _fold()ed text (lowercased, without IGNORECASE,
+    # with re); empty means search ``patterns``, which match unfolded text
+    _folded: tuple[re.Pattern[str], ...] = ()
+    # Per pattern: a lowercase literal every match must contain, or None if none is known
+    literals: tuple[str | None, ...] = ()
+    # Per pattern: (lowercase literal, \b before, \b after) for keyword patterns, else None
+    keywords: tuple[tuple[str, bool, bool] | None, ...] = ()
+    # Non-keyword patterns as one alternation for folded text, for topics that need a single
+    # match (else None)
+    fused: re.Pattern[str] | None = None
+
+
+def _compile_pattern(pattern: str) -> re.Pattern[str]:
+    """Compile one case-insensitive pattern with the configured engine.
+
+    With RE2 or PCRE2 the returned object has the same ``search``/``pattern`` API as
+    ``re.Pattern``; patterns the engine does not support (for RE2, backreferences and
+    lookaround) fall back to ``re``. PCRE2 patterns are JIT-compiled in Unicode mode.
+    """
+    if _USE_RE2:
+        try:
+            return re2.compile(f"(?i){pattern}")
+        except Exception:
+            logger.debug("RE2 cannot compile %r; using re", pattern)
+    elif _USE_PCRE2:
+        try:
+            return pcre2.compile(pattern, flags=pcre2.IGNORECASE | pcre2.UNICODE, jit=True)
+        except Exception:
+            logger.debug("PCRE2 cannot compile %r; using re", pattern)
+    return re.compile(pattern, re.IGNORECASE)
 
 
 def _compile(raw: list[str]) -> tuple[re.Pattern[str], ...]:
-    return tuple(re.compile(p, re.IGNORECASE) for p in raw)
+    return tuple(_compile_pattern(p) for p in raw)
+
+
+def _compile_folded_pattern(pattern: str) -> re.Pattern[str]:
+    """Compile *pattern* for searching :func:`_fold`ed text only.
+
+    With ``re`` the pattern is lowercased and compiled without IGNORECASE, which lets sre use
+    its literal-prefix search; see :func:`_lowercase_pattern`. RE2 and PCRE2 patterns, and
+    patterns that cannot be lowercased safely, are the case-insensitive :func:`_compile_pattern`.
+    """
+    compiled = _compile_pattern(pattern)
+    if isinstance(compiled, re.Pattern):
+        lowered = _lowercase_pattern(pattern)
+        if lowered is not None:
+            try:
+                return re.compile(lowered)
+            except re.error:
+                pass
+    return compiled
+
+
+# Escapes that spell a code point (or backreference) whose case lowercasing cannot adjust
+_CODEPOINT_ESCAPE = re.compile(r"\\[xuUN0-9]")
+
+
+def _lowercase_pattern(pattern: str) -> str | None:
+    """Lowercase the literal text of ASCII *pattern* so it matches folded text case-sensitively.
+
+    Escaped characters are kept as written (``\\S`` must not become ``\\s``). Returns None, so
+    the caller keeps IGNORECASE, for non-ASCII patterns, code-point escapes such as ``\\x41``,
+    and class ranges whose endpoints would change meaning when lowercased (``[A-z]``).
+    """
+    if not pattern.isascii() or _CODEPOINT_ESCAPE.search(pattern):
+        return None
+    out: list[str] = []
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            out.append(pattern[i : i + 2])
+            i += 2
+            continue
+        if in_class:
+            if c == "]" and out[-1] != "[" and out[-1] != "[^":
+                in_class = False
+            elif c == "-" and out[-1] not in ("[", "[^") and pattern[i + 1 : i + 2] not in "]":
+                lo, hi = pattern[i - 1], pattern[i + 1]
+                if len(out[-1]) > 1 or hi == "\\":
+                    return None  # escaped range endpoint
+                if lo.isalpha() != hi.isalpha() or lo.isupper() != hi.isupper():
+                    return None
+        elif c == "[":
+            in_class = True
+            if pattern[i + 1 : i + 2] == "^":
+                out.append("[^")
+                i += 2
+                continue
+        out.append(c.lower())
+        i += 1
+    return "".join(out)
+
+
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+
+def _fuse(raw: list[str]) -> re.Pattern[str] | None:
+    """Compile *raw* into one ``(?:p1)|(?:p2)|...`` regex; its search() hits iff any pattern's does.
+
+    Returns None when fusing could change meaning (numbered or named backreferences would see
+    other patterns' groups) or the alternation does not compile (e.g. mid-pattern flags).
+    """
+    if not raw or any(_BACKREFERENCE.search(p) for p in raw):
+        return None
+    alternation = "|".join(f"(?:{p})" for p in raw)
+    try:
+        re.compile(alternation, re.IGNORECASE)
+    except re.error:
+        return None
+    return _compile_folded_pattern(alternation)
+
+
+_QUANTIFIERS = frozenset("*+?{")
+_ZERO_WIDTH_ESCAPES = frozenset("bBAZ")
+# Inline verbose flag, e.g. "(?x)" or "(?ix)": whitespace in the pattern is not literal
+_VERBOSE_FLAG = re.compile(r"\(\?[aiLmsu]*x")
+
+
+def _skip_group(pattern: str, i: int, open_ch: str, close_ch: str) -> int:
+    """Return the index just past the *close_ch* matching the *open_ch* at pattern[i]."""
+    depth = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == open_ch:
+            depth += 1
+        elif c == close_ch:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def _required_literal(pattern: str) -> str | None:
+    """Return the longest lowercase literal that every match of *pattern* must contain.
+
+    Only top-level literal runs are considered; groups, classes, ``.`` and class escapes
+    end a run, a quantifier drops the character it applies to, and zero-width ``\\b``
+    etc. are transparent. Returns None for top-level alternation, verbose patterns, or
+    when no run of at least two characters remains.
+    """
+    if _VERBOSE_FLAG.search(pattern):
+        return None
+    runs: list[str] = []
+    run: list[str] = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            nxt = pattern[i + 1 : i + 2]
+            i += 2
+            if nxt in _ZERO_WIDTH_ESCAPES:
+                continue
+            if nxt and not nxt.isalnum():
+                run.append(nxt)
+                continue
+            runs.append("".join(run))
+            run = []
+        elif c == "|":
+            return None
+        elif c in "([":
+            runs.append("".join(run))
+            run = []
+            i = _skip_group(pattern, i, c, ")" if c == "(" else "]")
+        elif c in _QUANTIFIERS:
+            if run:
+                run.pop()
+            runs.append("".join(run))
+            run = []
+            i = pattern.index("}", i) + 1 if c == "{" and "}" in pattern[i:] else i + 1
+            if pattern[i : i + 1] in ("?", "+"):
+                i += 1
+        elif c in ".^$":
+            runs.append("".join(run))
+            run = []
+            i += 1
+        else:
+            run.append(c)
+            i += 1
+    runs.append("".join(run))
+    # ASCII only: case-insensitive equivalence of non-ASCII letters is not a plain lower()
+    best = max((r for r in runs if r.isascii()), key=len, default="").lower()
+    return best if len(best) >= 2 else None
+
+
+# (lowercase literal, \b before, \b after) for a keyword pattern, else None
+_Keyword = tuple[str, bool, bool] | None
+# A literal word or phrase (at least two characters), optionally with \b at either end
+_KEYWORD_PATTERN = re.compile(r"(\\b)?([A-Za-z0-9][A-Za-z0-9 \-]*[A-Za-z0-9])(\\b)?")
+
+
+def _keyword(pattern: str) -> _Keyword:
+    """Return ``(literal, bounded_before, bounded_after)`` if *pattern* is a plain keyword.
+
+    The literal is lowercased and is also the pattern's required literal, so a keyword can
+    only match where that literal was found.
+    """
+    m = _KEYWORD_PATTERN.fullmatch(pattern)
+    if m is None:
+        return None
+    return m.group(2).lower(), m.group(1) is not None, m.group(3) is not None
+
+
+def _is_word_char(c: str) -> bool:
+    """True if *c* is a ``\\w`` character for ``re``'s Unicode ``\\b``."""
+    return c.isalnum() or c == "_"
+
+
+def _has_keyword(folded: str, keyword: tuple[str, bool, bool]) -> bool:
+    """True iff the keyword pattern described by *keyword* matches *folded* text.
+
+    Equivalent to searching the pattern with ``re``: each occurrence of the literal is
+    accepted unless a required ``\\b`` has a word character on its outer side.
+    """
+    lit, bounded_before, bounded_after = keyword
+    i = folded.find(lit)
+    if not (bounded_before or bounded_after):
+        return i != -1
+    while i != -1:
+        end = i + len(lit)
+        if (not bounded_before or i == 0 or not _is_word_char(folded[i - 1])) and (
+            not bounded_after or end == len(folded) or not _is_word_char(folded[end])
+        ):
+            return True
+        i = folded.find(lit, i + 1)
+    return False
+
+
+# Characters that re.IGNORECASE matches to an ASCII letter but str.lower() does not map to one
+_FOLD_TABLE = str.maketrans({"\u0130": "i", "\u0131": "i", "\u017f": "s"})
+
+
+# A lone surrogate, as a surrogateescape read can produce
+_LONE_SURROGATE = re.compile("[\ud800-\udfff]")
+
+
+def _fold(text: str) -> str:
+    """Lowercase *text* so that ASCII literals can be matched case-insensitively with ``in``.
+
+    RE2 and PCRE2 encode the text they search as UTF-8 and raise on lone surrogates, so with
+    those engines they are replaced by U+FFFD, which like a surrogate is neither ``\\w``
+    nor ``\\s``.
+    """
+    if text.isascii():
+        return text.lower()
+    folded = text.translate(_FOLD_TABLE).lower()
+    if (_USE_RE2 or _USE_PCRE2) and _LONE_SURROGATE.search(folded):
+        return _LONE_SURROGATE.sub("\ufffd", folded)
+    return folded
 
 
 def _load_topic_definitions() -> list[TopicDef]:
@@ -73,33 +394,478 @@ def _load_topic_definitions() -> list[TopicDef]:
         patterns_raw = item.get("patterns") or []
         summary_prefix = item.get("summary_prefix", "")
         min_pattern_matches = max(1, int(item.get("min_pattern_matches", 1)))
+        keywords = tuple(_keyword(p) for p in patterns_raw)
+        regex_shaped = [p for p, kw in zip(patterns_raw, keywords, strict=True) if kw is None]
         out.append(
             TopicDef(
                 name=name,
                 label=label,
                 patterns=_compile(patterns_raw),
+                _folded=tuple(_compile_folded_pattern(p) for p in patterns_raw),
                 summary_prefix=summary_prefix,
                 min_pattern_matches=min_pattern_matches,
+                literals=tuple(_required_literal(p) for p in patterns_raw),
+                keywords=keywords,
+                fused=_fuse(regex_shaped) if min_pattern_matches == 1 else None,
             )
         )
     return out
 
 
+def _build_literal_automaton(topic_defs: list[TopicDef]):
+    """Return an Aho-Corasick automaton over all required literals (None without pyahocorasick)."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for td in topic_defs:
+        for lit in td.literals:
+            if lit is not None:
+                automaton.add_word(lit, lit)
+    if len(automaton) == 0:
+        return None
+    automaton.make_automaton()
+    return automaton
+
+
+# Hyperscan match ids pack (topic index << 16) | pattern index
+_HS_PATTERN_BITS = 16
+
+
+def _build_hyperscan_database(topic_defs: list[TopicDef], cache_dir: Path | None = None):
+    """Compile every topic pattern into one Hyperscan database.
+
+    Returns ``(database, fallback)`` where ``fallback[t]`` lists the indices of topic *t*'s
+    patterns that Hyperscan rejected (backreferences, lookaround) and must run with ``re``.
+    Without hyperscan, or when it is not the configured engine, returns ``(None, [])``.
+
+    With *cache_dir*, the serialized database is kept there under a name derived from the
+    patterns, flags and Hyperscan version, so later processes load it instead of compiling.
+    """
+    if not _USE_HYPERSCAN:
+        return None, []
+    flags = (
+        hyperscan.HS_FLAG_CASELESS
+        | hyperscan.HS_FLAG_SINGLEMATCH
+        | hyperscan.HS_FLAG_UTF8
+        | hyperscan.HS_FLAG_UCP
+    )
+    cache_path = None
+    if cache_dir is not None and cache_dir.is_dir():
+        source = json.dumps(
+            [hyperscan.__version__, flags, [[p.pattern for p in td.patterns] for td in topic_defs]]
+        )
+        digest = hashlib.blake2b(source.encode("utf-8"), digest_size=8).hexdigest()
+        cache_path = cache_dir / f"topic_patterns.{digest}.hsdb"
+        cached = _load_hyperscan_database(cache_path)
+        if cached is not None:
+            return cached
+    expressions: list[bytes] = []
+    ids: list[int] = []
+    fallback: list[list[int]] = []
+    for t_idx, td in enumerate(topic_defs):
+        rejected: list[int] = []
+        for p_idx, p in enumerate(td.patterns):
+            expression = p.pattern.encode("utf-8")
+            try:
+                hyperscan.Database().compile(expressions=[expression], ids=[0], flags=[flags])
+            except hyperscan.error:
+                logger.debug("Hyperscan cannot compile %r; using re", p.pattern)
+                rejected.append(p_idx)
+                continue
+            expressions.append(expression)
+            ids.append((t_idx << _HS_PATTERN_BITS) | p_idx)
+        fallback.append(rejected)
+    if not expressions:
+        return None, []
+    database = hyperscan.Database()
+    database.compile(expressions=expressions, ids=ids, flags=[flags] * len(expressions))
+    if cache_path is not None:
+        _save_hyperscan_database(cache_path, database, fallback)
+    return database, fallback
+
+
+def _load_hyperscan_database(path: Path):
+    """Return ``(database, fallback)`` saved at *path*, or None if missing or unreadable."""
+    try:
+        header, _, serialized = path.read_bytes().partition(b"\n")
+        fallback = json.loads(header)["fallback"]
+        database = hyperscan.loadb(serialized, hyperscan.HS_MODE_BLOCK)
+        database.scratch = hyperscan.Scratch(database)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError, hyperscan.error) as e:
+        logger.warning("Ignoring unreadable Hyperscan cache %s: %s", path, e)
+        return None
+    return database, fallback
+
+
+def _save_hyperscan_database(path: Path, database, fallback: list[list[int]]) -> None:
+    """Atomically write *database* and its *fallback* lists; failures only log.
+
+    The temporary file has a unique name, so concurrent writers (pool workers, parallel
+    ingests) never share it and each ``os.replace`` installs a complete file.
+    """
+    tmp: Path | None = None
+    try:
+        header = json.dumps({"fallback": fallback}).encode("utf-8")
+        with NamedTemporaryFile(
+            dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False
+        ) as f:
+            tmp = Path(f.name)
+            f.write(header + b"\n" + hyperscan.dumpb(database))
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("Could not write Hyperscan cache %s: %s", path, e)
+        if tmp is not None:
+            tmp.unlink(missing_ok=True)
+
+
+def _on_hyperscan_match(id_: int, from_: int, to: int, flags: int, context: list[int]) -> None:
+    """Set the matched pattern's bit in its topic's mask."""
+    context[id_ >> _HS_PATTERN_BITS] |= 1 << (id_ & ((1 << _HS_PATTERN_BITS) - 1))
+
+
+@dataclass(frozen=True)
+class _TopicTable:
+    """Topic definitions flattened into parallel tuples for one flat loop per document.
+
+    Fused topics check their keywords, then search their other patterns once; single-match
+    topics that could not be fused stop at their first matching pattern; every other topic's
+    patterns are laid out end to end, each distinct pattern once, with the indices of the
+    topics it counts toward. Keyword patterns are decided by :func:`_has_keyword`, not searched.
+    """
+
+    names: tuple[str, ...]
+    thresholds: tuple[int, ...]
+    # (topic index, fused non-keyword patterns, their required literals or None when one has
+    # none, keywords)
+    fused: tuple[tuple[int, re.Pattern[str], tuple[str, ...] | None, tuple[_Keyword, ...]], ...]
+    # (topic index, ((pattern, required literal, keyword), ...)) for unfused single-match topics
+    any_of: tuple[tuple[int, tuple[tuple[re.Pattern[str], str | None, _Keyword], ...]], ...]
+    patterns: tuple[re.Pattern[str], ...]
+    literals: tuple[str | None, ...]
+    keywords: tuple[_Keyword, ...]
+    pattern_topics: tuple[tuple[int, ...], ...]
+
+
+def _build_topic_table(topic_defs: list[TopicDef]) -> _TopicTable:
+    fused = []
+    any_of = []
+    patterns: list[re.Pattern[str]] = []
+    literals: list[str | None] = []
+    keywords: list[_Keyword] = []
+    pattern_topics: list[list[int]] = []
+    # Pattern source -> position in patterns, so a pattern shared by topics is searched once
+    position: dict[str, int] = {}
+    for t_idx, td in enumerate(topic_defs):
+        # Definitions built without keywords (e.g. in tests) search every pattern
+        td_keywords = td.keywords or (None,) * len(td.patterns)
+        entries = tuple(zip(td._folded or td.patterns, td.literals, td_keywords, strict=True))
+        if td.fused is not None:
+            regex_lits = [lit for _, lit, kw in entries if kw is None]
+            lits = None if None in regex_lits else tuple(dict.fromkeys(regex_lits))
+            fused.append((t_idx, td.fused, lits, tuple(kw for kw in td_keywords if kw)))
+            continue
+        if td.min_pattern_matches == 1:
+            any_of.append((t_idx, entries))
+            continue
+        for p, lit, kw in entries:
+            i = position.setdefault(p.pattern, len(patterns))
+            if i == len(patterns):
+                patterns.append(p)
+                literals.append(lit)
+                keywords.append(kw)
+                pattern_topics.append([])
+            pattern_topics[i].append(t_idx)
+    return _TopicTable(
+        names=tuple(td.name for td in topic_defs),
+        thresholds=tuple(td.min_pattern_matches for td in topic_defs),
+        fused=tuple(fused),
+        any_of=tuple(any_of),
+        patterns=tuple(patterns),
+        literals=tuple(literals),
+        keywords=tuple(keywords),
+        pattern_topics=tuple(tuple(topics) for topics in pattern_topics),
+    )
+
+
 TOPIC_DEFINITIONS: list[TopicDef] = _load_topic_definitions()
 _TOPIC_DEF_MAP: dict[str, TopicDef] = {td.name: td for td in TOPIC_DEFINITIONS}
+_TOPIC_TABLE = _build_topic_table(TOPIC_DEFINITIONS)
+_LITERAL_AUTOMATON = _build_literal_automaton(TOPIC_DEFINITIONS)
+_HS_DATABASE, _HS_FALLBACK = _build_hyperscan_database(TOPIC_DEFINITIONS, cache_dir=DATA_DIR)
+# Batch thresholding packs each topic's pattern bitmask into a uint64
+_HS_BATCH_MASKS = all(len(td.patterns) <= 64 for td in TOPIC_DEFINITIONS)
 
 
-def assign_topics(doc: Document) -> list[str]:
-    """Return the list of topic names that match the document content."""
-    text = doc.page_content
+# UTF-8 lead and continuation bytes of an encoded lone surrogate (never valid UTF-8)
+_ENCODED_SURROGATE = re.compile(rb"\xed[\xa0-\xbf]")
+
+
+def _utf8(text: str) -> bytes:
+    """Encode *text* once for both its cache key and a Hyperscan scan.
+
+    Lone surrogates are kept (``surrogatepass``) so distinct texts keep distinct digests.
+    """
+    try:
+        return text.encode("utf-8")
+    except UnicodeEncodeError:
+        return text.encode("utf-8", "surrogatepass")
+
+
+def _hyperscan_masks(text: str, data: bytes | None = None) -> list[int]:
+    """Scan *text* once; element *t* is the bitmask of topic *t*'s patterns that matched.
+
+    *data* is ``_utf8(text)`` when the caller already has it, to avoid encoding again.
+    """
+    if data is None:
+        data = _utf8(text)
+    if b"\xed" in data and _ENCODED_SURROGATE.search(data):
+        # Hyperscan requires valid UTF-8; lone surrogates are replaced
+        data = text.encode("utf-8", "replace")
+    masks = [0] * len(TOPIC_DEFINITIONS)
+    _HS_DATABASE.scan(data, match_event_handler=_on_hyperscan_match, context=masks)
+    return masks
+
+
+def _assign_topics_hyperscan(text: str, data: bytes | None = None) -> list[str]:
+    """assign_topics via one Hyperscan scan; rejected patterns are searched with re."""
     topics: list[str] = []
-    for topic_def in TOPIC_DEFINITIONS:
-        matches = sum(1 for p in topic_def.patterns if p.search(text))
+    masks = _hyperscan_masks(text, data)
+    folded = _fold(text) if any(_HS_FALLBACK) else text
+    for topic_def, mask, rejected in zip(TOPIC_DEFINITIONS, masks, _HS_FALLBACK, strict=True):
+        matches = mask.bit_count()
+        for p_idx in rejected:
+            if matches >= topic_def.min_pattern_matches:
+                break
+            if (topic_def._folded or topic_def.patterns)[p_idx].search(folded):
+                matches += 1
         if matches >= topic_def.min_pattern_matches:
             topics.append(topic_def.name)
     return topics
 
 
+def _popcount(masks: np.ndarray) -> np.ndarray:
+    """Per-element set-bit count of a uint64 array (np.bitwise_count needs NumPy 2)."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(masks)
+    as_bytes = masks.view(np.uint8).reshape(*masks.shape, 8)
+    return np.unpackbits(as_bytes, axis=-1).sum(axis=-1)
+
+
+def _assign_all_hyperscan(
+    documents: list[Document], encoded: list[bytes] | None = None
+) -> list[list[str]]:
+    """assign_topics for a batch: the per-topic counting and thresholding run as array ops.
+
+    Each document still gets one Hyperscan scan; the resulting (documents x topics) pattern
+    bitmasks are popcounted and compared to every topic's min_pattern_matches at once.
+    *encoded* holds each document's ``_utf8`` bytes when the caller already has them.
+    """
+    if encoded is None:
+        encoded = [_utf8(doc.page_content) for doc in documents]
+    masks = np.array(
+        [
+            _hyperscan_masks(doc.page_content, data)
+            for doc, data in zip(documents, encoded, strict=True)
+        ],
+        dtype=np.uint64,
+    ).reshape(len(documents), len(TOPIC_DEFINITIONS))
+    counts = _popcount(masks).astype(np.int64)
+    if any(_HS_FALLBACK):
+        folded = [_fold(doc.page_content) for doc in documents]
+        for t_idx, rejected in enumerate(_HS_FALLBACK):
+            for p_idx in rejected:
+                td = TOPIC_DEFINITIONS[t_idx]
+                pattern = (td._folded or td.patterns)[p_idx]
+                for d_idx, text in enumerate(folded):
+                    if pattern.search(text):
+                        counts[d_idx, t_idx] += 1
+    min_matches = np.array([td.min_pattern_matches for td in TOPIC_DEFINITIONS], dtype=np.int64)
+    names = [td.name for td in TOPIC_DEFINITIONS]
+    return [[names[t] for t in np.flatnonzero(row)] for row in counts >= min_matches]
+
+
+def _match_topics(folded: str, found: set[str] | None) -> list[str]:
+    """Topic names matching *folded* text; *found* is the set of its required literals, if known.
+
+    Without *found* (no pyahocorasick), each literal is checked with a substring test, which
+    is much cheaper than the regex it gates.
+    """
+    present = found.__contains__ if found is not None else folded.__contains__
+    table = _TOPIC_TABLE
+    # Matches each topic still needs; a topic is assigned once this reaches zero
+    needed = list(table.thresholds)
+    for t_idx, fused, lits, keywords in table.fused:
+        if any(present(kw[0]) and _has_keyword(folded, kw) for kw in keywords):
+            needed[t_idx] = 0
+        # One search of the alternation instead of one per pattern, unless no literal occurs
+        elif (lits is None or any(map(present, lits))) and fused.search(folded):
+            needed[t_idx] = 0
+    for t_idx, entries in table.any_of:
+        # The first matching pattern settles the topic
+        if any(
+            (lit is None or present(lit)) and (_has_keyword(folded, kw) if kw else p.search(folded))
+            for p, lit, kw in entries
+        ):
+            needed[t_idx] = 0
+    for p, lit, kw, topic_idxs in zip(
+        table.patterns, table.literals, table.keywords, table.pattern_topics, strict=True
+    ):
+        for t_idx in topic_idxs:
+            if needed[t_idx] > 0:
+                break
+        else:
+            continue  # every topic this pattern counts toward is already settled
+        # A pattern whose required literal is absent cannot match; skip its regex
+        if (lit is None or present(lit)) and (_has_keyword(folded, kw) if kw else p.search(folded)):
+            for t_idx in topic_idxs:
+                needed[t_idx] -= 1
+    return [name for name, left in zip(table.names, needed, strict=True) if left <= 0]
+
+
+_TOPIC_CACHE: OrderedDict[bytes, tuple[str, ...]] = OrderedDict()
+_TOPIC_CACHE_LOCK = threading.Lock()
+
+
+def _cache_key(data: bytes) -> bytes:
+    """Digest of a text's ``_utf8`` encoding."""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _cache_get(key: bytes) -> tuple[str, ...] | None:
+    with _TOPIC_CACHE_LOCK:
+        topics = _TOPIC_CACHE.get(key)
+        if topics is not None:
+            _TOPIC_CACHE.move_to_end(key)
+        return topics
+
+
+def _cache_put(key: bytes, topics: list[str]) -> None:
+    with _TOPIC_CACHE_LOCK:
+        _TOPIC_CACHE[key] = tuple(topics)
+        _TOPIC_CACHE.move_to_end(key)
+        while len(_TOPIC_CACHE) > TOPIC_CACHE_SIZE:
+            _TOPIC_CACHE.popitem(last=False)
+
+
+def reset_topic_cache() -> None:
+    """Clear cached assign_topics results (e.g. for tests or after changing definitions)."""
+    with _TOPIC_CACHE_LOCK:
+        _TOPIC_CACHE.clear()
+
+
+def _assign_uncached(text: str, data: bytes | None = None) -> list[str]:
+    if _HS_DATABASE is not None:
+        return _assign_topics_hyperscan(text, data)
+    # Fold once; every pattern and the literal automaton search the same folded text
+    folded = _fold(text)
+    found: set[str] | None = None
+    if _LITERAL_AUTOMATON is not None:
+        found = {lit for _, lit in _LITERAL_AUTOMATON.iter(folded)}
+    return _match_topics(folded, found)
+
+
+def assign_topics(doc: Document) -> list[str]:
+    """Return the list of topic names that match the document content.
+
+    Results are cached by content digest, so re-tagging the same text (the cluster pass
+    after tagging, repeated boilerplate chunks) does not rerun the patterns.
+    """
+    data = _utf8(doc.page_content)
+    key = _cache_key(data)
+    cached = _cache_get(key)
+    if cached is not None:
+        return list(cached)
+    topics = _assign_uncached(doc.page_content, data)
+    _cache_put(key, topics)
+    return topics
+
+
+def _literals_found_batch(folded_texts: list[str]) -> list[set[str]]:
+    """Required literals present in each folded text, from one automaton pass over all of them.
+
+    The texts are joined with a separator that no literal contains, so every hit lies
+    inside one text; its end index is mapped back to that text through cumulative offsets.
+    """
+    found: list[set[str]] = [set() for _ in folded_texts]
+    for start in range(0, len(folded_texts), BATCH_SCAN_DOCUMENTS):
+        folded = folded_texts[start : start + BATCH_SCAN_DOCUMENTS]
+        # Text i occupies [ends[i - 1], ends[i] - 1); ends[i] - 1 is the separator
+        ends = np.cumsum([len(f) + 1 for f in folded])
+        hits = list(_LITERAL_AUTOMATON.iter(_BATCH_SEPARATOR.join(folded)))
+        if not hits:
+            continue
+        positions = np.fromiter((end for end, _ in hits), dtype=np.int64, count=len(hits))
+        owners = np.searchsorted(ends, positions, side="right")
+        for owner, (_, lit) in zip(owners.tolist(), hits, strict=True):
+            found[start + owner].add(lit)
+    return found
+
+
+def _assign_all(documents: list[Document]) -> list[list[str]]:
+    """assign_topics for each document; only documents missing from the cache are matched."""
+    encoded = [_utf8(doc.page_content) for doc in documents]
+    keys = [_cache_key(data) for data in encoded]
+    cached = {key: _cache_get(key) for key in keys}
+    # One document per uncached digest, so duplicates in the batch are matched once
+    missing = {
+        key: (doc, data)
+        for key, doc, data in zip(keys, documents, encoded, strict=True)
+        if cached[key] is None
+    }
+    missing_docs = [doc for doc, _ in missing.values()]
+    missing_data = [data for _, data in missing.values()]
+    for key, topics in zip(missing, _assign_batch(missing_docs, missing_data), strict=True):
+        cached[key] = tuple(topics)
+        _cache_put(key, topics)
+    return [list(cached[key]) for key in keys]
+
+
+def _assign_batch(
+    documents: list[Document], encoded: list[bytes] | None = None
+) -> list[list[str]]:
+    """Uncached topics for each document, on a thread pool for large batches under RE2.
+
+    With ``re`` or PCRE2, which hold the GIL, large batches go to a process pool instead when
+    TOPIC_PROCESS_WORKERS is at least 2.
+    *encoded* holds each document's ``_utf8`` bytes, reused by the Hyperscan scan.
+    """
+    if _HS_DATABASE is not None and _HS_BATCH_MASKS and documents:
+        return _assign_all_hyperscan(documents, encoded)
+    if (
+        _HS_DATABASE is None
+        and not _USE_RE2
+        and MAX_TOPIC_WORKERS > 1
+        and len(documents) >= PROCESS_POOL_MIN_DOCUMENTS
+    ):
+        texts = [doc.page_content for doc in documents]
+        chunksize = max(1, len(texts) // (MAX_TOPIC_WORKERS * 4))
+        # Spawned rather than forked (the parent may hold threads from Chroma or torch); each
+        # worker imports this module, loading and compiling the topic definitions once
+        with ProcessPoolExecutor(
+            max_workers=MAX_TOPIC_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            return list(pool.map(_assign_uncached, texts, chunksize=chunksize))
+    if _HS_DATABASE is not None or _LITERAL_AUTOMATON is None:
+        if _USE_RE2 and len(documents) >= PARALLEL_MIN_DOCUMENTS:
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+                texts = [doc.page_content for doc in documents]
+                return list(pool.map(_assign_uncached, texts, chunksize=64))
+        if encoded is None:
+            return [_assign_uncached(doc.page_content) for doc in documents]
+        return [
+            _assign_uncached(doc.page_content, data)
+            for doc, data in zip(documents, encoded, strict=True)
+        ]
+    texts = [_fold(doc.page_content) for doc in documents]
+    found = _literals_found_batch(texts)
+    if _USE_RE2 and len(documents) >= PARALLEL_MIN_DOCUMENTS:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            return list(pool.map(_match_topics, texts, found, chunksize=64))
+    return [_match_topics(text, lits) for text, lits in zip(texts, found, strict=True)]
+
+
 def cluster_documents(documents: list[Document]) -> dict[str, list[Document]]:
     """Group documents by topic cluster.
 
@@ -107,8 +873,7 @@ def cluster_documents(documents: list[Document]) -> dict[str, list[Document]]:
     belong to that cluster.  Documents may appear in multiple clusters.
     """
     clusters: dict[str, list[Document]] = {}
-    for doc in documents:
-        topics = assign_topics(doc)
+    for doc, topics in zip(documents, _assign_all(documents), strict=True):
         for topic in topics:
             clusters.setdefault(topic, []).append(doc)
     return clusters
@@ -119,17 +884,31 @@ def get_topic_def(name: str) -> TopicDef | None:
     return _TOPIC_DEF_MAP.get(name)
 
 
+# Distinct topic combinations seen in a corpus are few; cap the cache anyway
+_TOPIC_CSV_CACHE_SIZE = 8192
+_TOPIC_CSV_CACHE: dict[tuple[str, ...], str] = {}
+
+
+def _topic_csv(topics: list[str]) -> str:
+    """Comma-joined *topics*, shared between documents with the same topic combination."""
+    key = tuple(topics)
+    csv = _TOPIC_CSV_CACHE.get(key)
+    if csv is None:
+        csv = ",".join(topics)
+        if len(_TOPIC_CSV_CACHE) < _TOPIC_CSV_CACHE_SIZE:
+            _TOPIC_CSV_CACHE[key] = csv
+    return csv
+
+
 def tag_documents_with_topics(documents: list[Document]) -> list[Document]:
     """Add ``topic_clusters`` metadata to each document.
 
     Returns new Document instances (original list is not mutated).
     """
     tagged: list[Document] = []
-    for doc in documents:
-        topics = assign_topics(doc)
+    for doc, topics in zip(documents, _assign_all(documents), strict=True):
         if topics:
-            meta = dict(doc.metadata)
-            meta["topic_clusters"] = ",".join(topics)
+            meta = {**doc.metadata, "topic_clusters": _topic_csv(topics)}
             tagged.append(Document(page_content=doc.page_content, metadata=meta))
         else:
             tagged.append(doc)
@@ -5,7 +5,8 @@ so that embedding models produce vectors closer to natural-language queries
 (e.g. "durable medical equipment" matches HCPCS E-codes).
 """
 
-import re
+import functools
+from string import ascii_uppercase, digits
 
 # ---------------------------------------------------------------------------
 # HCPCS Level II code-prefix -> (category_label, [synonyms / related terms])
@@ -156,6 +157,37 @@ _HCPCS_LETTER_FALLBACK: dict[str, tuple[str, list[str]]] = {
           ["vision", "hearing", "speech therapy"]),
 }
 
+
+def _hcpcs_enrichment_text(letter: str, label: str, terms: list[str]) -> str:
+    return f"HCPCS {letter}-codes: {label}. Related terms: {', '.join(terms)}."
+
+
+def _build_hcpcs_prefix_text(
+    subranges: list[tuple[str, str, str, list[str]]],
+) -> dict[str, str]:
+    """Map every letter + digit prefix inside a sub-range to that sub-range's enrichment."""
+    table: dict[str, str] = {}
+    for start, end, label, terms in subranges:
+        # Built once per sub-range; lookups return it as-is
+        enrichment = _hcpcs_enrichment_text(start[0], label, terms)
+        for digit in digits:
+            prefix = start[0] + digit
+            if start <= prefix <= end:
+                # setdefault: the first listed sub-range wins, as in a scan
+                table.setdefault(prefix, enrichment)
+    return table
+
+
+# Sub-ranges start and end on the same letter with a digit second, so no other
+# two-character prefix can fall inside one
+_HCPCS_PREFIX_TEXT = _build_hcpcs_prefix_text(_HCPCS_SUBRANGES)
+_HCPCS_LETTER_FALLBACK_TEXT: dict[str, str] = {
+    letter: _hcpcs_enrichment_text(letter, label, terms)
+    for letter, (label, terms) in _HCPCS_LETTER_FALLBACK.items()
+}
+# Only the enrichment strings are needed at run time; drop the label and term lists
+del _HCPCS_SUBRANGES, _HCPCS_LETTER_FALLBACK
+
 # ---------------------------------------------------------------------------
 # ICD-10-CM chapter ranges  (letter + numeric range)
 # ---------------------------------------------------------------------------
@@ -275,38 +307,23 @@ def _hcpcs_prefix_2char(code: str) -> str:
     return code[:2].upper() if len(code) >= 2 else code.upper()
 
 
+@functools.lru_cache(maxsize=8192)
 def get_hcpcs_enrichment(code: str) -> str:
     """Return a semantic enrichment string for the given HCPCS code.
 
-    Returns an empty string if the code prefix is not recognised.
+    Returns an empty string if the code prefix is not recognised. Results are cached
+    by the code as passed, so a repeated code skips normalization as well.
     """
     if not code:
         return ""
     code = code.strip()
     if not code:
         return ""
-    letter = code[0].upper()
-    if not letter.isalpha():
-        return ""
-
-    prefix = _hcpcs_prefix_2char(code)
-
-    for start, end, label, terms in _HCPCS_SUBRANGES:
-        if start <= prefix <= end:
-            terms_str = ", ".join(terms)
-            return (
-                f"HCPCS {letter}-codes: {label}. "
-                f"Related terms: {terms_str}."
-            )
-    if letter in _HCPCS_LETTER_FALLBACK:
-        label, terms = _HCPCS_LETTER_FALLBACK[letter]
-        terms_str = ", ".join(terms)
-        return (
-            f"HCPCS {letter}-codes: {label}. "
-            f"Related terms: {terms_str}."
-        )
-
-    return ""
+    # Both tables are keyed by letters, so a code starting with anything else misses both
+    enrichment = _HCPCS_PREFIX_TEXT.get(_hcpcs_prefix_2char(code))
+    if enrichment is not None:
+        return enrichment
+    return _HCPCS_LETTER_FALLBACK_TEXT.get(code[0].upper(), "")
 
 
 def _icd10_category_key(code: str) -> tuple[str, int]:
@@ -321,9 +338,12 @@ def _icd10_category_key(code: str) -> tuple[str, int]:
         return ("", 0)
     letter = code[0]
     num_str = code[1:3]  # at most 2 digits after the letter
-    num_match = re.match(r"(\d+)", num_str)
-    num = int(num_match.group(1)) if num_match else 0
-    return (letter, num)
+    # isdecimal() is the Unicode digit class that \d matches and int() accepts
+    if num_str[1:2].isdecimal() and num_str[0].isdecimal():
+        return (letter, int(num_str))
+    if num_str[:1].isdecimal():
+        return (letter, int(num_str[0]))
+    return (letter, 0)
 
 
 def _icd10_end_key(end: str) -> tuple[str, int]:
@@ -339,27 +359,44 @@ def _icd10_end_key(end: str) -> tuple[str, int]:
     return _icd10_category_key(end)
 
 
+def _build_icd10_category_text(
+    chapters: list[tuple[str, str, str, list[str]]],
+) -> dict[tuple[str, int], str]:
+    """Map every category key (letter, 0-99) inside a chapter to that chapter's enrichment."""
+    table: dict[tuple[str, int], str] = {}
+    for start, end, label, terms in chapters:
+        start_key = _icd10_category_key(start)
+        end_key = _icd10_end_key(end)
+        # Built once per chapter; lookups return it as-is
+        enrichment = f"ICD-10-CM ({start}-{end}): {label}. Related terms: {', '.join(terms)}."
+        # Only the letters a chapter spans (e.g. S and T for S00-T88) can fall inside it
+        first = ascii_uppercase.index(start_key[0])
+        last = ascii_uppercase.index(end_key[0])
+        for letter in ascii_uppercase[first : last + 1]:
+            for num in range(100):
+                key = (letter, num)
+                if start_key <= key <= end_key:
+                    # setdefault: the first listed chapter wins, as in a scan
+                    table.setdefault(key, enrichment)
+    return table
+
+
+# Category keys always have a two-digit number, and a chapter's bounding letters are A-Z
+_ICD10_CATEGORY_TEXT = _build_icd10_category_text(_ICD10_CHAPTERS)
+del _ICD10_CHAPTERS
+
+
+@functools.lru_cache(maxsize=8192)
 def get_icd10_enrichment(code: str) -> str:
     """Return a semantic enrichment string for the given ICD-10-CM code.
 
-    Returns an empty string if the code does not match any known chapter.
+    Returns an empty string if the code does not match any known chapter. Results are
+    cached by the code as passed.
     """
     if not code or not code[0].isalpha():
         return ""
 
-    code_key = _icd10_category_key(code)
-
-    for start, end, label, terms in _ICD10_CHAPTERS:
-        start_key = _icd10_category_key(start)
-        end_key = _icd10_end_key(end)
-        if start_key <= code_key <= end_key:
-            terms_str = ", ".join(terms)
-            return (
-                f"ICD-10-CM ({start}-{end}): {label}. "
-                f"Related terms: {terms_str}."
-            )
-
-    return ""
+    return _ICD10_CATEGORY_TEXT.get(_icd10_category_key(code), "")
 
 
 def enrich_hcpcs_text(code: str, original_text: str) -> str:
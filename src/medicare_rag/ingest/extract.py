@@ -6,14 +6,18 @@ Output: one .txt + .meta.json per logical document under processed_dir.
 import csv
 import json
 import logging
+import multiprocessing
+import os
 import re
 import sys
 import xml.etree.ElementTree as ET
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from xml.etree.ElementTree import Element
 
 import pdfplumber
+import pypdfium2 as pdfium
 from bs4 import BeautifulSoup
 
 from medicare_rag.config import CSV_FIELD_SIZE_LIMIT
@@ -25,10 +29,19 @@ try:
 except ImportError:
     SafeET = None
 
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
 logger = logging.getLogger(__name__)
 
-# Minimum chars per page to consider pdfplumber extraction "good"
+# Minimum chars per page to consider a PDF text extraction "good"
 _PDF_MIN_CHARS_PER_PAGE = 50
+# Elements whose text is not document content (BeautifulSoup's get_text skips them too)
+_HTML_SKIP_TEXT_TAGS = frozenset({"script", "style", "template"})
+# Worker processes for IOM PDF extraction (PDF parsing is CPU-bound and holds the GIL)
+MAX_IOM_WORKERS = min(8, os.cpu_count() or 1)
 
 _CSV_FIELD_LIMIT_INITIALIZED = False
 
@@ -174,7 +187,7 @@ def _iom_chapter_from_path(manual_id: str, rel_path: Path) -> str | None:
 
 
 def _extract_pdf_page_unstructured(pdf_path: Path) -> str:
-    """Return full document text via unstructured when pdfplumber yields little or no text.
+    """Return full document text via unstructured when the PDF text layer yields little or no text.
     Catches all exceptions so that missing optional dependency or partition_pdf() runtime/parsing
     errors do not abort the ingest pipeline.
     """
@@ -194,33 +207,125 @@ def _extract_pdf_page_unstructured(pdf_path: Path) -> str:
         return ""
 
 
-def _extract_iom_pdf(pdf_path: Path, manual_id: str, chapter: str | None) -> str:
-    """Extract text from an IOM chapter PDF, falling back to unstructured for scanned pages."""
+def _extract_pdf_text_pdfium(pdf_path: Path) -> tuple[str, int]:
+    """Return (text, page count) via PDFium's text layer; pages are joined by blank lines."""
+    parts = []
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        num_pages = len(pdf)
+        for i in range(num_pages):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            try:
+                # PDFium separates lines with CRLF
+                text = textpage.get_text_range().replace("\r\n", "\n").strip()
+            finally:
+                textpage.close()
+                page.close()
+            if text:
+                parts.append(text)
+    finally:
+        pdf.close()
+    return "\n\n".join(parts), num_pages
+
+
+def _extract_pdf_text_pdfplumber(pdf_path: Path) -> tuple[str, int]:
+    """Return (text, page count) via pdfplumber (pdfminer layout analysis)."""
     parts = []
-    num_pages = 0
     with pdfplumber.open(pdf_path) as pdf:
         num_pages = len(pdf.pages)
         for page in pdf.pages:
             text = (page.extract_text() or "").strip()
             if text:
                 parts.append(text)
-    result = "\n\n".join(parts)
-    # If pdfplumber got nothing or very little (e.g. scanned/image PDF), try unstructured once
-    chars_per_page = len(result) / max(1, num_pages)
-    if not result.strip() or chars_per_page < _PDF_MIN_CHARS_PER_PAGE:
+    return "\n\n".join(parts), num_pages
+
+
+def _is_sparse_pdf_text(text: str, num_pages: int) -> bool:
+    return not text.strip() or len(text) / max(1, num_pages) < _PDF_MIN_CHARS_PER_PAGE
+
+
+def _extract_iom_pdf(pdf_path: Path, manual_id: str, chapter: str | None) -> str:
+    """Extract text from an IOM chapter PDF.
+
+    PDFium (pypdfium2) reads the text layer first; it is several times faster than
+    pdfplumber. pdfplumber is tried when PDFium cannot open the file or recovers little
+    text, and unstructured last for scanned pages.
+    """
+    try:
+        result, num_pages = _extract_pdf_text_pdfium(pdf_path)
+    except pdfium.PdfiumError as e:
+        logger.debug("PDFium could not read %s: %s", pdf_path, e)
+        result, num_pages = "", 0
+    if _is_sparse_pdf_text(result, num_pages):
+        fallback, fallback_pages = _extract_pdf_text_pdfplumber(pdf_path)
+        if len(fallback) > len(result):
+            result, num_pages = fallback, fallback_pages
+    # If both got nothing or very little (e.g. scanned/image PDF), try unstructured once
+    if _is_sparse_pdf_text(result, num_pages):
         fallback = _extract_pdf_page_unstructured(pdf_path)
         if len(fallback) > len(result):
             result = fallback
     return result
 
 
+def _extract_iom_pdf_and_write(
+    processed_dir: Path, manual_id: str, pdf_path: Path, chapter: str | None, doc_id: str
+) -> tuple[Path, Path, int] | str:
+    """Extract one IOM PDF and write its .txt/.meta.json pair.
+
+    Returns (txt_path, meta_path, chars), or a warning message when nothing was written.
+    Runs in IOM worker processes, which have no logging configuration, so the caller logs.
+    """
+    try:
+        text = _extract_iom_pdf(pdf_path, manual_id, chapter)
+    except OSError as e:
+        return f"Extract failed for {pdf_path}: {e}"
+    if not text.strip():
+        return f"No text recovered for {pdf_path}; skipping"
+    meta = _meta_schema(
+        source="iom",
+        manual=manual_id,
+        chapter=chapter,
+        title=None,
+        effective_date=None,
+        source_url=None,
+        jurisdiction=None,
+        doc_id=f"iom_{manual_id}_{doc_id}",
+    )
+    txt_path, meta_path = _write_doc(processed_dir, f"iom/{manual_id}", doc_id, text, meta)
+    return txt_path, meta_path, len(text)
+
+
+def _run_iom_tasks(
+    tasks: list[tuple[Path, str, Path, str | None, str]],
+) -> list[tuple[Path, Path, int] | str]:
+    """Run _extract_iom_pdf_and_write for each task, in order; on a process pool for several.
+
+    Workers are spawned rather than forked (the parent may hold threads from Chroma or torch).
+    """
+    if len(tasks) < 2 or MAX_IOM_WORKERS < 2:
+        return [_extract_iom_pdf_and_write(*task) for task in tasks]
+    with ProcessPoolExecutor(
+        max_workers=min(MAX_IOM_WORKERS, len(tasks)),
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as pool:
+        return list(pool.map(_extract_iom_pdf_and_write, *zip(*tasks, strict=True)))
+
+
 def extract_iom(processed_dir: Path, raw_dir: Path, *, force: bool = False) -> list[tuple[Path, Path]]:
-    """Extract IOM chapter PDFs to processed_dir/iom/{manual_id}/."""
+    """Extract IOM chapter PDFs to processed_dir/iom/{manual_id}/.
+
+    PDFs whose outputs already exist are skipped here; the rest are extracted in parallel
+    on a process pool. Results keep the sorted manual/PDF order either way.
+    """
     iom_dir = raw_dir / "iom"
     if not iom_dir.exists():
         logger.warning("IOM raw dir not found: %s", iom_dir)
         return []
-    written: list[tuple[Path, Path]] = []
+    # (output pair, or None for a PDF to extract) per PDF, in sorted order
+    slots: list[tuple[Path, Path] | None] = []
+    tasks: list[tuple[Path, str, Path, str | None, str]] = []
     for manual_path in sorted(iom_dir.iterdir()):
         if not manual_path.is_dir():
             continue
@@ -234,38 +339,77 @@ def extract_iom(processed_dir: Path, raw_dir: Path, *, force: bool = False) -> l
             out_meta = processed_dir / "iom" / manual_id / f"{doc_id}.meta.json"
             if not force and out_txt.exists() and out_meta.exists():
                 logger.debug("Skip (exists): %s", out_txt)
-                written.append((out_txt, out_meta))
+                slots.append((out_txt, out_meta))
                 continue
-            try:
-                text = _extract_iom_pdf(pdf_path, manual_id, chapter)
-            except OSError as e:
-                logger.warning("Extract failed for %s: %s", pdf_path, e)
-                continue
-            if not text.strip():
-                logger.warning("No text recovered for %s; skipping", pdf_path)
-                continue
-            meta = _meta_schema(
-                source="iom",
-                manual=manual_id,
-                chapter=chapter,
-                title=None,
-                effective_date=None,
-                source_url=None,
-                jurisdiction=None,
-                doc_id=f"iom_{manual_id}_{doc_id}",
-            )
-            txt_path, meta_path = _write_doc(processed_dir, f"iom/{manual_id}", doc_id, text, meta)
-            written.append((txt_path, meta_path))
-            logger.info("Wrote %s (%d chars)", txt_path, len(text))
+            slots.append(None)
+            tasks.append((processed_dir, manual_id, pdf_path, chapter, doc_id))
+    results = iter(_run_iom_tasks(tasks))
+    written: list[tuple[Path, Path]] = []
+    for slot in slots:
+        if slot is not None:
+            written.append(slot)
+            continue
+        result = next(results)
+        if isinstance(result, str):
+            logger.warning("%s", result)
+            continue
+        txt_path, meta_path, chars = result
+        written.append((txt_path, meta_path))
+        logger.info("Wrote %s (%d chars)", txt_path, chars)
     return written
 
 
 # --- MCD ---
 
+def _lxml_table_text(table) -> str:
+    rows = []
+    for tr in table.iter("tr"):
+        cells = [
+            " ".join(s for s in (t.strip() for t in _lxml_strings(cell, tables=False)) if s)
+            for cell in tr.iter("th", "td")
+        ]
+        if cells:
+            rows.append(" | ".join(cells))
+    return "\n".join(rows)
+
+
+def _lxml_strings(el, tables: bool = True):
+    """Yield the text of an lxml element in document order, tables as pipe-delimited rows."""
+    tag = el.tag
+    if not isinstance(tag, str):
+        return  # comment or processing instruction
+    if tables and tag == "table":
+        yield _lxml_table_text(el)
+    elif tag not in _HTML_SKIP_TEXT_TAGS:
+        if el.text:
+            yield el.text
+        for child in el:
+            yield from _lxml_strings(child, tables)
+            if child.tail:
+                yield child.tail
+
+
 def _html_to_text(html: str) -> str:
-    """Convert HTML to plain text, preserving table rows as pipe-delimited lines."""
+    """Convert HTML to plain text, preserving table rows as pipe-delimited lines.
+
+    Walks the lxml tree directly when lxml is installed (the ``html`` extra);
+    otherwise parses with BeautifulSoup's html.parser. The two agree on well-formed HTML,
+    but repair malformed markup (stray end tags, unterminated entities, unclosed cells)
+    differently, so such fields, and the chunk hashes built from them, depend on whether
+    lxml is installed.
+    """
     if not html or not html.strip():
         return ""
+    if lxml_html is not None:
+        try:
+            root = lxml_html.document_fromstring(html)
+        except lxml_html.etree.ParserError:
+            return ""
+        except ValueError:
+            # lxml rejects str input carrying an XML encoding declaration; html.parser does not
+            root = None
+        if root is not None:
+            return "\n".join(s for s in (t.strip() for t in _lxml_strings(root)) if s)
     soup = BeautifulSoup(html, "html.parser")
     # Convert tables to pipe-delimited rows so LCD coverage criteria tables stay readable
     for table in soup.find_all("table"):
@@ -313,6 +457,24 @@ def _cell_to_text(k: str, v: str) -> str | None:
     return None
 
 
+def _csv_columns(fieldnames: list[str]) -> dict[str, int]:
+    """Map each CSV header to the column index csv.DictReader would take its value from.
+
+    A repeated header keeps its first position but the value of its last column.
+    """
+    return {name: i for i, name in enumerate(fieldnames)}
+
+
+def _first_cell(row: list[str], idxs: list[int | None]) -> str | None:
+    """Return the first non-empty cell among idxs, like chained ``row.get(a) or row.get(b)``."""
+    value = None
+    for idx in idxs:
+        value = row[idx] if idx is not None and idx < len(row) else None
+        if value:
+            break
+    return value
+
+
 def _extract_nested_csv_zips(dir_path: Path) -> list[Path]:
     """Extract any *_csv.zip (or *csv*.zip) in dir_path into dir_path; return list of .csv paths."""
     csv_zips = list(dir_path.glob("*_csv.zip")) or list(dir_path.glob("*csv*.zip"))
@@ -378,17 +540,27 @@ def extract_mcd(processed_dir: Path, raw_dir: Path, *, force: bool = False) -> l
         for csv_path in csv_files:
             try:
                 with open(csv_path, newline="", encoding="utf-8", errors="replace") as f:
-                    reader = csv.DictReader(f)
-                    fieldnames = list(reader.fieldnames or [])
-                    id_col_actual = id_col if id_col in fieldnames else None
+                    reader = csv.reader(f)
+                    fieldnames = next(reader, [])
+                    columns = _csv_columns(fieldnames)
+                    n_fields = len(fieldnames)
+                    id_col_actual = id_col if id_col in columns else None
                     if not id_col_actual and fieldnames:
                         id_col_actual = (
                             next((c for c in fieldnames if "id" in c.lower() and "lcd" in c.lower()), None)
                             or next((c for c in fieldnames if "id" in c.lower()), None)
                         )
+                    id_idx = columns.get(id_col_actual or "")
+                    title_idxs = [columns.get(c) for c in ("Title", "LCDTitle", "ArticleTitle")]
+                    date_idxs = [columns.get(c) for c in ("Effective_Date", "EffectiveDate")]
+                    url_idx = columns.get("URL")
+                    juris_idxs = [columns.get(c) for c in ("Jurisdiction", "Contractor")]
                     count = 0
-                    for i, row in enumerate(reader):
-                        doc_id = row.get(id_col_actual or "", str(i)).strip() or f"row{i}"
+                    # Blank lines are skipped and not counted, as csv.DictReader does
+                    for i, row in enumerate(r for r in reader if r):
+                        n_row = len(row)
+                        raw_id = row[id_idx] if id_idx is not None and id_idx < n_row else str(i)
+                        doc_id = raw_id.strip() or f"row{i}"
                         doc_id = re.sub(r"[^\w\-]", "_", doc_id)
                         out_txt = processed_dir / "mcd" / out_sub / f"{doc_id}.txt"
                         out_meta = processed_dir / "mcd" / out_sub / f"{doc_id}.meta.json"
@@ -397,8 +569,13 @@ def extract_mcd(processed_dir: Path, raw_dir: Path, *, force: bool = False) -> l
                             count += 1
                             continue
                         text_parts = []
-                        for k, v in row.items():
-                            part = _cell_to_text(k, v)
+                        for k, idx in columns.items():
+                            if idx < n_row:
+                                part = _cell_to_text(k, row[idx])
+                                if part:
+                                    text_parts.append(part)
+                        if n_row > n_fields:
+                            part = _cell_to_text(None, row[n_fields:])
                             if part:
                                 text_parts.append(part)
                         text = "\n\n".join(text_parts).strip()
@@ -408,10 +585,10 @@ def extract_mcd(processed_dir: Path, raw_dir: Path, *, force: bool = False) -> l
                             source="mcd",
                             manual=None,
                             chapter=None,
-                            title=row.get("Title") or row.get("LCDTitle") or row.get("ArticleTitle"),
-                            effective_date=row.get("Effective_Date") or row.get("EffectiveDate"),
-                            source_url=row.get("URL"),
-                            jurisdiction=row.get("Jurisdiction") or row.get("Contractor"),
+                            title=_first_cell(row, title_idxs),
+                            effective_date=_first_cell(row, date_idxs),
+                            source_url=_first_cell(row, [url_idx]),
+                            jurisdiction=_first_cell(row, juris_idxs),
                             doc_id=f"mcd_{out_sub}_{doc_id}",
                             **{id_meta_key: doc_id},
                         )
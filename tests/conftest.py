@@ -2,6 +2,7 @@
 
 import pytest
 
+from medicare_rag.ingest.cluster import reset_topic_cache
 from medicare_rag.query.hybrid import reset_bm25_index
 
 
@@ -10,3 +11,10 @@ def reset_bm25_index_after_test():
     """Reset the shared BM25 index after each test for isolation."""
     yield
     reset_bm25_index()
+
+
+@pytest.fixture(autouse=True)
+def reset_topic_cache_after_test():
+    """Clear cached topic assignments after each test for isolation."""
+    yield
+    reset_topic_cache()
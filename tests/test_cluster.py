@@ -7,6 +7,7 @@ from medicare_rag.ingest.cluster import (
     assign_topics,
     cluster_documents,
     get_topic_def,
+    reset_topic_cache,
     tag_documents_with_topics,
 )
 
@@ -191,6 +192,14 @@ class TestTagDocumentsWithTopics:
         tag_documents_with_topics(docs)
         assert docs[0].metadata == original_meta
 
+    def test_identical_topic_sets_share_csv_string(self):
+        docs = [_doc("cardiac rehab billing codes", doc_id=f"d{i}") for i in range(2)]
+        docs.append(_doc("cardiac rehab and more billing codes", doc_id="d2"))
+        tagged = tag_documents_with_topics(docs)
+        csvs = [d.metadata["topic_clusters"] for d in tagged]
+        assert csvs[0] == csvs[2]
+        assert csvs[0] is csvs[2]
+
 
 class TestTopicDefinitionsCoverage:
 
@@ -204,3 +213,669 @@ class TestTopicDefinitionsCoverage:
     def test_no_duplicate_names(self):
         names = [td.name for td in TOPIC_DEFINITIONS]
         assert len(names) == len(set(names))
+
+
+class TestRequiredLiterals:
+
+    def test_extracts_longest_top_level_run(self):
+        from medicare_rag.ingest.cluster import _required_literal
+
+        assert _required_literal(r"cardiac\s*rehab") == "cardiac"
+        assert _required_literal(r"\bNPWT\b") == "npwt"
+        assert _required_literal(r"X-ray") == "x-ray"
+        assert _required_literal(r"emergency\s*(?:medical\s*)?transport") == "emergency"
+        assert _required_literal(r"rehabs?") == "rehab"
+        assert _required_literal(r"a{2}\.txt") == ".txt"
+
+    def test_no_literal_when_unsafe(self):
+        from medicare_rag.ingest.cluster import _required_literal
+
+        assert _required_literal(r"foo|bar") is None
+        assert _required_literal(r"(?x) cardiac rehab") is None
+        assert _required_literal(r"[abc]\d+") is None
+
+    def test_literals_present_whenever_default_patterns_match(self):
+        from medicare_rag.ingest.cluster import _fold
+
+        texts = [
+            "CARDIAC REHABILITATION program",
+            "Wound-VAC negative pressure wound therapy",
+            "Hoſpice and palliatıve care at end-of-life",
+            "ICR: intensive program; BLS ambulance transport",
+            "PET scan and X-ray; non-emergency transport",
+        ]
+        for td in TOPIC_DEFINITIONS:
+            for p, lit in zip(td.patterns, td.literals, strict=True):
+                for text in texts:
+                    if lit is not None and p.search(_fold(text)):
+                        assert lit in _fold(text), (p.pattern, text)
+
+    def test_automaton_path_matches_regex_only_path(self):
+        import pytest
+
+        pytest.importorskip("ahocorasick")
+        from unittest.mock import patch
+
+        text = "Cardiac rehab, wound care, DME wheelchair and walker, MRI and CT scan."
+        with_ac = assign_topics(_doc(text))
+        reset_topic_cache()
+        with patch("medicare_rag.ingest.cluster._LITERAL_AUTOMATON", None):
+            assert assign_topics(_doc(text)) == with_ac
+
+    def test_substring_prefilter_skips_patterns_without_literal(self):
+        from unittest.mock import MagicMock, patch
+
+        from medicare_rag.ingest.cluster import (
+            TopicDef,
+            _build_topic_table,
+            _compile,
+            _fold,
+            _match_topics,
+        )
+
+        fused = MagicMock()
+        td = TopicDef(
+            name="t", label="T", patterns=_compile([r"cardiac\s*rehab"]),
+            literals=("cardiac",), fused=fused,
+        )
+        with patch("medicare_rag.ingest.cluster._TOPIC_TABLE", _build_topic_table([td])):
+            assert _match_topics(_fold("generic medicare text"), None) == []
+            fused.search.assert_not_called()
+            assert _match_topics(_fold("Cardiac Rehab"), None) == ["t"]
+
+
+class TestFusedPatterns:
+
+    def test_single_match_topics_are_fused(self):
+        for td in TOPIC_DEFINITIONS:
+            if td.min_pattern_matches == 1:
+                assert td.fused is not None, td.name
+            else:
+                assert td.fused is None, td.name
+
+    def test_fused_search_agrees_with_per_pattern_search(self):
+        from medicare_rag.ingest.cluster import _fold
+
+        texts = [
+            "ICR program criteria",
+            "emergency medical transport",
+            "ALS diagnosis and treatment coverage",
+            "speech-language pathology",
+            "generic medicare text",
+        ]
+        for td in TOPIC_DEFINITIONS:
+            if td.fused is None:
+                continue
+            regex_shaped = [p for p, kw in zip(td.patterns, td.keywords, strict=True) if not kw]
+            for text in map(_fold, texts):
+                expected = any(p.search(text) for p in regex_shaped)
+                assert bool(td.fused.search(text)) == expected, (td.name, text)
+
+    def test_backreferences_are_not_fused(self):
+        from medicare_rag.ingest.cluster import _fuse
+
+        assert _fuse([r"(a)x", r"(b)\1"]) is None
+        assert _fuse([r"foo", r"(?i)bar"]) is None
+        assert _fuse([r"foo", r"BAR"]).search("bar")
+
+
+class TestRegexEngine:
+
+    def test_threaded_assignment_matches_serial(self):
+        from unittest.mock import patch
+
+        docs = [
+            _doc(text, doc_id=f"d{i}")
+            for i, text in enumerate(["cardiac rehab", "wound care", "generic text"] * 4)
+        ]
+        serial = tag_documents_with_topics(docs)
+        reset_topic_cache()
+        with (
+            patch("medicare_rag.ingest.cluster._USE_RE2", True),
+            patch("medicare_rag.ingest.cluster.PARALLEL_MIN_DOCUMENTS", 2),
+        ):
+            threaded = tag_documents_with_topics(docs)
+        assert [d.metadata for d in threaded] == [d.metadata for d in serial]
+
+    def test_re2_compiled_patterns_agree_with_re(self):
+        import pytest
+
+        pytest.importorskip("re2")
+        from unittest.mock import patch
+
+        from medicare_rag.ingest.cluster import _compile_pattern
+
+        with patch("medicare_rag.ingest.cluster._USE_RE2", True):
+            for td in TOPIC_DEFINITIONS:
+                for p in td.patterns:
+                    compiled = _compile_pattern(p.pattern)
+                    for text in ["ICR program", "Wound VAC", "BLS ambulance", "x-ray"]:
+                        assert bool(compiled.search(text)) == bool(p.search(text))
+
+    def test_hyperscan_assignment_agrees_with_re(self):
+        import pytest
+
+        pytest.importorskip("hyperscan")
+        from unittest.mock import patch
+
+        from medicare_rag.ingest.cluster import _build_hyperscan_database
+
+        texts = [
+            "Cardiac rehab, wound care, DME wheelchair and walker, MRI and CT scan.",
+            "ALS diagnosis and treatment coverage",
+            "BLS ambulance transport",
+            "generic medicare text",
+        ]
+        expected = [assign_topics(_doc(text)) for text in texts]
+        reset_topic_cache()
+        with patch("medicare_rag.ingest.cluster._USE_HYPERSCAN", True):
+            database, fallback = _build_hyperscan_database(TOPIC_DEFINITIONS)
+        assert database is not None
+        with (
+            patch("medicare_rag.ingest.cluster._HS_DATABASE", database),
+            patch("medicare_rag.ingest.cluster._HS_FALLBACK", fallback),
+        ):
+            assert [assign_topics(_doc(text)) for text in texts] == expected
+
+    def test_hyperscan_uses_unicode_space_and_word_boundary(self):
+        import pytest
+
+        pytest.importorskip("hyperscan")
+        from unittest.mock import patch
+
+        from medicare_rag.ingest.cluster import _build_hyperscan_database
+
+        with patch("medicare_rag.ingest.cluster._USE_HYPERSCAN", True):
+            database, fallback = _build_hyperscan_database(TOPIC_DEFINITIONS)
+        with (
+            patch("medicare_rag.ingest.cluster._HS_DATABASE", database),
+            patch("medicare_rag.ingest.cluster._HS_FALLBACK", fallback),
+        ):
+            # A no-break space is \s and a long s is \w, as with re
+            assert assign_topics(_doc("radiation\xa0THERAPY")) == ["chemotherapy"]
+            assert assign_topics(_doc("HHA\u017fsubstance")) == []
+
+    def test_hyperscan_rejected_patterns_fall_back_to_re(self):
+        import pytest
+
+        pytest.importorskip("hyperscan")
+        from unittest.mock import patch
+
+        from medicare_rag.ingest.cluster import TopicDef, _build_hyperscan_database, _compile
+
+        td = TopicDef(name="t", label="T", patterns=_compile([r"(ab)\1", r"xyz"]))
+        with patch("medicare_rag.ingest.cluster._USE_HYPERSCAN", True):
+            database, fallback = _build_hyperscan_database([td])
+        assert database is not None
+        assert fallback == [[0]]
+
+    def test_hyperscan_database_is_cached_on_disk(self, tmp_path):
+        import pytest
+
+        pytest.importorskip("hyperscan")
+        from unittest.mock import patch
+
+        from medicare_rag.ingest.cluster import (
+            TopicDef,
+            _build_hyperscan_database,
+            _compile,
+            _on_hyperscan_match,
+        )
+
+        td = TopicDef(name="t", label="T", patterns=_compile([r"(ab)\1", r"cardiac\s*rehab"]))
+        with patch("medicare_rag.ingest.cluster._USE_HYPERSCAN", True):
+            _build_hyperscan_database([td], cache_dir=tmp_path)
+            (cache_file,) = tmp_path.glob("topic_patterns.*.hsdb")
+            with patch("medicare_rag.ingest.cluster.hyperscan.Database") as compile_db:
+                database, fallback = _build_hyperscan_database([td], cache_dir=tmp_path)
+            compile_db.assert_not_called()
+        assert fallback == [[0]]
+        masks = [0]
+        database.scan(b"cardiac rehab", match_event_handler=_on_hyperscan_match, context=masks)
+        assert masks == [0b10]
+
+        cache_file.write_bytes(b"not a database")
+        with patch("medicare_rag.ingest.cluster._USE_HYPERSCAN", True):
+            database, fallback = _build_hyperscan_database([td], cache_dir=tmp_path)
+        assert database is not None and fallback == [[0]]
+
+    def test_hyperscan_cache_written_through_unique_temp_file(self, tmp_path):
+        import os
+
+        import pytest
+
+        pytest.importorskip("hyperscan")
+        from unittest.mock import patch
+
+        from medicare_rag.ingest.cluster import (
+            TopicDef,
+            _build_hyperscan_database,
+            _compile,
+            _load_hyperscan_database,
+            _save_hyperscan_database,
+        )
+
+        td = TopicDef(name="t", label="T", patterns=_compile([r"xyz"]))
+        with patch("medicare_rag.ingest.cluster._USE_HYPERSCAN", True):
+            database, fallback = _build_hyperscan_database([td])
+        path = tmp_path / "topic_patterns.hsdb"
+        # A stale temp file under the old fixed name must not be reused or clobbered
+        stale = tmp_path / "topic_patterns.hsdb.tmp"
+        stale.write_bytes(b"partial")
+        replaced = []
+        real_replace = os.replace
+        with patch(
+            "medicare_rag.ingest.cluster.os.replace",
+            side_effect=lambda src, dst: replaced.append(src) or real_replace(src, dst),
+        ):
+            _save_hyperscan_database(path, database, fallback)
+            _save_hyperscan_database(path, database, fallback)
+        assert len(set(replaced)) == 2 and stale not in replaced
+        assert stale.read_bytes() == b"partial"
+        assert _load_hyperscan_database(path)[1] == fallback
+        assert sorted(p.name for p in tmp_path.iterdir()) == [path.name, stale.name]
+
+    def test_hyperscan_batch_assignment_matches_per_document(self):
+        import pytest
+
+        pytest.importorskip("hyperscan")
+        from unittest.mock import patch
+
+        from medicare_rag.ingest.cluster import _assign_all_hyperscan, _build_hyperscan_database
+
+        texts = [
+            "Cardiac rehab, wound care, DME wheelchair and walker, MRI and CT scan.",
+            "hospital bed and nebulizer",
+            "wheelchair only",
+            "generic medicare text",
+        ]
+        docs = [_doc(text, doc_id=f"d{i}") for i, text in enumerate(texts)]
+        expected = [assign_topics(doc) for doc in docs]
+        with patch("medicare_rag.ingest.cluster._USE_HYPERSCAN", True):
+            database, fallback = _build_hyperscan_database(TOPIC_DEFINITIONS)
+        with (
+            patch("medicare_rag.ingest.cluster._HS_DATABASE", database),
+            patch("medicare_rag.ingest.cluster._HS_FALLBACK", fallback),
+        ):
+            assert _assign_all_hyperscan(docs) == expected
+
+    def test_popcount_without_bitwise_count(self, monkeypatch):
+        import numpy as np
+
+        from medicare_rag.ingest.cluster import _popcount
+
+        masks = np.array([[0, 1, 0b1011], [2**63, 2**64 - 1, 6]], dtype=np.uint64)
+        expected = [[0, 1, 3], [1, 64, 2]]
+        assert _popcount(masks).tolist() == expected
+        monkeypatch.delattr(np, "bitwise_count", raising=False)
+        assert _popcount(masks).tolist() == expected
+
+
+class TestBatchLiteralScan:
+
+    def test_batch_literals_match_per_document_scan(self):
+        import pytest
+
+        pytest.importorskip("ahocorasick")
+        from medicare_rag.ingest.cluster import _LITERAL_AUTOMATON, _fold, _literals_found_batch
+
+        texts = ["cardiac", "rehab wound care", "", "Wheelchair and WALKER", "İcr program"]
+        folded = [_fold(t) for t in texts]
+        expected = [{lit for _, lit in _LITERAL_AUTOMATON.iter(t)} for t in folded]
+        assert _literals_found_batch(folded) == expected
+
+    def test_batch_split_matches_single_buffer(self):
+        import pytest
+
+        pytest.importorskip("ahocorasick")
+        from unittest.mock import patch
+
+        docs = [
+            _doc(text, doc_id=f"d{i}")
+            for i, text in enumerate(["cardiac", "rehab", "wound care", "DME wheelchair"] * 3)
+        ]
+        expected = [assign_topics(doc) for doc in docs]
+        reset_topic_cache()
+        with patch("medicare_rag.ingest.cluster.BATCH_SCAN_DOCUMENTS", 5):
+            assert [d.metadata.get("topic_clusters") for d in tag_documents_with_topics(docs)] == [
+                ",".join(t) if t else None for t in expected
+            ]
+
+
+class TestTopicCache:
+
+    def test_repeated_content_is_served_from_cache(self):
+        from unittest.mock import patch
+
+        from medicare_rag.ingest import cluster
+
+        docs = [_doc("cardiac rehab", doc_id="d1"), _doc("cardiac rehab", doc_id="d2")]
+        with patch.object(cluster, "_assign_batch", wraps=cluster._assign_batch) as batch:
+            tagged = tag_documents_with_topics(docs)
+            clusters = cluster_documents(tagged)
+            assert assign_topics(_doc("cardiac rehab")) == ["cardiac_rehab"]
+        assert [len(call.args[0]) for call in batch.call_args_list] == [1, 0]
+        assert [d.metadata["doc_id"] for d in clusters["cardiac_rehab"]] == ["d1", "d2"]
+
+    def test_cache_is_bounded(self):
+        from unittest.mock import patch
+
+        from medicare_rag.ingest import cluster
+
+        with patch("medicare_rag.ingest.cluster.TOPIC_CACHE_SIZE", 3):
+            for i in range(5):
+                assign_topics(_doc(f"wound care {i}"))
+            assert len(cluster._TOPIC_CACHE) == 3
+
+    def test_cached_result_is_not_shared(self):
+        first = assign_topics(_doc("cardiac rehab"))
+        first.append("mutated")
+        assert assign_topics(_doc("cardiac rehab")) == ["cardiac_rehab"]
+
+
+class TestPcre2Engine:
+
+    def test_pcre2_compiled_patterns_agree_with_re(self):
+        import re
+
+        import pytest
+
+        pytest.importorskip("pcre2")
+        from unittest.mock import patch
+
+        from medicare_rag.ingest.cluster import _compile_pattern
+
+        texts = ["ICR program", "Wound VAC", "BLS ambulance", "x-ray", "cardiac rehab", "ALS"]
+        with patch("medicare_rag.ingest.cluster._USE_PCRE2", True):
+            for td in TOPIC_DEFINITIONS:
+                for p in td.patterns:
+                    compiled = _compile_pattern(p.pattern)
+                    assert not isinstance(compiled, re.Pattern), p.pattern
+                    for text in texts:
+                        assert bool(compiled.search(text)) == bool(p.search(text))
+
+    def test_pcre2_unsupported_pattern_falls_back_to_re(self):
+        import re
+
+        import pytest
+
+        pytest.importorskip("pcre2")
+        from unittest.mock import patch
+
+        from medicare_rag.ingest.cluster import _compile_pattern
+
+        with patch("medicare_rag.ingest.cluster._USE_PCRE2", True):
+            # \N{name} escapes are Python-only syntax
+            compiled = _compile_pattern(r"x\N{EM DASH}ray")
+        assert isinstance(compiled, re.Pattern)
+        assert compiled.search("X\u2014RAY")
+
+
+class TestLowercasePatterns:
+
+    def test_literals_are_lowercased_and_escapes_kept(self):
+        from medicare_rag.ingest.cluster import _lowercase_pattern
+
+        assert _lowercase_pattern(r"\bICR\b.*Program") == r"\bicr\b.*program"
+        assert _lowercase_pattern(r"X[- ]?RAY\S+\W") == r"x[- ]?ray\S+\W"
+        assert _lowercase_pattern(r"[A-Z]{2}\d") == r"[a-z]{2}\d"
+        assert _lowercase_pattern(r"[^A-Z]") == r"[^a-z]"
+
+    def test_unsafe_patterns_keep_ignorecase(self):
+        import re
+        from unittest.mock import patch
+
+        from medicare_rag.ingest.cluster import _compile_folded_pattern, _lowercase_pattern
+
+        assert _lowercase_pattern(r"\x41BC") is None
+        assert _lowercase_pattern(r"(A)\1") is None
+        assert _lowercase_pattern(r"[A-z]") is None
+        assert _lowercase_pattern(r"[\--Z]") is None
+        assert _lowercase_pattern("Café") is None
+        with patch.multiple("medicare_rag.ingest.cluster", _USE_RE2=False, _USE_PCRE2=False):
+            compiled = _compile_folded_pattern(r"\x41BC")
+        assert compiled.flags & re.IGNORECASE
+        assert compiled.search("abc")
+
+    def test_default_folded_patterns_compile_without_ignorecase(self):
+        import re
+
+        for td in TOPIC_DEFINITIONS:
+            assert len(td._folded) == len(td.patterns)
+            for p in td._folded:
+                if isinstance(p, re.Pattern):
+                    assert not p.flags & re.IGNORECASE, p.pattern
+
+    def test_public_patterns_match_unfolded_text(self):
+        from medicare_rag.ingest.cluster import get_topic_def
+
+        td = get_topic_def("wound_care")
+        assert any(p.search("WOUND CARE for Pressure Ulcers") for p in td.patterns)
+        assert any(p.search("NPWT dressing changes") for p in td.patterns)
+
+
+
+class TestTopicTable:
+
+    def test_table_preserves_topic_order_and_patterns(self):
+        from medicare_rag.ingest.cluster import _TOPIC_TABLE
+
+        assert _TOPIC_TABLE.names == tuple(td.name for td in TOPIC_DEFINITIONS)
+        fused_topics = {t_idx for t_idx, *_ in _TOPIC_TABLE.fused}
+        for t_idx, td in enumerate(TOPIC_DEFINITIONS):
+            counted = [
+                p
+                for p, owners in zip(
+                    _TOPIC_TABLE.patterns, _TOPIC_TABLE.pattern_topics, strict=True
+                )
+                if t_idx in owners
+            ]
+            if t_idx in fused_topics:
+                assert counted == []
+            else:
+                assert tuple(counted) == td._folded
+
+    def test_min_pattern_matches_counts_distinct_patterns(self):
+        assert "dme" not in assign_topics(_doc("wheelchair wheelchair wheelchair"))
+        assert "dme" in assign_topics(_doc("wheelchair and walker"))
+
+
+class TestProcessPool:
+
+    def test_process_pool_assignment_matches_serial(self):
+        from unittest.mock import MagicMock, patch
+
+        from medicare_rag.ingest import cluster
+
+        docs = [
+            _doc(text, doc_id=f"d{i}")
+            for i, text in enumerate([f"cardiac rehab {i}" for i in range(4)] + ["wheelchair"])
+        ]
+        serial = [assign_topics(doc) for doc in docs]
+        reset_topic_cache()
+        with (
+            patch("medicare_rag.ingest.cluster._HS_DATABASE", None),
+            patch("medicare_rag.ingest.cluster._USE_RE2", False),
+            patch("medicare_rag.ingest.cluster.MAX_TOPIC_WORKERS", 2),
+            patch("medicare_rag.ingest.cluster.PROCESS_POOL_MIN_DOCUMENTS", 2),
+        ):
+            pool_cls = MagicMock(wraps=cluster.ProcessPoolExecutor)
+            with patch("medicare_rag.ingest.cluster.ProcessPoolExecutor", pool_cls):
+                clusters = cluster_documents(docs)
+        pool_cls.assert_called_once()
+        assert sorted(clusters) == sorted({t for topics in serial for t in topics})
+        assert [d.metadata["doc_id"] for d in clusters["cardiac_rehab"]] == ["d0", "d1", "d2", "d3"]
+
+    def test_process_pool_is_off_by_default(self):
+        from unittest.mock import patch
+
+        from medicare_rag.ingest import cluster
+
+        assert cluster.MAX_TOPIC_WORKERS == cluster.TOPIC_PROCESS_WORKERS
+        docs = [_doc(f"cardiac rehab {i}") for i in range(3)]
+        with (
+            patch("medicare_rag.ingest.cluster._HS_DATABASE", None),
+            patch("medicare_rag.ingest.cluster._USE_RE2", False),
+            patch("medicare_rag.ingest.cluster.MAX_TOPIC_WORKERS", 0),
+            patch("medicare_rag.ingest.cluster.PROCESS_POOL_MIN_DOCUMENTS", 2),
+            patch("medicare_rag.ingest.cluster.ProcessPoolExecutor") as pool_cls,
+        ):
+            clusters = cluster_documents(docs)
+        pool_cls.assert_not_called()
+        assert len(clusters["cardiac_rehab"]) == 3
+
+    def test_unfused_single_match_topic_stops_at_first_hit(self):
+        from unittest.mock import MagicMock, patch
+
+        from medicare_rag.ingest.cluster import TopicDef, _build_topic_table, _match_topics
+
+        first, second = MagicMock(), MagicMock()
+        first.search.return_value = True
+        td = TopicDef(name="t", label="T", patterns=(first, second), literals=(None, None))
+        table = _build_topic_table([td])
+        assert table.any_of and not table.patterns
+        with patch("medicare_rag.ingest.cluster._TOPIC_TABLE", table):
+            assert _match_topics("text", None) == ["t"]
+        second.search.assert_not_called()
+
+    def test_shared_pattern_is_searched_once_for_all_topics(self):
+        from unittest.mock import patch
+
+        from medicare_rag.ingest.cluster import (
+            TopicDef,
+            _build_topic_table,
+            _compile,
+            _fold,
+            _match_topics,
+        )
+
+        a = TopicDef(
+            name="a", label="A", patterns=_compile([r"wheelchair", r"walker"]),
+            min_pattern_matches=2, literals=("wheelchair", "walker"),
+        )
+        b = TopicDef(
+            name="b", label="B", patterns=_compile([r"walker", r"cane"]),
+            min_pattern_matches=2, literals=("walker", "cane"),
+        )
+        table = _build_topic_table([a, b])
+        assert table.literals == ("wheelchair", "walker", "cane")
+        assert table.pattern_topics == ((0,), (0, 1), (1,))
+        with patch("medicare_rag.ingest.cluster._TOPIC_TABLE", table):
+            assert _match_topics(_fold("Wheelchair and walker"), None) == ["a"]
+            assert _match_topics(_fold("walker, wheelchair or cane"), None) == ["a", "b"]
+
+    def test_counting_stops_once_threshold_is_reached(self):
+        from unittest.mock import MagicMock, patch
+
+        from medicare_rag.ingest.cluster import TopicDef, _build_topic_table, _match_topics
+
+        patterns = [MagicMock(pattern=f"p{i}") for i in range(4)]
+        for p in patterns:
+            p.search.return_value = True
+        td = TopicDef(
+            name="t", label="T", patterns=tuple(patterns), min_pattern_matches=2,
+            literals=(None,) * 4,
+        )
+        with patch("medicare_rag.ingest.cluster._TOPIC_TABLE", _build_topic_table([td])):
+            assert _match_topics("text", None) == ["t"]
+        assert [p.search.call_count for p in patterns] == [1, 1, 0, 0]
+
+
+class TestEncoding:
+
+    def test_text_is_encoded_once_for_key_and_scan(self):
+        from medicare_rag.ingest.cluster import _utf8
+
+        assert _utf8("wound care") == b"wound care"
+        assert _utf8("café") == "café".encode()
+        assert _utf8("a\ud800b") != _utf8("a\ud801b")
+
+    def test_hyperscan_replaces_lone_surrogates(self):
+        import pytest
+
+        pytest.importorskip("hyperscan")
+        from unittest.mock import patch
+
+        from medicare_rag.ingest.cluster import _build_hyperscan_database, _hyperscan_masks
+
+        with patch("medicare_rag.ingest.cluster._USE_HYPERSCAN", True):
+            database, fallback = _build_hyperscan_database(TOPIC_DEFINITIONS)
+        with (
+            patch("medicare_rag.ingest.cluster._HS_DATABASE", database),
+            patch("medicare_rag.ingest.cluster._HS_FALLBACK", fallback),
+        ):
+            masks = _hyperscan_masks("wound care \ud800 hospice")
+            assert assign_topics(_doc("wound care \ud800 hospice")) == ["wound_care", "hospice"]
+        assert any(masks)
+
+
+    def test_re2_and_pcre2_search_text_with_lone_surrogates(self):
+        import importlib.util
+        from unittest.mock import patch
+
+        import pytest
+
+        from medicare_rag.ingest.cluster import _compile_pattern, _fold
+
+        engines = [e for e in ("re2", "pcre2") if importlib.util.find_spec(e) is not None]
+        if not engines:
+            pytest.skip("neither google-re2 nor pcre2 is installed")
+        for engine in engines:
+            flags = {"_USE_RE2": engine == "re2", "_USE_PCRE2": engine == "pcre2"}
+            with patch.multiple("medicare_rag.ingest.cluster", **flags):
+                compiled = _compile_pattern(r"wound\s*care\b")
+                folded = _fold("Wound care\ud800 hospice")
+            assert type(compiled).__module__.startswith(engine), engine
+            assert folded == "wound care\ufffd hospice"
+            assert compiled.search(folded)
+        with patch.multiple("medicare_rag.ingest.cluster", _USE_RE2=False, _USE_PCRE2=False):
+            assert _fold("Wound care\ud800") == "wound care\ud800"
+
+
+class TestKeywordPatterns:
+
+    def test_keyword_classification(self):
+        from medicare_rag.ingest.cluster import _keyword
+
+        assert _keyword(r"\bDME\b") == ("dme", True, True)
+        assert _keyword("wheelchair") == ("wheelchair", False, False)
+        assert _keyword(r"X-ray") == ("x-ray", False, False)
+        assert _keyword(r"\bambulance") == ("ambulance", True, False)
+        for pattern in (r"cardiac\s*rehab", r"\bPT\b.*rehab", r"\bA\b", r"non.emergency"):
+            assert _keyword(pattern) is None, pattern
+
+    def test_keyword_match_agrees_with_regex(self):
+        import re
+
+        from medicare_rag.ingest.cluster import _fold, _has_keyword, _keyword
+
+        texts = [
+            "DME", "the dme supplier", "DMEPOS", "ADME", "dme_code", "édme", "DME2", "(DME)",
+            "no dme here, but DME.", "x-ray and X-Rays", "wheelchairs", "",
+        ]
+        for pattern in (r"\bDME\b", r"\bdme", r"dme\b", "dme", "X-ray", r"\bwheelchair\b"):
+            kw = _keyword(pattern)
+            for text in map(_fold, texts):
+                expected = re.search(pattern, text, re.IGNORECASE) is not None
+                assert _has_keyword(text, kw) == expected, (pattern, text)
+
+    def test_keyword_patterns_do_not_run_regex(self):
+        from unittest.mock import MagicMock, patch
+
+        from medicare_rag.ingest.cluster import TopicDef, _build_topic_table, _fold, _match_topics
+
+        regex = MagicMock(pattern=r"\bDME\b")
+        td = TopicDef(
+            name="t", label="T", patterns=(regex,), literals=("dme",),
+            keywords=(("dme", True, True),),
+        )
+        with patch("medicare_rag.ingest.cluster._TOPIC_TABLE", _build_topic_table([td])):
+            assert _match_topics(_fold("DME supplier"), None) == ["t"]
+            assert _match_topics(_fold("DMEPOS supplier"), None) == []
+        regex.search.assert_not_called()
+
+    def test_fused_topic_excludes_keywords_from_alternation(self):
+        td = next(td for td in TOPIC_DEFINITIONS if td.name == "hyperbaric_oxygen")
+        assert td.keywords == (None, ("hbot", True, True))
+        assert td.fused.search("hbot") is None
+        assert "hyperbaric_oxygen" in assign_topics(_doc("HBOT coverage"))
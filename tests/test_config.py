@@ -6,6 +6,7 @@ from medicare_rag.config import (
     LCD_CHUNK_OVERLAP,
     LCD_CHUNK_SIZE,
     LCD_RETRIEVAL_K,
+    _env,
     _safe_float,
     _safe_float_positive,
     _safe_int,
@@ -13,6 +14,24 @@ from medicare_rag.config import (
 )
 
 
+class TestEnv:
+    def test_casts_with_type_of_default(self) -> None:
+        env = {"A": "3", "B": "2.5"}
+        assert _env("A", 1, env=env) == 3
+        assert _env("B", 1.0, env=env) == 2.5
+        assert _env("MISSING", "x", env=env) == "x"
+
+    def test_predicate_failure_logs_requirement(self, caplog) -> None:
+        env = {"A": "0"}
+        with caplog.at_level("WARNING", logger="medicare_rag.config"):
+            assert _env("A", 5, predicate=lambda v: v >= 1, requirement=">= 1", env=env) == 5
+        assert "must be >= 1" in caplog.text
+
+    def test_rejects_non_finite_float(self) -> None:
+        assert _env("A", 1.0, env={"A": "nan"}) == 1.0
+        assert _env("A", 1.0, env={"A": "-inf"}) == 1.0
+
+
 class TestSafeInt:
     def test_returns_default_when_key_missing(self) -> None:
         key = "_TEST_SAFE_INT_MISSING_X"
@@ -32,6 +51,11 @@ class TestSafeInt:
         with patch.dict(os.environ, {"_TEST_SAFE_INT_EMPTY": ""}, clear=False):
             assert _safe_int("_TEST_SAFE_INT_EMPTY", 3) == 3
 
+    def test_reads_explicit_env_mapping(self) -> None:
+        with patch.dict(os.environ, {"_TEST_SAFE_INT_ENV": "1"}, clear=False):
+            assert _safe_int("_TEST_SAFE_INT_ENV", 0, {"_TEST_SAFE_INT_ENV": "9"}) == 9
+            assert _safe_int("_TEST_SAFE_INT_ENV", 0, {}) == 0
+
 
 class TestSafeFloat:
     def test_returns_default_when_key_missing(self) -> None:
@@ -1,15 +1,31 @@
 """Tests for download scripts (Phase 1)."""
+import hashlib
 import io
+import json
 import zipfile
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from medicare_rag.download._manifest import file_sha256, write_manifest
-from medicare_rag.download._utils import sanitize_filename_from_url, stream_download
-from medicare_rag.download.codes import download_codes
-from medicare_rag.download.iom import download_iom
+from medicare_rag.download import codes as codes_module
+from medicare_rag.download import iom as iom_module
+from medicare_rag.download._manifest import (
+    cached_file_sha256,
+    file_sha256,
+    hash_files,
+    read_manifest,
+    write_manifest,
+)
+from medicare_rag.download._utils import (
+    conditional_download,
+    html_anchors,
+    sanitize_filename_from_url,
+    stream_download,
+    stream_download_hashed,
+)
+from medicare_rag.download.codes import _latest_hcpcs_zip_url, download_codes
+from medicare_rag.download.iom import _find_manual_links, _find_pdf_links, download_iom
 from medicare_rag.download.mcd import _safe_extract_zip, download_mcd
 
 
@@ -25,6 +41,21 @@ def tmp_raw(tmp_path: Path) -> Path:
     return tmp_path / "raw"
 
 
+def test_download_package_imports_download_functions_lazily() -> None:
+    import subprocess
+    import sys
+
+    code = (
+        "import sys\n"
+        "import medicare_rag.download._manifest\n"
+        "assert 'httpx' not in sys.modules and 'bs4' not in sys.modules, 'eager import'\n"
+        "from medicare_rag.download import download_codes, download_iom, download_mcd\n"
+        "from medicare_rag.download.codes import download_codes as direct\n"
+        "assert download_codes is direct\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
 def test_manifest_write_and_file_sha256(tmp_path: Path) -> None:
     (tmp_path / "a.txt").write_text("hello")
     write_manifest(
@@ -41,6 +72,114 @@ def test_manifest_write_and_file_sha256(tmp_path: Path) -> None:
     assert len(h) == 64 and all(c in "0123456789abcdef" for c in h)
 
 
+def test_file_sha256_matches_hashlib_for_multi_block_file(tmp_path: Path) -> None:
+    payload = bytes(range(256)) * 4096 + b"tail"  # > 1 MiB, not block-aligned
+    (tmp_path / "big.bin").write_bytes(payload)
+    assert file_sha256(tmp_path / "big.bin") == hashlib.sha256(payload).hexdigest()
+
+
+def test_manifest_records_stat_and_reuses_cached_hash(tmp_path: Path) -> None:
+    fp = tmp_path / "a.txt"
+    fp.write_text("hello")
+    write_manifest(
+        tmp_path / "manifest.json",
+        "https://example.com/source",
+        [(fp, "cached-digest")],
+        base_dir=tmp_path,
+    )
+    entries = read_manifest(tmp_path / "manifest.json")
+    entry = entries["a.txt"]
+    assert entry["size"] == 5
+    assert entry["mtime_ns"] == fp.stat().st_mtime_ns
+    with patch("medicare_rag.download._manifest.file_sha256") as mock_hash:
+        assert cached_file_sha256(fp, entry) == "cached-digest"
+        mock_hash.assert_not_called()
+
+    fp.write_text("hello world")
+    assert cached_file_sha256(fp, entry) == file_sha256(fp)
+    assert cached_file_sha256(tmp_path / "missing.txt", entry) is None
+
+
+def test_manifest_paths_relative_to_base_or_absolute_outside(tmp_path: Path) -> None:
+    base = tmp_path / "base"
+    (base / "sub").mkdir(parents=True)
+    inside = base / "sub" / "a.txt"
+    inside.write_text("a")
+    outside = tmp_path / "b.txt"
+    outside.write_text("b")
+    link = tmp_path / "link"
+    link.symlink_to(base)
+    write_manifest(
+        base / "manifest.json",
+        "https://example.com/source",
+        [(inside, None), (outside, None), (link / "sub" / "a.txt", None)],
+        base_dir=base,
+    )
+    data = json.loads((base / "manifest.json").read_text())
+    rel = str(Path("sub") / "a.txt")
+    assert [e["path"] for e in data["files"]] == [rel, str(outside), rel]
+
+
+def test_manifest_same_with_and_without_orjson(tmp_path: Path) -> None:
+    from medicare_rag.download import _manifest
+
+    (tmp_path / "a.txt").write_text("hello")
+    files = [(tmp_path / "a.txt", "abc")]
+    write_manifest(tmp_path / "m1.json", "https://example.com/s", files, sources=["x"])
+    with patch.object(_manifest, "orjson", None):
+        write_manifest(tmp_path / "m2.json", "https://example.com/s", files, sources=["x"])
+        fallback_entries = read_manifest(tmp_path / "m1.json")
+    texts = [(tmp_path / name).read_text() for name in ("m1.json", "m2.json")]
+    assert all(t.endswith("}\n") and '\n  "files": [' in t for t in texts)
+    d1, d2 = (json.loads(t) for t in texts)
+    d1.pop("download_date")
+    d2.pop("download_date")
+    assert d1 == d2
+    assert fallback_entries == read_manifest(tmp_path / "m2.json")
+
+
+def test_hash_files_parallel_matches_serial(tmp_path: Path) -> None:
+    paths = []
+    for i in range(5):
+        fp = tmp_path / f"f{i}.bin"
+        fp.write_bytes(bytes([i]) * (1000 + i))
+        paths.append(fp)
+    paths.append(tmp_path / "missing.bin")
+    expected = [file_sha256(p) for p in paths[:-1]] + [None]
+    assert hash_files(paths, workers=4) == expected
+    assert hash_files(paths, workers=1) == expected
+    cached = [None] * len(paths)
+    cached[0] = {
+        "file_hash": "reused",
+        "size": paths[0].stat().st_size,
+        "mtime_ns": paths[0].stat().st_mtime_ns,
+    }
+    assert hash_files(paths, cached=cached)[0] == "reused"
+    assert hash_files([]) == []
+
+
+def test_read_manifest_missing_or_invalid(tmp_path: Path) -> None:
+    assert read_manifest(tmp_path / "manifest.json") == {}
+    (tmp_path / "manifest.json").write_text("not json")
+    assert read_manifest(tmp_path / "manifest.json") == {}
+
+
+
+def test_read_manifest_rejects_non_utf8_and_non_object_json(tmp_path: Path) -> None:
+    from medicare_rag.download import _manifest
+
+    manifest = tmp_path / "manifest.json"
+    # With orjson when installed, then with the stdlib json fallback
+    for json_lib in (_manifest.orjson, None):
+        with patch.object(_manifest, "orjson", json_lib):
+            manifest.write_bytes(b'{"files": [{"path": "\xff"}]}')
+            assert read_manifest(manifest) == {}
+            for body in ("[]", '"files"', '{"files": [{"path": ["a"]}, {"path": "b.pdf"}]}'):
+                manifest.write_text(body)
+                expected = {"b.pdf": {"path": "b.pdf"}} if "b.pdf" in body else {}
+                assert read_manifest(manifest) == expected
+
+
 def test_mcd_download(tmp_raw: Path) -> None:
     zip_content = _minimal_zip_bytes()
     mock_stream_response = MagicMock()
@@ -68,6 +207,29 @@ def test_mcd_download(tmp_raw: Path) -> None:
     assert manifest.exists()
     assert "source_url" in manifest.read_text()
     assert "all_data.zip" in manifest.read_text()
+    data = json.loads(manifest.read_text())
+    assert data["files"][0]["file_hash"] == file_sha256(mcd_dir / "readme.txt")
+    assert data["archive_sha256"] == hashlib.sha256(zip_content).hexdigest()
+
+
+def test_mcd_download_reuses_passed_client(tmp_raw: Path) -> None:
+    """A caller-provided client is used as-is: no new client is built and it is not closed."""
+    response = MagicMock()
+    response.iter_bytes = MagicMock(return_value=iter([_minimal_zip_bytes()]))
+    stream_cm = MagicMock()
+    stream_cm.__enter__ = MagicMock(return_value=response)
+    stream_cm.__exit__ = MagicMock(return_value=False)
+    shared_client = MagicMock()
+    shared_client.stream.return_value = stream_cm
+
+    with patch("medicare_rag.download.mcd.httpx") as mock_httpx:
+        download_mcd(tmp_raw, force=True, client=shared_client)
+
+    mock_httpx.Client.assert_not_called()
+    shared_client.stream.assert_called_once()
+    shared_client.__exit__.assert_not_called()
+    shared_client.close.assert_not_called()
+    assert (tmp_raw / "mcd" / "readme.txt").read_text() == "MCD test"
 
 
 def test_mcd_idempotency_skips_when_manifest_and_file_exist(tmp_raw: Path) -> None:
@@ -121,6 +283,7 @@ def test_iom_download_discovers_pdfs_and_writes_manifest(tmp_raw: Path) -> None:
 
     def fake_get(url, **kwargs):
         r = MagicMock()
+        r.headers = {}
         r.raise_for_status = MagicMock()
         if "ioms-items" in url:
             r.text = manual_html
@@ -136,6 +299,7 @@ def test_iom_download_discovers_pdfs_and_writes_manifest(tmp_raw: Path) -> None:
         r = MagicMock()
         r.raise_for_status = MagicMock()
         r.iter_bytes = MagicMock(return_value=iter([pdf_content]))
+        r.headers = {}
         cm = MagicMock()
         cm.__enter__ = MagicMock(return_value=r)
         cm.__exit__ = MagicMock(return_value=False)
@@ -160,6 +324,187 @@ def test_iom_download_discovers_pdfs_and_writes_manifest(tmp_raw: Path) -> None:
     manifest_text = (iom_dir / "manifest.json").read_text()
     assert "source_url" in manifest_text
     assert "100-02" in manifest_text
+    # PDFs are fetched concurrently but listed in discovery order with streamed hashes
+    entries = json.loads(manifest_text)["files"]
+    assert [Path(e["path"]).as_posix() for e in entries] == [
+        f"{manual}/{name}"
+        for manual in ("100-02", "100-03", "100-04")
+        for name in ("chapter-1.pdf", "bp102c02.pdf")
+    ]
+    assert {e["file_hash"] for e in entries} == {file_sha256(pdfs[0])}
+
+
+@pytest.mark.parametrize("parser", ["lxml", "html.parser"])
+def test_iom_link_discovery(parser: str) -> None:
+    if parser == "lxml":
+        pytest.importorskip("lxml")
+        lxml_html = iom_module.lxml_html
+    else:
+        lxml_html = None
+    index_html = """
+    <a href="/m/2"> 100-02 </a><a href="/m/3">100-03</a><a>100-04</a>
+    <a href="/m/4">100-04</a><a href="/m/x">100-05</a>
+    """
+    manual_html = """
+    <a href="/a.pdf">A</a><a href="b.PDF ">B</a><a href="/c.pdf?x=1">C</a>
+    <a href="/d.pdfx">D</a><a href="https://other.gov/e.pdf">E</a><a>F.pdf</a>
+    """
+    with patch.object(iom_module, "lxml_html", lxml_html):
+        manuals = _find_manual_links(index_html)
+        pdfs = _find_pdf_links(manual_html, "https://www.cms.gov/m/2")
+    assert manuals == {
+        "100-02": "https://www.cms.gov/m/2",
+        "100-03": "https://www.cms.gov/m/3",
+        "100-04": "https://www.cms.gov/m/4",
+    }
+    assert pdfs == [
+        "https://www.cms.gov/a.pdf",
+        "https://www.cms.gov/m/b.PDF",
+        "https://other.gov/e.pdf",
+    ]
+
+
+def test_iom_hashes_existing_pdfs_without_downloading(tmp_raw: Path) -> None:
+    index_html = "".join(
+        f'<a href="/ioms-items/{m}">{m}</a>' for m in ("100-02", "100-03", "100-04")
+    )
+    manual_html = '<a href="/files/ch1.pdf">Ch 1</a><a href="/files/ch2.pdf">Ch 2</a>'
+    for manual in ("100-02", "100-03", "100-04"):
+        (tmp_raw / "iom" / manual).mkdir(parents=True)
+        for name in ("ch1.pdf", "ch2.pdf"):
+            (tmp_raw / "iom" / manual / name).write_bytes(f"{manual}/{name}".encode())
+
+    def fake_get(url, **kwargs):
+        r = MagicMock()
+        r.headers = {}
+        r.text = manual_html if "ioms-items" in url else index_html
+        return r
+
+    client = MagicMock()
+    client.get.side_effect = fake_get
+    download_iom(tmp_raw, force=False, client=client)
+
+    client.stream.assert_not_called()
+    entries = json.loads((tmp_raw / "iom" / "manifest.json").read_text())["files"]
+    assert len(entries) == 6
+    assert all(e["file_hash"] == file_sha256(tmp_raw / "iom" / e["path"]) for e in entries)
+
+    # Second run: unchanged files reuse the manifest hashes instead of re-reading
+    with patch("medicare_rag.download._manifest.file_sha256") as mock_hash:
+        download_iom(tmp_raw, force=False, client=client)
+    mock_hash.assert_not_called()
+    rerun = json.loads((tmp_raw / "iom" / "manifest.json").read_text())["files"]
+    assert [e["file_hash"] for e in rerun] == [e["file_hash"] for e in entries]
+
+
+def _stream_cm(status: int, body: bytes = b"", headers: dict | None = None) -> MagicMock:
+    r = MagicMock()
+    r.status_code = status
+    r.headers = headers or {}
+    r.iter_bytes = MagicMock(return_value=iter([body]))
+    cm = MagicMock()
+    cm.__enter__ = MagicMock(return_value=r)
+    cm.__exit__ = MagicMock(return_value=False)
+    return cm
+
+
+def test_conditional_download_sends_validators_and_handles_304(tmp_path: Path) -> None:
+    dest = tmp_path / "a.pdf"
+    client = MagicMock()
+    client.stream.return_value = _stream_cm(
+        200, b"pdf", {"etag": '"v1"', "last-modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    )
+    digest, validators = conditional_download(client, "https://example.com/a.pdf", dest)
+    assert digest == hashlib.sha256(b"pdf").hexdigest()
+    assert validators == {"etag": '"v1"', "last_modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    assert client.stream.call_args.kwargs["headers"] is None
+
+    client.stream.return_value = _stream_cm(304)
+    assert conditional_download(client, "https://example.com/a.pdf", dest, validators) is None
+    assert client.stream.call_args.kwargs["headers"] == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+    assert dest.read_bytes() == b"pdf"
+
+
+def test_iom_force_revalidates_unchanged_pdfs(tmp_raw: Path) -> None:
+    index_html = "".join(
+        f'<a href="/ioms-items/{m}">{m}</a>' for m in ("100-02", "100-03", "100-04")
+    )
+
+    def fake_get(url, **kwargs):
+        r = MagicMock()
+        r.headers = {}
+        r.text = '<a href="/files/ch1.pdf">Ch 1</a>' if "ioms-items" in url else index_html
+        return r
+
+    client = MagicMock()
+    client.get.side_effect = fake_get
+    client.stream.side_effect = lambda *a, **kw: _stream_cm(200, b"pdf", {"etag": '"v1"'})
+    download_iom(tmp_raw, force=True, client=client)
+    first = json.loads((tmp_raw / "iom" / "manifest.json").read_text())["files"]
+    assert {e["etag"] for e in first} == {'"v1"'}
+
+    # Unchanged on the server: 304, local files kept
+    client.stream.side_effect = lambda *a, **kw: _stream_cm(304)
+    download_iom(tmp_raw, force=True, client=client)
+    assert client.stream.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+    second = json.loads((tmp_raw / "iom" / "manifest.json").read_text())["files"]
+    assert [(e["file_hash"], e["etag"]) for e in second] == [
+        (e["file_hash"], e["etag"]) for e in first
+    ]
+
+    # 304 but the local copy no longer matches its hash: fetched again unconditionally
+    (tmp_raw / "iom" / "100-02" / "ch1.pdf").write_bytes(b"corrupt")
+    calls: list = []
+
+    def stream(method, url, headers=None):
+        calls.append(headers)
+        return _stream_cm(304) if headers else _stream_cm(200, b"pdf", {"etag": '"v1"'})
+
+    client.stream.side_effect = stream
+    download_iom(tmp_raw, force=True, client=client)
+    assert calls.count(None) == 1
+    assert (tmp_raw / "iom" / "100-02" / "ch1.pdf").read_bytes() == b"pdf"
+
+
+def test_iom_reuses_cached_page_links_on_304(tmp_raw: Path) -> None:
+    index_html = "".join(
+        f'<a href="/ioms-items/{m}">{m}</a>' for m in ("100-02", "100-03", "100-04")
+    )
+    get_headers: list = []
+
+    def fake_get(url, headers=None):
+        get_headers.append(headers)
+        r = MagicMock()
+        if headers:
+            r.status_code = 304
+            r.text = ""
+            r.headers = {}
+        else:
+            r.status_code = 200
+            r.text = '<a href="/files/ch1.pdf">Ch 1</a>' if "ioms-items" in url else index_html
+            r.headers = {"etag": f'"{url}"'}
+        return r
+
+    client = MagicMock()
+    client.get.side_effect = fake_get
+    client.stream.side_effect = lambda *a, **kw: _stream_cm(200, b"pdf")
+    download_iom(tmp_raw, client=client)
+    assert get_headers == [None] * 4
+    cache = json.loads((tmp_raw / "iom" / ".index_cache.json").read_text())
+    assert len(cache) == 4
+
+    get_headers.clear()
+    download_iom(tmp_raw, client=client)
+    assert all(h and h["If-None-Match"] for h in get_headers) and len(get_headers) == 4
+    files = json.loads((tmp_raw / "iom" / "manifest.json").read_text())["files"]
+    assert sorted(e["path"] for e in files) == [
+        "100-02/ch1.pdf",
+        "100-03/ch1.pdf",
+        "100-04/ch1.pdf",
+    ]
 
 
 def test_codes_download_hcpcs_and_manifest(tmp_raw: Path) -> None:
@@ -172,6 +517,7 @@ def test_codes_download_hcpcs_and_manifest(tmp_raw: Path) -> None:
 
     def fake_get(url, **kwargs):
         r = MagicMock()
+        r.headers = {}
         r.raise_for_status = MagicMock()
         if "quarterly-update" in url:
             r.text = hcpcs_html
@@ -219,6 +565,7 @@ def test_codes_download_icd10cm_when_url_set(tmp_raw: Path) -> None:
 
     def fake_get(url, **kwargs):
         r = MagicMock()
+        r.headers = {}
         r.raise_for_status = MagicMock()
         if "quarterly-update" in url:
             r.text = hcpcs_html
@@ -260,6 +607,36 @@ def test_codes_download_icd10cm_when_url_set(tmp_raw: Path) -> None:
     assert manifest.exists()
     manifest_text = manifest.read_text()
     assert icd_url in manifest_text
+    # Downloaded concurrently, but listed in source order with their streamed hashes
+    entries = list(read_manifest(manifest).values())
+    assert [Path(e["path"]).parts[0] for e in entries] == ["hcpcs", "icd10-cm"]
+    assert all(e["file_hash"] == file_sha256(codes_dir / e["path"]) for e in entries)
+
+
+@pytest.mark.parametrize("parser", ["lxml", "html.parser"])
+def test_latest_hcpcs_zip_url_picks_first_matching_link(parser: str) -> None:
+    html = """
+    <html><body>
+    <a href="/other.zip">ICD-10 Code Tables (ZIP)</a>
+    <a>January 2026 Alpha-Numeric HCPCS File (ZIP)</a>
+    <a href="/files/zip/jan-2026.zip"><span>January 2026 ALPHA-NUMERIC HCPCS</span> File (ZIP)</a>
+    <a href="/files/zip/oct-2025.zip">October 2025 Alpha-Numeric HCPCS File (ZIP)</a>
+    </body></html>
+    """
+    if parser == "lxml":
+        pytest.importorskip("lxml")
+        lxml_html = codes_module.lxml_html
+    else:
+        lxml_html = None
+    client = MagicMock()
+    client.get.return_value.text = html
+    with patch.object(codes_module, "lxml_html", lxml_html):
+        url = _latest_hcpcs_zip_url(client)
+    assert url == "https://www.cms.gov/files/zip/jan-2026.zip"
+
+    client.get.return_value.text = "<html><body><a href='/x.zip'>Other</a></body></html>"
+    with patch.object(codes_module, "lxml_html", lxml_html):
+        assert _latest_hcpcs_zip_url(client) is None
 
 
 def test_codes_idempotency_skips_existing_file(tmp_raw: Path) -> None:
@@ -277,6 +654,7 @@ def test_codes_idempotency_skips_existing_file(tmp_raw: Path) -> None:
 
     def track_get(url, **kwargs):
         r = MagicMock()
+        r.headers = {}
         r.raise_for_status = MagicMock()
         if "quarterly-update" in url:
             r.text = hcpcs_html
@@ -332,6 +710,123 @@ def test_safe_extract_zip_skips_zip_slip(tmp_path: Path) -> None:
     assert not (tmp_path / "evil.txt").exists()
 
 
+def test_safe_extract_zip_hashes_members_in_one_pass(tmp_path: Path) -> None:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("dir/", "")
+        z.writestr("dir/a.csv", "x" * 5000)
+        z.writestr("../evil.txt", "bad")
+    buf.seek(0)
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    hashes: dict[str, str] = {}
+    with zipfile.ZipFile(buf, "r") as zf:
+        names = _safe_extract_zip(zf, out_dir, hashes)
+    assert names == ["dir/", "dir/a.csv"]
+    assert (out_dir / "dir" / "a.csv").read_text() == "x" * 5000
+    assert hashes == {"dir/a.csv": file_sha256(out_dir / "dir" / "a.csv")}
+    assert not (tmp_path / "evil.txt").exists()
+
+
+def test_safe_extract_zip_parallel_from_file(tmp_path: Path) -> None:
+    archive = tmp_path / "data.zip"
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("d/", "")
+        for i in range(10):
+            z.writestr(f"d/f{i}.csv", f"row {i}\n" * 100)
+        z.writestr("../evil.txt", "bad")
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    hashes: dict[str, str] = {}
+    with zipfile.ZipFile(archive, "r") as zf:
+        names = _safe_extract_zip(zf, out_dir, hashes, workers=3)
+    assert names == ["d/"] + [f"d/f{i}.csv" for i in range(10)]
+    assert hashes == {
+        f"d/f{i}.csv": file_sha256(out_dir / "d" / f"f{i}.csv") for i in range(10)
+    }
+    assert (out_dir / "d" / "f7.csv").read_text() == "row 7\n" * 100
+    assert not (tmp_path / "evil.txt").exists()
+
+
+def test_safe_extract_zip_sanitizes_and_dedupes_names(tmp_path: Path) -> None:
+    import warnings
+
+    archive = tmp_path / "data.zip"
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # duplicate name
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as z:
+            z.writestr("d//a.csv", "a")
+            z.writestr("d/./b.csv", "b")
+            for i in range(6):
+                z.writestr(f"d/f{i}.csv", str(i))
+            z.writestr("d/dup.csv", "first")
+            z.writestr("d/dup.csv", "last")
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    hashes: dict[str, str] = {}
+    with zipfile.ZipFile(archive, "r") as zf:
+        names = _safe_extract_zip(zf, out_dir, hashes, workers=3)
+    assert names.count("d/dup.csv") == 1
+    assert (out_dir / "d" / "dup.csv").read_text() == "last"
+    assert hashes["d/dup.csv"] == file_sha256(out_dir / "d" / "dup.csv")
+    assert (out_dir / "d" / "a.csv").read_text() == "a"
+    assert (out_dir / "d" / "b.csv").read_text() == "b"
+
+
+def test_safe_extract_zip_inflates_with_isal_without_patching_zipfile(tmp_path: Path) -> None:
+    import types
+    import zlib
+
+    from medicare_rag.download import mcd
+
+    calls: list[int] = []
+
+    def decompressobj(wbits):
+        calls.append(wbits)
+        return zlib.decompressobj(wbits)
+
+    shim = types.SimpleNamespace(decompressobj=decompressobj, crc32=zlib.crc32)
+    archive = tmp_path / "data.zip"
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("a.csv", "y" * 50000)
+        z.writestr("b.txt", "stored", compress_type=zipfile.ZIP_STORED)
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    original = zipfile.zlib, zipfile.crc32
+    hashes: dict[str, str] = {}
+    with patch.object(mcd, "isal_zlib", shim), zipfile.ZipFile(archive) as zf:
+        _safe_extract_zip(zf, out_dir, hashes, workers=1)
+        assert (zipfile.zlib, zipfile.crc32) == original
+    assert calls == [-15]
+    assert (out_dir / "a.csv").read_text() == "y" * 50000
+    assert (out_dir / "b.txt").read_text() == "stored"
+    assert hashes["a.csv"] == file_sha256(out_dir / "a.csv")
+
+
+def test_safe_extract_zip_isal_path_checks_crc(tmp_path: Path) -> None:
+    import types
+    import zlib
+
+    from medicare_rag.download import mcd
+
+    shim = types.SimpleNamespace(decompressobj=zlib.decompressobj, crc32=zlib.crc32)
+    archive = tmp_path / "data.zip"
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("a.csv", "y" * 5000)
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    with patch.object(mcd, "isal_zlib", shim), zipfile.ZipFile(archive) as zf:
+        zf.getinfo("a.csv").CRC ^= 1
+        with pytest.raises(zipfile.BadZipFile):
+            _safe_extract_zip(zf, out_dir, workers=1)
+
+
+def test_html_anchors_keeps_only_linked_anchors_with_nested_text() -> None:
+    html = '<div><a href="/x"><span>100-02</span> PDF</a><a>no href</a><p>text</p></div>'
+    anchors = html_anchors(html)
+    assert [(a["href"], a.get_text()) for a in anchors] == [("/x", "100-02 PDF")]
+
+
 def test_sanitize_filename_from_url() -> None:
     assert sanitize_filename_from_url("https://example.com/path/to/file.pdf", "default") == "file.pdf"
     assert sanitize_filename_from_url("https://example.com/doc", "default") == "doc"
@@ -365,6 +860,11 @@ def test_sanitize_filename_from_url_rejects_control_chars() -> None:
     assert sanitize_filename_from_url("https://example.com/doc%01.pdf", "default") == "default"
     # Newline in path segment
     assert sanitize_filename_from_url("https://example.com/foo%0abar", "default") == "default"
+    # Encoded separators and the last control character
+    assert sanitize_filename_from_url("https://example.com/a%5cb.pdf", "default") == "default"
+    assert sanitize_filename_from_url("https://example.com/a%2fb.pdf", "default") == "default"
+    assert sanitize_filename_from_url("https://example.com/a%1fb.pdf", "default") == "default"
+    assert sanitize_filename_from_url("https://example.com/a%20b.pdf", "default") == "a b.pdf"
 
 
 def test_stream_download_rejects_file_scheme(tmp_path: Path) -> None:
@@ -406,6 +906,22 @@ def test_stream_download_accepts_http_and_https(tmp_path: Path) -> None:
     assert dest.read_bytes() == b"ok"
 
 
+def test_stream_download_hashed_returns_digest_of_written_bytes(tmp_path: Path) -> None:
+    r = MagicMock()
+    r.iter_bytes = MagicMock(return_value=iter([b"hello ", b"", b"world"]))
+    cm = MagicMock()
+    cm.__enter__ = MagicMock(return_value=r)
+    cm.__exit__ = MagicMock(return_value=False)
+    mock_client = MagicMock()
+    mock_client.stream.return_value = cm
+    dest = tmp_path / "test.bin"
+    digest = stream_download_hashed(mock_client, "https://example.com/file.zip", dest)
+    assert dest.read_bytes() == b"hello world"
+    assert digest == file_sha256(dest)
+    with pytest.raises(ValueError, match="not allowed"):
+        stream_download_hashed(mock_client, "file:///etc/passwd", dest)
+
+
 def test_iom_duplicate_filenames_disambiguated(tmp_raw: Path) -> None:
     """Two PDFs with the same URL path segment get disambiguated (e.g. document.pdf, document_1.pdf)."""
     index_html = """
@@ -426,6 +942,7 @@ def test_iom_duplicate_filenames_disambiguated(tmp_raw: Path) -> None:
 
     def fake_get(url, **kwargs):
         r = MagicMock()
+        r.headers = {}
         r.raise_for_status = MagicMock()
         if "ioms-items" in url or "cms01267" in url:
             r.text = manual_html
@@ -441,6 +958,7 @@ def test_iom_duplicate_filenames_disambiguated(tmp_raw: Path) -> None:
         r.raise_for_status = MagicMock()
         content = pdf_b if "other/" in url else pdf_a
         r.iter_bytes = MagicMock(return_value=iter([content]))
+        r.headers = {}
         cm = MagicMock()
         cm.__enter__ = MagicMock(return_value=r)
         cm.__exit__ = MagicMock(return_value=False)
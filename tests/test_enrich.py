@@ -84,6 +84,21 @@ class TestGetHcpcsEnrichment:
         assert "Enteral" in result or "Parenteral" in result
         assert "nutrition" in result.lower()
 
+    def test_codes_in_same_subrange_share_precomputed_string(self) -> None:
+        assert get_hcpcs_enrichment("E0100") is get_hcpcs_enrichment("e0999")
+        assert get_hcpcs_enrichment("E9999") is get_hcpcs_enrichment("E")
+
+    def test_prefix_outside_subranges_uses_letter_fallback(self) -> None:
+        assert "Enteral and Parenteral Therapy" in get_hcpcs_enrichment("B0001")
+        assert "Administrative" in get_hcpcs_enrichment("A9270")
+        assert get_hcpcs_enrichment("AX123") == get_hcpcs_enrichment("A")
+
+    def test_repeated_code_is_cached(self) -> None:
+        get_hcpcs_enrichment.cache_clear()
+        first = get_hcpcs_enrichment("L0120")
+        assert get_hcpcs_enrichment("L0120") is first
+        assert get_hcpcs_enrichment.cache_info().hits == 1
+
 
 # ---------------------------------------------------------------------------
 # ICD-10-CM enrichment
@@ -192,6 +207,25 @@ class TestGetIcd10Enrichment:
         assert result != ""
         assert "Pregnancy" in result or "Puerperium" in result
 
+    def test_codes_in_same_chapter_share_precomputed_string(self) -> None:
+        assert get_icd10_enrichment("S72.001A") is get_icd10_enrichment("T88")
+
+    def test_chapter_boundaries(self) -> None:
+        assert "Neoplasms" in get_icd10_enrichment("D49.9")
+        assert "Blood" in get_icd10_enrichment("D50")
+        assert "Pregnancy" in get_icd10_enrichment("O9A.1")
+        assert get_icd10_enrichment("U86") == ""
+
+    def test_category_key(self) -> None:
+        from medicare_rag.ingest.enrich import _icd10_category_key
+
+        assert _icd10_category_key("E11.9") == ("E", 11)
+        assert _icd10_category_key("a00.0") == ("A", 0)
+        assert _icd10_category_key("O9A") == ("O", 9)
+        assert _icd10_category_key("E1.2") == ("E", 12)
+        assert _icd10_category_key("EX1") == ("E", 0)
+        assert _icd10_category_key("") == ("", 0)
+
 
 # ---------------------------------------------------------------------------
 # enrich_*_text wrappers
@@ -2,6 +2,7 @@
 from pathlib import Path
 from unittest.mock import patch
 
+import numpy as np
 import pytest
 from langchain_core.documents import Document
 
@@ -49,6 +50,25 @@ def test_get_embeddings_returns_embeddings() -> None:
     assert emb is not None
 
 
+def test_get_embeddings_passes_device_and_batch_kwargs() -> None:
+    with (
+        patch("langchain_huggingface.HuggingFaceEmbeddings") as mock_cls,
+        patch("medicare_rag.index.embed._resolve_device", return_value="cpu"),
+    ):
+        get_embeddings()
+    kwargs = mock_cls.call_args.kwargs
+    assert kwargs["model_kwargs"] == {"device": "cpu"}
+    assert kwargs["encode_kwargs"]["batch_size"] >= 1
+    assert kwargs["encode_kwargs"]["normalize_embeddings"] is True
+
+
+def test_resolve_device_passes_explicit_value_through() -> None:
+    from medicare_rag.index.embed import _resolve_device
+
+    assert _resolve_device("cuda:1") == "cuda:1"
+    assert _resolve_device("auto") in ("cpu", "cuda")
+
+
 def test_embed_documents_shape_and_dimension() -> None:
     """embed_documents returns list of vectors; each vector is 384 dims for all-MiniLM-L6-v2."""
     emb = get_embeddings()
@@ -88,6 +108,49 @@ def test_chunk_id_document_summary_uses_doc_id() -> None:
     assert _chunk_id(doc) == "summary_xyz"
 
 
+def test_hash_factory_selects_algorithm_and_falls_back() -> None:
+    import hashlib
+
+    from medicare_rag.index.store import _hash_factory
+
+    assert _hash_factory("sha256") is hashlib.sha256
+    assert _hash_factory("no-such-hash") is hashlib.sha256
+    with patch.dict("sys.modules", {"xxhash": None}):
+        assert _hash_factory("xxh3") is hashlib.sha256
+
+
+def test_content_hash_xxh3_differs_from_sha256() -> None:
+    xxhash = pytest.importorskip("xxhash")
+    doc = Document(page_content="text", metadata={"doc_id": "d", "chunk_index": 0})
+    with patch("medicare_rag.index.store._new_content_hasher", xxhash.xxh3_128):
+        fast = _content_hash(doc)
+    assert len(fast) == 32
+    assert fast != _content_hash(doc)
+
+
+def test_content_hash_matches_joined_payload_digest() -> None:
+    import hashlib
+
+    doc = Document(page_content="caf\u00e9 text", metadata={"doc_id": "iom_1", "chunk_index": 3})
+    expected = hashlib.sha256("caf\u00e9 text\x00iom_1\x003\x00normalized".encode()).hexdigest()
+    with patch("medicare_rag.index.store._new_content_hasher", hashlib.sha256):
+        assert _content_hash(doc) == expected
+
+
+def test_content_hash_records_embedding_normalization() -> None:
+    import hashlib
+
+    doc = Document(page_content="text", metadata={"doc_id": "iom_1", "chunk_index": 3})
+    unnormalized = hashlib.sha256(b"text\x00iom_1\x003").hexdigest()
+    with (
+        patch("medicare_rag.index.store._new_content_hasher", hashlib.sha256),
+        patch("medicare_rag.index.store.NORMALIZE_EMBEDDINGS", False),
+    ):
+        assert _content_hash(doc) == unnormalized
+    with patch("medicare_rag.index.store._new_content_hasher", hashlib.sha256):
+        assert _content_hash(doc) != unnormalized
+
+
 def test_content_hash_deterministic() -> None:
     doc = Document(page_content="hello", metadata={"doc_id": "d1", "chunk_index": 0})
     assert _content_hash(doc) == _content_hash(doc)
@@ -200,7 +263,7 @@ def test_upsert_documents_incremental_updates_changed(chroma_dir: Path) -> None:
 
 def test_upsert_documents_empty_list() -> None:
     class MockCollection:
-        def get(self, include=None):
+        def get(self, ids=None, include=None):
             return {"ids": [], "metadatas": []}
 
     class MockStore:
@@ -213,7 +276,7 @@ def test_upsert_documents_empty_list() -> None:
 
 
 def test_upsert_documents_batched_get_skips_and_upserts() -> None:
-    """Batched collection.get(limit=..., offset=...) is used; existing hashes are skipped, new docs upserted."""
+    """collection.get(ids=...) is used; existing hashes are skipped, new docs upserted."""
     existing_doc = Document(
         page_content="Existing content for doc_0.",
         metadata={"doc_id": "doc_0", "chunk_index": 0},
@@ -226,26 +289,19 @@ def test_upsert_documents_batched_get_skips_and_upserts() -> None:
 
     class MockCollection:
         def __init__(self, known_hash: str):
-            self._known_hash = known_hash
+            # Ids must match _chunk_id(doc) format: doc_id when no chunk_index, else doc_id_chunk_index.
+            self._stored = {f"doc_{i}_0": "dummy" for i in range(GET_META_BATCH_SIZE + 100)}
+            self._stored["doc_0_0"] = known_hash
+            self.get_calls: list[list[str]] = []
             self.upsert_calls: list[dict] = []
 
-        def get(self, include=None, limit=None, offset=0):
-            # Ids must match _chunk_id(doc) format: doc_id when no chunk_index, else doc_id_chunk_index.
-            if offset == 0:
-                ids = [f"doc_{i}_0" for i in range(GET_META_BATCH_SIZE)]
-                metadatas = [
-                    {"content_hash": self._known_hash if i == 0 else "dummy"}
-                    for i in range(GET_META_BATCH_SIZE)
-                ]
-                return {"ids": ids, "metadatas": metadatas}
-            if offset == GET_META_BATCH_SIZE:
-                ids = [
-                    f"doc_{i}_0"
-                    for i in range(GET_META_BATCH_SIZE, GET_META_BATCH_SIZE + 100)
-                ]
-                metadatas = [{"content_hash": "dummy"} for _ in range(100)]
-                return {"ids": ids, "metadatas": metadatas}
-            return {"ids": [], "metadatas": []}
+        def get(self, ids=None, include=None):
+            self.get_calls.append(list(ids))
+            found = [id_ for id_ in ids if id_ in self._stored]
+            return {
+                "ids": found,
+                "metadatas": [{"content_hash": self._stored[id_]} for id_ in found],
+            }
 
         def upsert(self, ids=None, embeddings=None, metadatas=None, documents=None):
             self.upsert_calls.append({"ids": ids, "len": len(ids) if ids else 0})
@@ -263,5 +319,62 @@ def test_upsert_documents_batched_get_skips_and_upserts() -> None:
 
     assert n_upserted == 1
     assert n_skipped == 1
+    assert mock_coll.get_calls == [["doc_0_0", "new_1_0"]]
     assert len(mock_coll.upsert_calls) == 1
     assert mock_coll.upsert_calls[0]["len"] == 1
+
+
+def test_upsert_documents_gets_candidate_ids_in_batches() -> None:
+    """Only the incoming chunk ids are fetched, GET_META_BATCH_SIZE at a time."""
+    from langchain_core.embeddings import FakeEmbeddings
+
+    docs = [
+        Document(page_content=f"text {i}", metadata={"doc_id": f"d{i}", "chunk_index": 0})
+        for i in range(GET_META_BATCH_SIZE + 3)
+    ]
+    stored_hash = _content_hash(docs[0])
+
+    class MockCollection:
+        def __init__(self):
+            self.get_calls: list[list[str]] = []
+            self.upserted: list[str] = []
+
+        def get(self, ids=None, include=None):
+            self.get_calls.append(list(ids))
+            found = [id_ for id_ in ids if id_ == "d0_0"]
+            return {"ids": found, "metadatas": [{"content_hash": stored_hash}] * len(found)}
+
+        def upsert(self, ids=None, embeddings=None, metadatas=None, documents=None):
+            self.upserted.extend(ids)
+
+    class MockStore:
+        _collection = MockCollection()
+
+    n, skipped = upsert_documents(MockStore(), docs, FakeEmbeddings(size=8))
+    coll = MockStore._collection
+    assert [len(c) for c in coll.get_calls] == [GET_META_BATCH_SIZE, 3]
+    assert (n, skipped) == (len(docs) - 1, 1)
+    assert "d0_0" not in coll.upserted
+
+
+@pytest.mark.skipif(not _chroma_available, reason="chromadb not importable")
+def test_upsert_documents_passes_float32_matrix_to_chroma() -> None:
+    import chromadb
+    from langchain_core.embeddings import FakeEmbeddings
+
+    client = chromadb.EphemeralClient()
+    coll = client.get_or_create_collection("test_upsert_float32")
+
+    class Store:
+        _collection = coll
+
+    docs = [
+        Document(page_content=f"chunk {i}", metadata={"doc_id": "d", "chunk_index": i})
+        for i in range(3)
+    ]
+    with patch.object(coll, "upsert", wraps=coll.upsert) as spy:
+        assert upsert_documents(Store(), docs, FakeEmbeddings(size=8)) == (3, 0)
+    vectors = spy.call_args.kwargs["embeddings"]
+    assert vectors.dtype == np.float32 and vectors.shape == (3, 8)
+    assert coll.count() == 3
+    assert upsert_documents(Store(), docs, FakeEmbeddings(size=8)) == (0, 3)
@@ -79,6 +79,30 @@ def test_html_to_text_preserves_tables_as_pipe_delimited() -> None:
     assert any("G0008" in line and "COVID admin" in line for line in lines)
 
 
+def test_html_to_text_same_with_either_parser() -> None:
+    pytest.importorskip("lxml")
+    html = (
+        "<p>Coverage <b>criteria</b> &amp; limits<!-- note --></p><ul><li>one<li>two</ul>"
+        "<script>var t = '<table>';</script><style>p {}</style>"
+        "<table><tbody><tr><th>Code</th><td>G0008<br>COVID <i>admin</i></td></tr>"
+        "<tr><td>a<table><tr><td>nested</td><td>cell</td></tr></table>b</td></tr>"
+        "</tbody></table><p>unclosed"
+    )
+    with patch("medicare_rag.ingest.extract.lxml_html", None):
+        expected = _html_to_text(html)
+    assert _html_to_text(html) == expected
+    assert "Code | G0008 COVID admin" in expected
+    assert "var t" not in expected
+
+
+def test_html_to_text_with_xml_encoding_declaration() -> None:
+    """A str with an encoding declaration (which lxml rejects) still parses."""
+    html = '<?xml version="1.0" encoding="utf-8"?><p>x</p>'
+    assert _html_to_text(html) == "x"
+    with patch("medicare_rag.ingest.extract.lxml_html", None):
+        assert _html_to_text(html) == "x"
+
+
 def test_cell_to_text_html_empty_returns_none() -> None:
     """HTML that parses to empty text (e.g. empty table) returns None."""
     assert _cell_to_text("Body", "<table><tr><td></td></tr></table>") is None
@@ -198,6 +222,74 @@ def test_extract_iom_writes_txt_and_meta(tmp_iom_raw: Path, tmp_path: Path) -> N
     assert meta["chapter"] == "6"
 
 
+def _minimal_pdf(text: str) -> bytes:
+    """A one-page PDF showing *text* in Helvetica."""
+    content = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+    objs = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    return out
+
+
+def test_extract_iom_process_pool_keeps_order(tmp_path: Path) -> None:
+    raw = tmp_path / "raw"
+    processed = tmp_path / "processed"
+    manual = raw / "iom" / "100-02"
+    manual.mkdir(parents=True)
+    for n in (1, 2, 3):
+        text = f"Chapter {n} benefit policy text for the Medicare benefit policy manual"
+        (manual / f"bp102c0{n}.pdf").write_bytes(_minimal_pdf(text))
+    # Chapter 2 is already extracted; only chapters 1 and 3 go to the pool
+    existing = processed / "iom" / "100-02"
+    existing.mkdir(parents=True)
+    (existing / "ch2.txt").write_text("cached")
+    (existing / "ch2.meta.json").write_text("{}")
+
+    with patch("medicare_rag.ingest.extract.MAX_IOM_WORKERS", 2):
+        written = extract_iom(processed, raw)
+
+    assert [p.name for p, _ in written] == ["ch1.txt", "ch2.txt", "ch3.txt"]
+    assert "Chapter 1 benefit policy" in written[0][0].read_text()
+    assert written[1][0].read_text() == "cached"
+    assert json.loads(written[2][1].read_text())["chapter"] == "3"
+
+
+def test_extract_iom_pdf_uses_pdfium_text_layer(tmp_path: Path) -> None:
+    pdf_path = tmp_path / "bp102c01.pdf"
+    text = "Chapter 1 benefit policy text for the Medicare benefit policy manual"
+    pdf_path.write_bytes(_minimal_pdf(text))
+    with patch("medicare_rag.ingest.extract.pdfplumber") as mock_plumber:
+        assert extract._extract_iom_pdf(pdf_path, "100-02", "1") == text
+    mock_plumber.open.assert_not_called()
+
+
+def test_extract_iom_pdf_falls_back_to_pdfplumber_on_sparse_text(tmp_path: Path) -> None:
+    pdf_path = tmp_path / "bp102c01.pdf"
+    pdf_path.write_bytes(_minimal_pdf("x"))
+    mock_page = MagicMock()
+    mock_page.extract_text.return_value = "Recovered by pdfplumber " * 4
+    mock_pdf = MagicMock(pages=[mock_page])
+    mock_pdf.__enter__ = MagicMock(return_value=mock_pdf)
+    mock_pdf.__exit__ = MagicMock(return_value=False)
+    with patch("medicare_rag.ingest.extract.pdfplumber") as mock_plumber:
+        mock_plumber.open.return_value = mock_pdf
+        assert extract._extract_iom_pdf(pdf_path, "100-02", "1").startswith("Recovered")
+
+
 # --- MCD extraction (CSV with HTML) ---
 
 
@@ -238,6 +330,32 @@ def test_extract_mcd_writes_txt_and_meta(tmp_mcd_raw: Path, tmp_path: Path) -> N
     assert meta.get("lcd_id") or "L12345" in str(meta.get("doc_id", ""))
 
 
+def test_extract_mcd_keeps_dictreader_row_semantics(tmp_path: Path) -> None:
+    """Blank lines, short rows and repeated headers behave as with csv.DictReader."""
+    raw = tmp_path / "raw"
+    processed = tmp_path / "processed"
+    mcd = raw / "mcd" / "current_lcd"
+    mcd.mkdir(parents=True)
+    (mcd / "LCD.csv").write_text(
+        "LCD_ID,Title,LCDTitle,Status,Title\r\n"
+        "L1,,Fallback title,A,Second title\r\n"
+        "\r\n"
+        "L2,Short row\r\n"
+        "L3,T3,,A,T3b,extra\r\n"
+        ",T4,,A,\r\n",
+        encoding="utf-8",
+    )
+    written = extract_mcd(processed, raw, force=True)
+    assert [t.name for t, _ in written] == ["L1.txt", "L2.txt", "L3.txt", "row3.txt"]
+    metas = [json.loads(m.read_text()) for _, m in written]
+    # A repeated header takes the value of its last column
+    assert metas[0]["title"] == "Second title"
+    assert metas[1]["title"] is None
+    assert "Title: Second title" in written[0][0].read_text()
+    assert "Status" not in written[1][0].read_text()
+    assert "None: ['extra']" in written[2][0].read_text()
+
+
 def test_extract_mcd_handles_large_csv_fields(tmp_path: Path) -> None:
     """MCD LCD.csv contains very large policy text fields; extractor should not skip them."""
     raw = tmp_path / "raw"
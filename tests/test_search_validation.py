@@ -12,9 +12,12 @@ Tests cover:
   - Validation checks (validate_index)
   - Report formatting (text and markdown)
 """
+import argparse
 import importlib.util
 import json
 import math
+import subprocess
+import sys
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -25,10 +28,12 @@ from langchain_core.documents import Document
 # Module loading helper (load script as module)
 # ---------------------------------------------------------------------------
 
+_SCRIPT_PATH = Path(__file__).resolve().parent.parent / "scripts" / "validate_and_eval.py"
+
+
 def _load_module():
     """Load validate_and_eval.py as a module for testing."""
-    script_path = Path(__file__).resolve().parent.parent / "scripts" / "validate_and_eval.py"
-    spec = importlib.util.spec_from_file_location("validate_and_eval", script_path)
+    spec = importlib.util.spec_from_file_location("validate_and_eval", _SCRIPT_PATH)
     assert spec and spec.loader
     mod = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(mod)
@@ -40,6 +45,23 @@ def mod():
     return _load_module()
 
 
+def test_module_import_does_not_load_heavy_dependencies():
+    """Loading the script (e.g. for --help) must not pull in medicare_rag or langchain."""
+    code = (
+        "import importlib.util, sys\n"
+        f"spec = importlib.util.spec_from_file_location('vae', {str(_SCRIPT_PATH)!r})\n"
+        "mod = importlib.util.module_from_spec(spec)\n"
+        "spec.loader.exec_module(mod)\n"
+        "heavy = [m for m in sys.modules if m.split('.')[0] in "
+        "('medicare_rag', 'langchain_core', 'chromadb', 'torch')]\n"
+        "print(','.join(heavy))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip() == ""
+
+
 # ---------------------------------------------------------------------------
 # DCG / NDCG tests
 # ---------------------------------------------------------------------------
@@ -188,6 +210,22 @@ class TestQuestionRelevance:
         rels = mod._question_relevance([], ["Part B"], ["iom"])
         assert rels == []
 
+    def test_folded_text_cached_by_content_hash(self, mod):
+        doc = Document(
+            page_content="MEDICARE PART B COVERAGE",
+            metadata={"source": "iom", "doc_id": "test", "content_hash": "abc123"},
+        )
+        mod._FOLDED_TEXT_CACHE.clear()
+        assert mod._question_relevance([doc], ["part b"], ["iom"]) == [pytest.approx(1.0)]
+        assert mod._FOLDED_TEXT_CACHE == {"abc123": "medicare part b coverage"}
+        mod._FOLDED_TEXT_CACHE["abc123"] = "cached text"
+        assert mod._question_relevance([doc], ["cached"], ["iom"]) == [pytest.approx(1.0)]
+
+    def test_keyword_match_is_casefolded(self, mod):
+        docs = [self._make_doc("Strasse address", "iom")]
+        rels = mod._question_relevance(docs, ["STRAßE"], ["iom"])
+        assert rels == [pytest.approx(1.0)]
+
 
 # ---------------------------------------------------------------------------
 # Per-question evaluation tests
@@ -264,6 +302,18 @@ class TestEvaluateQuestion:
         result = mod._evaluate_question(docs, None, None, k=5)
         assert set(result["sources_in_topk"]) == {"iom", "mcd", "codes"}
 
+    def test_sources_in_topk_deduplicated_in_rank_order(self, mod):
+        docs = [
+            self._make_doc("Part B", "mcd", "doc1"),
+            self._make_doc("Part B", "iom", "doc2"),
+            self._make_doc("Part B", "mcd", "doc3"),
+            Document(page_content="Part B", metadata={"doc_id": "doc4"}),
+            self._make_doc("Part B", "codes", "doc5"),
+        ]
+        result = mod._evaluate_question(docs, ["Part B"], ["iom", "codes"], k=5)
+        assert result["sources_in_topk"] == ["mcd", "iom", "codes"]
+        assert result["recall_at_k"] == pytest.approx(1.0)
+
     def test_empty_docs(self, mod):
         result = mod._evaluate_question([], ["Part B"], ["iom"], k=5)
         assert result["hit"] is False
@@ -588,6 +638,190 @@ class TestRunEval:
         assert metrics["latency"]["median_ms"] >= 0
         assert metrics["results"][0]["latency_ms"] >= 0
 
+    def test_queries_passed_for_batch_embedding(self, mod, tmp_path):
+        eval_file = self._write_eval_file(tmp_path, [
+            {"id": "q1", "query": "first query", "expected_keywords": ["test"]},
+            {"id": "q2", "query": "second query", "expected_keywords": ["test"]},
+        ])
+        mock_retriever = MagicMock()
+        mock_retriever.invoke.return_value = [self._make_doc("test content")]
+
+        with patch.object(mod, "_load_retriever", return_value=mock_retriever) as load:
+            mod.run_eval(eval_file, k=5)
+
+        assert load.call_args.kwargs["queries"] == ["first query", "second query"]
+
+    def test_batch_embed_time_spread_over_latencies(self, mod, tmp_path):
+        eval_file = self._write_eval_file(tmp_path, [
+            {"id": "q1", "query": "first query", "expected_keywords": ["test"]},
+            {"id": "q2", "query": "second query", "expected_keywords": ["test"]},
+        ])
+        mock_retriever = MagicMock()
+        mock_retriever.invoke.return_value = [self._make_doc("test content")]
+
+        def load(**kwargs):
+            kwargs["timings"]["query_embed_ms"] = 1000.0
+            return mock_retriever
+
+        with patch.object(mod, "_load_retriever", side_effect=load):
+            metrics = mod.run_eval(eval_file, k=5)
+
+        assert all(r["latency_ms"] >= 500.0 for r in metrics["results"])
+        assert metrics["latency"]["min_ms"] >= 500.0
+
+    def test_accepts_preloaded_question_list(self, mod):
+        questions = [
+            {"id": "q1", "query": "Part B", "expected_keywords": ["Part B"],
+             "expected_sources": ["iom"]},
+        ]
+        mock_retriever = MagicMock()
+        mock_retriever.invoke.return_value = [self._make_doc("Part B outpatient")]
+
+        with patch.object(mod, "_load_retriever", return_value=mock_retriever):
+            metrics = mod.run_eval(questions, k=5)
+
+        assert metrics["n_questions"] == 1
+        assert metrics["hit_rate"] == 1.0
+
+    def test_thread_pool_scoring_matches_serial(self, mod, tmp_path):
+        questions = [
+            {"id": f"q{i}", "query": f"query {i}", "expected_keywords": ["Part B"],
+             "expected_sources": ["iom"], "category": "c", "difficulty": "easy"}
+            for i in range(6)
+        ]
+        mock_retriever = MagicMock()
+        mock_retriever.invoke.return_value = [
+            self._make_doc("Unrelated", "codes", "d0"),
+            self._make_doc("Part B outpatient", "iom", "d1"),
+        ]
+
+        with patch.object(mod, "_load_retriever", return_value=mock_retriever):
+            serial = mod.run_eval(questions, k=2, k_values=[1, 2])
+            threaded = mod.run_eval(questions, k=2, k_values=[1, 2], workers=4)
+
+        for key in ("hit_rate", "mrr", "avg_precision_at_k", "avg_ndcg_at_k", "multi_k"):
+            assert serial[key] == threaded[key]
+        assert [r["id"] for r in threaded["results"]] == [q["id"] for q in questions]
+        assert threaded["results"][0]["first_hit_rank"] == 2
+
+    def test_breakdowns_are_key_ordered_for_reports(self, mod):
+        questions = [
+            {"id": "q1", "query": "a", "category": "zeta", "difficulty": "hard",
+             "consistency_group": "g2"},
+            {"id": "q2", "query": "b", "category": "alpha", "difficulty": "easy",
+             "consistency_group": "g1"},
+        ]
+        mock_retriever = MagicMock()
+        mock_retriever.invoke.return_value = [self._make_doc("text")]
+
+        with patch.object(mod, "_load_retriever", return_value=mock_retriever):
+            metrics = mod.run_eval(questions, k=5)
+
+        assert list(metrics["by_category"]) == ["alpha", "zeta"]
+        assert list(metrics["by_difficulty"]) == ["easy", "hard"]
+        assert list(metrics["consistency"]["groups"]) == ["g1", "g2"]
+        lines = mod._format_report(metrics)
+        alpha = next(i for i, line in enumerate(lines) if line.startswith("  alpha "))
+        zeta = next(i for i, line in enumerate(lines) if line.startswith("  zeta "))
+        assert alpha < zeta
+        assert lines[alpha].startswith("  " + "alpha".ljust(30) + "  n= 1  hit=100%")
+
+
+class TestBatchedQueryEmbeddings:
+
+    def _make_embeddings(self):
+        emb = MagicMock()
+        emb.embed_documents.side_effect = lambda texts: [[float(len(t))] for t in texts]
+        emb.embed_query.side_effect = lambda text: [-1.0]
+        return emb
+
+    def test_queries_embedded_in_one_batch(self, mod):
+        emb = self._make_embeddings()
+        batched = mod._BatchedQueryEmbeddings(emb, ["aa", "bbb", "aa", ""])
+        emb.embed_documents.assert_called_once_with(["aa", "bbb"])
+        assert batched.embed_query("aa") == [2.0]
+        assert batched.embed_query("bbb") == [3.0]
+        emb.embed_query.assert_not_called()
+
+    def test_unknown_query_falls_through_and_is_cached(self, mod):
+        emb = self._make_embeddings()
+        batched = mod._BatchedQueryEmbeddings(emb, ["aa"])
+        assert batched.embed_query("variant") == [-1.0]
+        assert batched.embed_query("variant") == [-1.0]
+        emb.embed_query.assert_called_once_with("variant")
+
+    def test_no_queries_skips_batch(self, mod):
+        emb = self._make_embeddings()
+        mod._BatchedQueryEmbeddings(emb, [])
+        emb.embed_documents.assert_not_called()
+
+
+class TestModelLoading:
+
+    def test_embeddings_loaded_once_for_validation_and_eval(self, mod):
+        fake_embeddings = MagicMock()
+        fake_embeddings.embed_documents.return_value = [[0.1]]
+        with (
+            patch("medicare_rag.index.get_embeddings", return_value=fake_embeddings) as get_emb,
+            patch("medicare_rag.index.get_or_create_chroma") as get_store,
+            patch("medicare_rag.query.retriever.get_retriever") as get_retriever,
+        ):
+            _, embeddings = mod._load_store()
+            mod._load_retriever(k=5)
+            timings: dict[str, float] = {}
+            mod._load_retriever(k=10, queries=["q"], timings=timings)
+
+        assert embeddings is fake_embeddings
+        get_emb.assert_called_once()
+        assert get_store.call_count == 3
+        assert get_retriever.call_args_list[0].kwargs["embeddings"] is fake_embeddings
+        assert isinstance(
+            get_retriever.call_args_list[1].kwargs["embeddings"], mod._BatchedQueryEmbeddings
+        )
+        assert timings["query_embed_ms"] >= 0
+
+
+class TestVectorSearchRetriever:
+
+    def test_chroma_where_translation(self, mod):
+        assert mod._chroma_where(None) is None
+        assert mod._chroma_where({}) is None
+        assert mod._chroma_where({"source": "iom"}) == {"source": "iom"}
+        assert mod._chroma_where({"source": "mcd", "jurisdiction": "JL"}) == {
+            "$and": [{"source": "mcd"}, {"jurisdiction": "JL"}]
+        }
+
+    def test_invoke_queries_raw_collection(self, mod):
+        collection = MagicMock()
+        collection.query.return_value = {
+            "documents": [["Part B text", None]],
+            "metadatas": [[{"source": "iom", "doc_id": "d1"}, None]],
+        }
+        embeddings = MagicMock()
+        embeddings.embed_query.return_value = [0.5, 0.5]
+        retriever = mod._VectorSearchRetriever(collection, embeddings, 2, {"source": "iom"})
+
+        docs = retriever.invoke("Part B")
+
+        collection.query.assert_called_once_with(
+            query_embeddings=[[0.5, 0.5]],
+            n_results=2,
+            where={"source": "iom"},
+            include=["documents", "metadatas"],
+        )
+        assert [d.page_content for d in docs] == ["Part B text", ""]
+        assert docs[0].metadata == {"source": "iom", "doc_id": "d1"}
+        assert docs[1].metadata == {}
+        ev = mod._evaluate_question(docs, ["Part B"], ["iom"], k=2)
+        assert ev["hit"] is True
+
+    def test_run_eval_passes_vector_only(self, mod):
+        mock_retriever = MagicMock()
+        mock_retriever.invoke.return_value = []
+        with patch.object(mod, "_load_retriever", return_value=mock_retriever) as load:
+            mod.run_eval([{"id": "q1", "query": "q"}], k=5, vector_only=True)
+        assert load.call_args.kwargs["vector_only"] is True
+
 
 # ---------------------------------------------------------------------------
 # Validation tests
@@ -911,6 +1145,30 @@ class TestMultiKSweep:
         assert "avg_recall_at_k" in metrics["multi_k"][1]
 
 
+class TestParseKValues:
+
+    def test_basic(self, mod):
+        assert mod._parse_k_values("1,3,5,10") == [1, 3, 5, 10]
+
+    def test_whitespace_and_trailing_comma(self, mod):
+        assert mod._parse_k_values(" 1, 3 ,5,") == [1, 3, 5]
+
+    def test_non_positive_dropped(self, mod):
+        assert mod._parse_k_values("0,-2,4") == [4]
+
+    def test_nothing_valid(self, mod):
+        assert mod._parse_k_values(",,") is None
+        assert mod._parse_k_values("0") is None
+
+    def test_whitespace_separated(self, mod):
+        assert mod._parse_k_values("1 3\t5") == [1, 3, 5]
+
+    def test_non_integer_rejected(self, mod):
+        for raw in ("1.5", "5x", "1,three"):
+            with pytest.raises(argparse.ArgumentTypeError):
+                mod._parse_k_values(raw)
+
+
 # ---------------------------------------------------------------------------
 # Duplicate question ID detection test
 # ---------------------------------------------------------------------------
@@ -1021,3 +1279,93 @@ class TestMarkdownReportBuilder:
         assert "FAILED" in md
         assert "Failed checks" in md
         assert "## Retrieval Evaluation" in md
+
+    def test_build_markdown_report_table_rows(self, mod):
+        breakdown = {
+            "n": 2, "hit_rate": 0.5, "mrr": 0.25, "avg_precision_at_k": 0.1,
+            "avg_recall_at_k": 0.5, "avg_ndcg_at_k": 0.333,
+        }
+        metrics = {
+            "n_questions": 2,
+            "k": 5,
+            "hit_rate": 0.5,
+            "hits": 1,
+            "mrr": 0.25,
+            "avg_precision_at_k": 0.1,
+            "avg_recall_at_k": 0.5,
+            "avg_ndcg_at_k": 0.333,
+            "latency": {},
+            "by_category": {"policy": breakdown},
+            "by_difficulty": {"easy": breakdown},
+            "by_expected_source": {"iom": breakdown},
+            "consistency": {"avg_score": None, "groups": {}},
+            "multi_k": None,
+            "results": [
+                {
+                    "id": "q1", "hit": True, "first_hit_rank": 2, "precision_at_k": 0.2,
+                    "recall_at_k": 1.0, "ndcg_at_k": 0.63, "category": "policy",
+                    "difficulty": "easy",
+                },
+                {
+                    "id": "q2", "hit": False, "first_hit_rank": None, "precision_at_k": 0.0,
+                    "recall_at_k": 0.0, "ndcg_at_k": 0.0, "category": "policy",
+                    "difficulty": "easy",
+                },
+            ],
+        }
+        md = mod._build_markdown_report(None, metrics, k=5)
+        assert "| policy | 2 | 50% | 0.250 | 0.100 | 0.500 | 0.333 |" in md
+        assert "| easy | 2 | 50% | 0.250 | 0.100 | 0.500 | 0.333 |" in md
+        assert "| iom | 2 | 50% | 0.250 | 0.100 | 0.500 | 0.333 |" in md
+        assert "| PASS | q1 | 0.20 | 0.63 | 2 | policy | easy |" in md
+        assert "| FAIL | q2 | 0.00 | 0.00 | — | policy | easy |" in md
+
+    def test_write_markdown_report_to_file(self, mod, tmp_path):
+        validation = {
+            "passed": True,
+            "checks": [],
+            "stats": {"checks_passed": 0, "checks_total": 0, "total_documents": 3},
+            "warnings": [],
+        }
+        report = tmp_path / "report.md"
+        with open(report, "w", encoding="utf-8") as fh:
+            mod._write_markdown_report(fh, validation, None, k=5)
+        text = report.read_text(encoding="utf-8")
+        assert text.startswith("# Medicare RAG Index")
+        assert "- **Total documents:** 3" in text
+        assert text.endswith("\n")
+
+    def test_rendered_rows_shared_by_log_and_markdown(self, mod):
+        metrics = {
+            "n_questions": 1, "k": 5, "hit_rate": 1.0, "hits": 1, "mrr": 0.5,
+            "avg_precision_at_k": 0.2, "avg_recall_at_k": 1.0, "avg_ndcg_at_k": 0.63,
+            "latency": {},
+            "by_category": {"policy": {
+                "n": 1, "hit_rate": 1.0, "mrr": 0.5, "avg_precision_at_k": 0.2,
+                "avg_recall_at_k": 1.0, "avg_ndcg_at_k": 0.63,
+            }},
+            "by_difficulty": {},
+            "by_expected_source": {},
+            "consistency": {"avg_score": None, "groups": {}},
+            "multi_k": None,
+            "results": [
+                {
+                    "id": "q1", "hit": True, "first_hit_rank": 2, "precision_at_k": 0.2,
+                    "recall_at_k": 1.0, "ndcg_at_k": 0.63, "latency_ms": 12.4,
+                    "category": "policy", "difficulty": "easy",
+                },
+            ],
+        }
+        rows = mod._render_rows(metrics)
+        assert rows["by_category"][0]["mrr"] == "0.500"
+        assert rows["results"][0]["latency"] == "12"
+
+        lines = mod._format_report(metrics, rows)
+        assert lines == mod._format_report(metrics)
+        assert (
+            "  [PASS] " + "q1".ljust(40)
+            + " p@k=0.20  ndcg=0.63  lat=12ms rank=2  cat=policy  diff=easy"
+        ) in lines
+        md = mod._build_markdown_report(None, metrics, k=5)
+        assert "| policy | 1 | 100% | 0.500 | 0.200 | 1.000 | 0.630 |" in md
+        assert "| PASS | q1 | 0.20 | 0.63 | 2 | policy | easy |" in md